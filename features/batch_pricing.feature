@@ -0,0 +1,90 @@
+@batch_pricing @priority_high
+Feature: Batch Toll Pricing
+  As a toll road operator
+  I want to price a whole night of gantry trips in one pass
+  So that nightly billing finishes quickly with the same charges as single quotes
+
+  @smoke @batch
+  Scenario: Price a batch of trips across memberships and time periods
+    When the following trips are priced as a batch:
+      | Distance | Membership | Time Period | Expected Charge |
+      | 10       | non        | normal      | 20.00           |
+      | 25       | non        | peak        | 135.00          |
+      | 20.01    | Silver     | normal      | 20.01           |
+      | 10.5     | Silver     | busy        | 21.00           |
+      | 10       | Gold       | busy        | 0.00            |
+      | 25       | Gold       | busy        | 2.50            |
+      | 25       | Gold       | peak        | 3.75            |
+      | 9999     | non        | peak        | 30057.00        |
+    Then each batch charge should match the expected charge
+    And each batch charge should match a single calculation
+
+  @regression @batch
+  Scenario: Price a batch of trips using membership and time period codes
+    When the following trips are priced as a batch using codes:
+      | Distance | Membership | Time Period | Expected Charge |
+      | 15       | 0          | 0           | 30.00           |
+      | 30       | 1          | 2           | 75.00           |
+      | 30       | 2          | 1           | 5.00            |
+    Then each batch charge should match the expected charge
+
+  @validation @batch
+  Scenario Outline: Booleans are not accepted as membership or time period codes
+    When the following trips are priced as a batch using codes:
+      | Distance | Membership   | Time Period   | Expected Charge |
+      | 10       | 0            | 0             | 20.00           |
+      | 10       | <membership> | <time_period> | 0.00            |
+    Then report the "<error>"
+    And no charge should be calculated
+
+    Examples:
+      | membership | time_period | error                      |
+      | true       | 0           | Invalid membership type    |
+      | 0          | false       | Invalid time period: False |
+
+  @validation @batch
+  Scenario: Batch with an invalid trip reports the first bad row
+    When the following trips are priced as a batch:
+      | Distance | Membership | Time Period | Expected Charge |
+      | 10       | non        | normal      | 20.00           |
+      | 10       | Platinum   | normal      | 0.00            |
+      | 0        | non        | normal      | 0.00            |
+    Then report the "Invalid membership type"
+    And no charge should be calculated
+
+  @regression @parallel
+  Scenario: Parallel batch pricing matches the sequential path
+    When the following trips are priced as a batch across 2 worker processes in chunks of 2:
+      | Distance | Membership | Time Period | Expected Charge |
+      | 10       | non        | normal      | 20.00           |
+      | 25       | non        | peak        | 135.00          |
+      | 20.01    | Silver     | normal      | 20.01           |
+      | 10.5     | Silver     | busy        | 21.00           |
+      | 25       | Gold       | busy        | 2.50            |
+    Then each batch charge should match the expected charge
+    And each batch charge should match a single calculation
+
+  @validation @batch
+  Scenario: Bulk validation returns an error code per row instead of raising
+    When the following trips are validated as a batch:
+      | Distance | Membership | Time Period | Error                           |
+      | 10       | non        | normal      |                                 |
+      | 0        | Gold       | busy        | Distance must be greater than 0 |
+      | 10       | gold       | busy        | Invalid membership type         |
+      | 10       | Silver     | rush        | Invalid time period: rush       |
+      | -5       | Platinum   | rush        | Distance must be greater than 0 |
+      | 25       | GOLD       | Peak        | Invalid membership type         |
+      | nan      | non        | peak        | Invalid distance: nan           |
+    Then each batch row should have the expected validation error
+    And each batch validation error should match a single calculation
+
+  @validation @batch
+  Scenario: Price a batch skipping invalid rows
+    When the following trips are priced as a batch skipping invalid rows:
+      | Distance | Membership | Time Period | Expected Charge |
+      | 10       | non        | normal      | 20.00           |
+      | 10       | Platinum   | normal      | 0.00            |
+      | 0        | non        | normal      | 0.00            |
+      | 25       | Gold       | peak        | 3.75            |
+    Then each batch charge should match the expected charge
+    And the batch error codes should be 0, 2, 1, 0
@@ -0,0 +1,42 @@
+@columnar
+Feature: Columnar Result Files
+  As a toll road operator
+  I want nightly pricing results in a compact binary columnar file
+  So that reconciliation can map and slice them without parsing
+
+  Background:
+    Given a "csv" trip log containing:
+      | trip_id | distance | membership | time_period |
+      | C1      | 10       | non        | peak        |
+      | C2      | 25       | Gold       | busy        |
+      | C3      | 0        | non        | normal      |
+      | C4      | 30       | Silver     | normal      |
+      | C5      | 25.5     | non        | peak        |
+
+  @smoke @columnar
+  Scenario: Priced trips are written to a columnar file and read back
+    When the trip log is priced with a columnar copy
+    Then the columnar file should hold 4 rows priced with tariff "standard-1"
+    And the columnar rows should be:
+      | distance | membership | time_period | charge | first_20_miles | beyond_20_miles | time_multiplier |
+      | 10.0     | non        | peak        | 60.00  | 2000           | 0               | 4000            |
+      | 25.0     | Gold       | busy        | 2.50   | 0              | 125             | 125             |
+      | 30.0     | Silver     | normal      | 25.00  | 2000           | 500             | 0               |
+      | 25.5     | non        | peak        | 136.50 | 4000           | 550             | 9100            |
+
+  @regression @columnar @parallel
+  Scenario: Columns are sliced straight from the mapped file
+    When the trip log is priced with a columnar copy across 2 worker processes
+    Then columnar rows 2 to 3 should have charges of 250, 2500 cents without copying
+    And the "time_multiplier" component of every columnar row should be 4000, 125, 0, 9100 cents
+
+  @regression @columnar
+  Scenario: A truncated columnar file is detected
+    When the trip log is priced with a columnar copy
+    And the columnar file loses its last byte
+    Then reading the columnar file should fail with "Columnar file is truncated"
+
+  @regression @columnar
+  Scenario: A columnar file whose writer did not finish is detected
+    Given a columnar file that is still being written
+    Then reading the columnar file should fail with "Columnar file is incomplete"
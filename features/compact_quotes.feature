@@ -0,0 +1,26 @@
+@compact_quotes
+Feature: Compact Quotes
+  As an auditor keeping a day of priced trips
+  I want quotes kept in a compact form
+  So that retaining many quotes does not exhaust memory
+
+  @regression @compact_quotes
+  Scenario Outline: A compact quote reads the same as the quote it came from
+    Given the user is a "<membership>" member
+    When the user requests a quote for <distance> miles during <time_period> times
+    And the quote is kept in compact form
+    Then the compact quote should hold the charge as <cents> integer cents
+    And the compact quote should read the same as the quote
+
+    Examples:
+      | membership | distance | time_period | cents |
+      | non        | 10       | normal      | 2000  |
+      | non        | 1.005    | peak        | 603   |
+      | Silver     | 25.0     | busy        | 4500  |
+      | Gold       | 25.5     | peak        | 413   |
+
+  @regression @compact_quotes
+  Scenario: Compact quotes take the least memory
+    When the memory of 2000 kept quotes is measured
+    Then each form should take less memory than the one before: breakdown, quote, compact
+    And a compact quote should take less than 75% of the memory of a full quote
@@ -0,0 +1,29 @@
+@concurrent_quotes
+Feature: Concurrent Quotes From A Shared Calculator
+  As a toll road operator
+  I want one calculator to serve a pool of worker threads
+  So that every trip gets its own charge and breakdown without locks
+
+  @regression @thread_safety
+  Scenario: Quotes requested from many threads keep their own breakdowns
+    When the following trips are quoted concurrently from 8 threads:
+      | Distance | Membership | Time Period |
+      | 10       | non        | normal      |
+      | 25       | non        | peak        |
+      | 10.5     | Silver     | busy        |
+      | 25       | Gold       | peak        |
+      | 10       | Gold       | busy        |
+      | 1000     | Silver     | normal      |
+    Then each concurrent quote should match a dedicated calculator
+
+  @smoke @quote
+  Scenario: A quote carries its own charge breakdown
+    Given the user is a non-member
+    When the user requests a quote for 25 miles during peak times
+    Then the total charge should be 135.00
+    And the charge breakdown should show:
+      | Description           | Calculation      | Amount  |
+      | First 20 miles (base) | 20 miles x $2.00 | $40.00  |
+      | Next 5 miles (base)   | 5 miles x $1.00  | $5.00   |
+      | Total base charge     | $40.00 + $5.00   | $45.00  |
+      | Peak time multiplier  | $45.00 x 3       | $135.00 |
@@ -95,6 +95,17 @@ Feature: Toll Calculation Edge Cases and Validation
       | Description | Calculation       | Amount |
       | Base charge | 10.5 miles x $1.00 | $10.50 |
 
+  @edge_cases @breakdown
+  Scenario: Charge breakdown reflects only the most recent calculation
+    Given the user is a "Silver" member
+    When the user calculates toll for 30 miles during busy times
+    And the user calculates toll for 10 miles during peak times
+    Then the total charge should be 30.00
+    And the charge breakdown should show:
+      | Description          | Calculation      | Amount |
+      | Base charge          | 10 miles x $1.00 | $10.00 |
+      | Peak time multiplier | $10.00 x 3       | $30.00 |
+
   @performance @stress_testing
   Scenario: Multiple rapid calculations
     Given the user is a non-member
@@ -13,6 +13,41 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from src.toll_calculator import TollCalculator
 
+# Calculator attributes that hold the last calculate_toll result rather than configuration
+_PER_CALL_STATE = ("_last_quote", "_last_breakdown")
+
+
+class SharedCalculator:
+    """
+    One default calculator handed to scenario after scenario
+    
+    A scenario that reconfigures the calculator in place (a new tariff,
+    schedule, cache or metrics) gets it replaced before the next scenario;
+    scenarios that create their own calculator leave the shared one alone.
+    """
+    
+    def __init__(self):
+        self.calculator = None
+        self._configuration = None
+    
+    def get(self) -> TollCalculator:
+        """The shared calculator, with no last calculation"""
+        if self.calculator is None or not self._unchanged():
+            self.calculator = TollCalculator()
+            self._configuration = self._snapshot()
+        self.calculator.last_calculation_breakdown = []
+        return self.calculator
+    
+    def _snapshot(self) -> dict:
+        """Every configuration attribute of the calculator"""
+        return {name: value for name, value in vars(self.calculator).items() if name not in _PER_CALL_STATE}
+    
+    def _unchanged(self) -> bool:
+        """Whether the calculator still holds the configuration it was created with"""
+        current = self._snapshot()
+        return (current.keys() == self._configuration.keys()
+                and all(current[name] is value for name, value in self._configuration.items()))
+
 
 def before_all(context):
     """
@@ -20,14 +55,22 @@ def before_all(context):
     """
     # Initialize any global test configuration here
     context.config.setup_logging()
+    
+    # -D reuse_calculator=true shares one calculator between scenarios
+    # instead of creating one per scenario
+    reuse = context.config.userdata.getbool("reuse_calculator")
+    context.shared_calculator = SharedCalculator() if reuse else None
 
 
 def before_scenario(context, scenario):
     """
     Setup performed before each scenario
     """
-    # Create a fresh calculator instance for each scenario
-    context.calculator = TollCalculator()
+    # Create a fresh calculator instance for each scenario, unless one is shared
+    if context.shared_calculator is not None:
+        context.calculator = context.shared_calculator.get()
+    else:
+        context.calculator = TollCalculator()
     context.last_charge = None
     context.last_error = None
     context.calculation_breakdown = []
@@ -0,0 +1,99 @@
+@journey_aggregation
+Feature: Journey Aggregation
+  As a toll road operator
+  I want gantry events grouped into journeys and daily account totals
+  So that whole journeys are priced in one pass without a separate grouping job
+
+  Background:
+    Given journeys close after 30 minutes without an event
+
+  @smoke @journeys
+  Scenario: Segments of one journey share the 20-mile tier
+    When the following gantry events are aggregated:
+      | account | vehicle | minute | distance | membership | time_period |
+      | A1      | car1    | 0      | 12       | non        | peak        |
+      | A2      | van1    | 5      | 8        | Silver     | normal      |
+      | A1      | car1    | 10     | 10       | non        | peak        |
+      | A1      | car1    | 25     | 0.1      | non        | peak        |
+    Then the priced journeys should be:
+      | account | vehicle | segments | distance | charge | billed |
+      | A2      | van1    | 1        | 8.0      | 8.00   | 8.00   |
+      | A1      | car1    | 3        | 22.1     | 126.30 | 126.30 |
+
+  @regression @journeys
+  Scenario: A vehicle that has been quiet for the gap starts a new journey
+    When the following gantry events are aggregated:
+      | account | vehicle | minute | distance | membership | time_period |
+      | A1      | car1    | 0      | 15       | non        | normal      |
+      | A1      | car1    | 20     | 10       | non        | normal      |
+      | A1      | car1    | 51     | 10       | non        | normal      |
+    Then the priced journeys should be:
+      | account | vehicle | segments | distance | charge |
+      | A1      | car1    | 2        | 25.0     | 45.00  |
+      | A1      | car1    | 1        | 10.0     | 20.00  |
+
+  @regression @journeys @daily_totals
+  Scenario: Daily totals are rolled up per account and capped
+    Given journeys close after 30 minutes without an event and accounts are capped at 150.00 per day
+    When the following gantry events are aggregated:
+      | account | vehicle | minute | distance | membership | time_period |
+      | A1      | car1    | 0      | 20       | non        | peak        |
+      | A1      | car2    | 60     | 10       | non        | peak        |
+      | A2      | van1    | 90     | 10       | Gold       | peak        |
+      | A1      | car1    | 1500   | 5        | non        | normal      |
+    Then the priced journeys should be:
+      | account | vehicle | charge | billed |
+      | A1      | car1    | 120.00 | 120.00 |
+      | A1      | car2    | 60.00  | 30.00  |
+      | A2      | van1    | 0.00   | 0.00   |
+      | A1      | car1    | 10.00  | 10.00  |
+    And the daily totals should be:
+      | account | day        | journeys | charge | billed |
+      | A1      | 2026-01-05 | 2        | 180.00 | 150.00 |
+      | A2      | 2026-01-05 | 1        | 0.00   | 0.00   |
+      | A1      | 2026-01-06 | 1        | 10.00  | 10.00  |
+
+  @regression @journeys
+  Scenario: Memory stays bounded by closing the least recently active journey early
+    Given at most 2 vehicles can have an open journey
+    When the following gantry events are aggregated:
+      | account | vehicle | minute | distance | membership | time_period |
+      | A1      | car1    | 0      | 5        | non        | normal      |
+      | A2      | car2    | 1      | 5        | non        | normal      |
+      | A3      | car3    | 2      | 5        | non        | normal      |
+      | A2      | car2    | 3      | 5        | non        | normal      |
+    Then at most 2 vehicles should have had an open journey at once
+    And the priced journeys should be:
+      | account | vehicle | segments | charge |
+      | A1      | car1    | 1        | 10.00  |
+      | A3      | car3    | 1        | 10.00  |
+      | A2      | car2    | 2        | 20.00  |
+
+  @regression @journeys @error_handling
+  Scenario: Invalid gantry events are rejected without stopping the stream
+    When the following gantry events are aggregated:
+      | account | vehicle | minute | distance | membership | time_period |
+      | A1      | car1    | 0      | 5        | Platinum   | normal      |
+      | A1      | car1    | 1      | 5        | non        | normal      |
+    Then report the "Invalid membership type"
+    And the priced journeys should be:
+      | account | vehicle | segments | charge |
+      | A1      | car1    | 1        | 10.00  |
+
+  @regression @journeys @daily_totals @error_handling
+  Scenario: A late event for a day whose totals were emitted is rejected
+    Given journeys close after 30 minutes without an event and accounts are capped at 150.00 per day
+    When the following gantry events are aggregated:
+      | account | vehicle | minute | distance | membership | time_period |
+      | A1      | car1    | 0      | 20       | non        | peak        |
+      | A1      | car1    | 1500   | 5        | non        | normal      |
+      | A1      | car2    | 1380   | 10       | non        | peak        |
+    Then report the "Late event for closed day 2026-01-05"
+    And the priced journeys should be:
+      | account | vehicle | charge | billed |
+      | A1      | car1    | 120.00 | 120.00 |
+      | A1      | car1    | 10.00  | 10.00  |
+    And the daily totals should be:
+      | account | day        | journeys | charge | billed |
+      | A1      | 2026-01-05 | 1        | 120.00 | 120.00 |
+      | A1      | 2026-01-06 | 1        | 10.00  | 10.00  |
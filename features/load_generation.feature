@@ -0,0 +1,20 @@
+@load_generation
+Feature: Synthetic Load
+  As a developer changing the pricing paths
+  I want realistic synthetic traffic streamed through every path
+  So that throughput and disagreements with calculate_toll show up at volume
+
+  @regression @load_generation
+  Scenario: Generated traffic follows the configured mix
+    When 20000 synthetic trips are generated with seed 7
+    Then the membership shares should be within 2 points of the configured mix
+    And the median distance should be between 15 and 20 miles
+    And at least 25% of the trips should be within 2 miles of the tier boundary
+    And every time period should carry at least 15% of the trips
+    And generating them again with seed 7 in chunks of 3000 should give the same trips
+
+  @regression @load_generation
+  Scenario: Every pricing path agrees with calculate_toll
+    When 6000 synthetic trips with seed 3 are streamed through every pricing path in chunks of 2000 with 2 workers
+    Then no pricing path should disagree with calculate_toll
+    And every pricing path should report its throughput
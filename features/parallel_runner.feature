@@ -0,0 +1,28 @@
+@parallel_runner
+Feature: Parallel Feature Runs
+  As a developer running the feature suite
+  I want features and scenarios spread across worker processes
+  So that the suite finishes sooner with exactly the results of a serial run
+
+  @regression @parallel_runner
+  Scenario: Scenarios split across workers give the serial results
+    When the features "toll_calculation, price_curves" are run in 2 parallel workers split by scenario
+    Then every scenario should have the same result as in a serial run
+    And the merged JUnit reports should list every scenario once
+
+  @regression @parallel_runner
+  Scenario: Features split across workers reusing one calculator give the serial results
+    When the features "toll_calculation, edge_cases_validation" are run in 2 parallel workers split by feature with "reuse_calculator=true"
+    Then every scenario should have the same result as in a serial run
+
+  @regression @parallel_runner @error_handling
+  Scenario Outline: A worker that fails or reports no results fails the run
+    When the features "toll_calculation, price_curves" are run in <workers> parallel workers split by feature with behave arguments "<arguments>"
+    Then the parallel run should fail
+
+    Examples:
+      | workers | arguments          |
+      | 1       | --include=nomatch  |
+      | 2       | --include=nomatch  |
+      | 2       | --version          |
+      | 1       | --tags=@smoke,and( |
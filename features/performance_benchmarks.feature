@@ -0,0 +1,23 @@
+@benchmark
+Feature: Pricing Performance Benchmarks
+  As a toll road operator
+  I want repeatable benchmarks of every pricing path
+  So that performance regressions are caught between commits
+
+  # Excluded from the default run; use: behave --tags=@benchmark
+  # Compare with a previous report: behave --tags=@benchmark -D benchmark_baseline=reports/old.json
+
+  @performance @regression_gate
+  Scenario: Benchmark every pricing path
+    When the benchmark suite is run with 20 runs of 200 calls
+    Then every pricing path should report p50, p90 and p99 timings
+    And every cached benchmark should report its quote cache hit rate
+    And the benchmark results should be saved as JSON
+    And single calls should take less than 50 microseconds at p50
+    And no pricing path should be slower than the baseline
+
+  @performance @startup
+  Scenario: Cold start stays within budget
+    When the calculator's cold start is measured over 5 runs
+    Then the cold start should take less than 50 milliseconds
+    And the slowest imports should be reported
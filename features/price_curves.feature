@@ -0,0 +1,59 @@
+@price_curve
+Feature: Price Curves
+  As a revenue analyst
+  I want each tariff cell as an explicit piecewise-linear price curve
+  So that I can evaluate what-if questions without pricing trips one by one
+
+  @smoke @price_curve
+  Scenario: A cell's curve is exported as breakpoints and slopes
+    Then the "non" "peak" price curve should have segments:
+      | start | end | slope | offset |
+      | 0     | 20  | 6.00  | 0      |
+      | 20    |     | 3.00  | 120.00 |
+    And the "Gold" "busy" price curve should have segments:
+      | start | end | slope | offset |
+      | 0     | 20  | 0     | 0      |
+      | 20    |     | 0.50  | 0      |
+
+  @regression @price_curve
+  Scenario: Revenue of a distance histogram is evaluated analytically
+    When the "non" "normal" curve is evaluated over the distance histogram:
+      | lower | upper | count |
+      | 0     | 10    | 100   |
+      | 10    | 30    | 10    |
+      | 25    | 25    | 2     |
+    Then the histogram revenue should be $1465.00
+
+  @regression @price_curve
+  Scenario Outline: The longest trip a budget covers
+    When the longest "<membership>" "<time_period>" trip for a $<budget> budget is found
+    Then the longest trip should be <distance> miles
+    And a trip of that length should be charged $<charge>
+
+    Examples:
+      | membership | time_period | budget | distance  | charge |
+      | non        | peak        | 90     | 15        | 90.00  |
+      | non        | peak        | 150    | 30        | 150.00 |
+      | Gold       | busy        | 1      | 22        | 1.00   |
+      | Silver     | normal      | 5.55   | 5.55      | 5.55   |
+      | Gold       | normal      | 10     | unlimited | 0.00   |
+
+  @regression @price_curve
+  Scenario Outline: Curves agree with calculate_toll at every breakpoint
+    Given the calculator uses the tariff:
+      """
+      {
+        "version": "what-if-1",
+        "first_20_miles": {"non": "2.125", "Silver": "1.05", "Gold": "0.10"},
+        "beyond_20_miles": {"non": "0.875", "Silver": "0.45", "Gold": "0.05"},
+        "time_multipliers": {"normal": "1.0", "busy": "1.75", "peak": "2.5"},
+        "gold_beyond_20_rate": "0.333"
+      }
+      """
+    And the calculator uses the "<engine>" pricing engine
+    Then the price curves should agree with calculate_toll at every breakpoint
+
+    Examples:
+      | engine  |
+      | decimal |
+      | fixed   |
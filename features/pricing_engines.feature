@@ -0,0 +1,37 @@
+@pricing_engines
+Feature: Fixed-Point Pricing Engine
+  As a toll road operator
+  I want an integer fixed-point pricing engine
+  So that trips are priced faster with exactly the same charges as the Decimal engine
+
+  @smoke @engine
+  Scenario Outline: Fixed-point engine prices tier and rounding boundaries
+    Given the calculator uses the "fixed" pricing engine
+    And the user is a "<membership>" member
+    When the user calculates toll for <distance> miles during <time_period> times
+    Then the total charge should be <expected_charge>
+
+    Examples:
+      | distance | membership | time_period | expected_charge |
+      | 20       | non        | peak        | 120.00          |
+      | 20.001   | non        | peak        | 120.00          |
+      | 20.005   | Silver     | busy        | 40.01           |
+      | 0.0025   | non        | normal      | 0.01            |
+      | 9999     | Gold       | peak        | 7484.25         |
+
+  @regression @engine @breakdown
+  Scenario: Fixed-point quotes keep the Decimal breakdown
+    Given the calculator uses the "fixed" pricing engine
+    And the user is a "Gold" member
+    When the user calculates toll for 25 miles during busy times
+    Then the total charge should be 2.50
+    And the charge breakdown should show:
+      | Description           | Calculation      | Amount |
+      | First 20 miles (free) | 20 miles x $0.00 | $0.00  |
+      | Next 5 miles (base)   | 5 miles x $0.25  | $1.25  |
+      | Busy time multiplier  | $1.25 x 2        | $2.50  |
+
+  @regression @engine
+  Scenario: Both engines agree on edge cases and random trips
+    When the pricing engines are compared over the edge cases and 20000 random trips with seed 11
+    Then both pricing engines should agree on every trip
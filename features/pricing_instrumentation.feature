@@ -0,0 +1,55 @@
+@instrumentation
+Feature: Pricing Instrumentation
+  As a toll road operator
+  I want per-stage timing counters from the calculator
+  So that I can see where pricing time goes in production
+
+  Background:
+    Given pricing instrumentation is enabled
+
+  @smoke @metrics
+  Scenario: Single calculations record every pricing stage and error
+    Given the user is a non-member
+    When the user calculates toll for 25 miles during peak times
+    And the user calculates toll for 10 miles during normal times
+    And the user attempts to calculate toll for 0 miles
+    Then the "validate" stage should have recorded 2 calls
+    And the "quantize" stage should have recorded 2 calls
+    And the "breakdown" stage should have recorded 2 calls
+    And the instrumentation should count 1 "distance_not_positive" errors
+    And the Prometheus export should include:
+      """
+      toll_pricing_stage_calls_total{stage="convert"} 2
+      toll_pricing_errors_total{kind="distance_not_positive"} 1
+      """
+
+  @regression @metrics @batch
+  Scenario: Batch calculations record batch calls and rows
+    When the following trips are priced as a batch:
+      | Distance | Membership | Time Period | Expected Charge |
+      | 10       | non        | normal      | 20.00           |
+      | 25       | Gold       | peak        | 3.75            |
+    Then the "batch" stage should have recorded 1 calls
+    And the "batch_decimal" stage should have recorded 1 calls
+    And the Prometheus export should include:
+      """
+      toll_pricing_batch_rows_total 2
+      """
+
+  @regression @metrics @error_handling
+  Scenario: Errors are counted by kind without the caller's input
+    Given the user is a non-member
+    When the user calculates toll for 10 miles during rush times
+    And the user calculates toll for 10 miles during midnight times
+    And the following trips are priced as a batch skipping invalid rows:
+      | Distance | Membership | Time Period | Expected Charge |
+      | 10       | non        | dawn        | 0.00            |
+      | 10       | Platinum   | normal      | 0.00            |
+    Then the instrumentation should count 3 "invalid_time_period" errors
+    And the instrumentation should count 1 "invalid_membership" errors
+    And the Prometheus export should include:
+      """
+      toll_pricing_errors_total{kind="invalid_time_period"} 3
+      toll_pricing_errors_total{kind="invalid_membership"} 1
+      """
+    And the Prometheus export should not mention "rush"
@@ -0,0 +1,63 @@
+@quote_cache
+Feature: Quote Caching
+  As a toll road operator
+  I want repeated gantry-to-gantry quotes to be served from a cache
+  So that common trips are priced without recalculating them
+
+  @smoke @cache
+  Scenario: Repeated quotes are served from the cache
+    Given the calculator caches up to 100 quotes
+    And the user is a non-member
+    When the user calculates toll for 25 miles during peak times
+    And the user calculates toll for 25 miles during peak times
+    And the user calculates toll for 10 miles during peak times
+    Then the total charge should be 60.00
+    And the quote cache should report 1 hits, 2 misses and 0 evictions
+
+  @regression @cache
+  Scenario: Least recently used quotes are evicted when the cache is full
+    Given the calculator caches up to 2 quotes
+    And the user is a "Silver" member
+    When the user calculates toll for 5 miles during normal times
+    And the user calculates toll for 10 miles during normal times
+    And the user calculates toll for 5 miles during normal times
+    And the user calculates toll for 15 miles during normal times
+    And the user calculates toll for 10 miles during normal times
+    Then the total charge should be 10.00
+    And the quote cache should report 1 hits, 4 misses and 2 evictions
+
+  @regression @cache @breakdown
+  Scenario: Cached breakdowns are safe to modify
+    Given the calculator caches up to 100 quotes
+    And the user is a non-member
+    When the user calculates toll for 10 miles during busy times
+    And the charge breakdown is modified by the caller
+    And the user calculates toll for 10 miles during busy times
+    Then the total charge should be 40.00
+    And the charge breakdown should show:
+      | Description          | Calculation      | Amount |
+      | Base charge          | 10 miles x $2.00 | $20.00 |
+      | Busy time multiplier | $20.00 x 2       | $40.00 |
+
+  @regression @cache @breakdown
+  Scenario: Equal Decimal distances spelled differently keep their own breakdowns
+    Given the calculator caches up to 100 quotes
+    And the user is a non-member
+    When the user calculates toll for Decimal("25.50") miles during normal times
+    And the user calculates toll for Decimal("25.5") miles during normal times
+    Then the total charge should be 45.50
+    And the charge breakdown should show:
+      | Description           | Calculation        | Amount |
+      | First 20 miles (base) | 20 miles x $2.00   | $40.00 |
+      | Next 5.5 miles (base) | 5.5 miles x $1.00  | $5.50  |
+    And the quote cache should report 0 hits, 2 misses and 0 evictions
+
+  @regression @cache
+  Scenario: Changing the rate tables invalidates cached quotes
+    Given the calculator caches up to 100 quotes
+    And the user is a non-member
+    When the user calculates toll for 10 miles during normal times
+    And the non-member first 20 miles rate is changed to 3.00
+    And the user calculates toll for 10 miles during normal times
+    Then the total charge should be 30.00
+    And the quote cache should report 0 hits, 2 misses and 0 evictions
@@ -0,0 +1,43 @@
+@quote_service
+Feature: Quote Service
+  As a toll road operator
+  I want a local quote service that prices concurrent requests together
+  So that per-request overhead does not dominate quote latency
+
+  @smoke @service
+  Scenario: Service quotes match the in-process calculator
+    When the following quote requests are sent to a local quote server:
+      | Distance | Membership | Time Period |
+      | 10       | non        | normal      |
+      | 25       | non        | peak        |
+      | 25       | Gold       | busy        |
+      | 0        | non        | normal      |
+      | 10       | Platinum   | peak        |
+      | 10       | Silver     | rush        |
+    Then each service response should match the in-process calculator
+
+  @regression @service @micro_batching
+  Scenario: Concurrent clients are priced in micro-batches
+    Given the user is a "Silver" member
+    When 20 clients each send 50 quote requests for 25 miles during peak times
+    Then every service response should be a charge of 67.50
+    And the service should have priced fewer batches than requests
+    And the service should report p50 and p99 latency
+
+  @regression @service @validation
+  Scenario: Service rejects batch codes and JSON booleans
+    When the following raw quote requests are sent to a local quote server
+      """
+      {"distance": 10, "membership": 2, "time_period": "normal"}
+      {"distance": 10, "membership": "non", "time_period": 1}
+      {"distance": true, "membership": "non", "time_period": "normal"}
+      {"distance": 10, "membership": true, "time_period": "normal"}
+      {"distance": 10, "membership": "non", "time_period": "normal"}
+      """
+    Then the service responses should be:
+      | Response                                  |
+      | {"error": "Invalid membership type"}      |
+      | {"error": "Invalid time period: 1"}       |
+      | {"error": "Invalid distance: True"}       |
+      | {"error": "Invalid membership type"}      |
+      | {"charge": "20.00"}                       |
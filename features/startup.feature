@@ -0,0 +1,17 @@
+@startup
+Feature: Cold Start
+  As an operator running pricing in short-lived workers and CLI invocations
+  I want the core calculator to start quickly and load only what it needs
+  So that each invocation spends its time pricing, not importing
+
+  @regression @startup
+  Scenario: Importing the calculator leaves optional pieces unloaded
+    When the calculator's cold start is measured over 1 run
+    Then importing the calculator should not load "src.quote_server, src.instrumentation, src.quote_cache, src.columnar, src.time_periods, threading, asyncio, numpy"
+    And the slowest imports should be reported
+
+  @regression @startup
+  Scenario: Calculators share the standard tariff compiled at import
+    Given the user is a non-member
+    When the user calculates toll for 10 miles during normal times
+    Then the calculator should price with the standard tariff compiled at import
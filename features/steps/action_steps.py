@@ -6,11 +6,45 @@ This module contains all When step definitions that handle:
 - Error scenarios and invalid inputs
 - Performance testing actions
 - All calculation variations (parametrized and hardcoded)
+- Batch pricing and bulk validation of trip tables
+- Caller and rate table changes between calculations
+- Concurrent quotes from a shared calculator
+- Trip log pricing from the command line
+- Parallel pricing across worker processes
+- Quote requests to a local quote server
+- Benchmark runs, cold start and quote memory measurements
+- Parallel runs of the feature suite
+- Synthetic load generation
+- Pricing engine comparisons
+- Tariff file changes and reloads
+- Gantry event aggregation
+- Timestamp classification and pricing
+- Columnar result files
+- Price curve queries
 """
 
 from behave import when
+import asyncio
+import json
+import os
+import shutil
+import tempfile
 import time
+import warnings
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
 from src.toll_calculator import TollCalculationError
+from src.tariff import TariffError, parse_tariff
+from src.journey_aggregator import as_record, parse_event
+from src import trip_pricer
+from src.parallel_pricing import calculate_tolls_parallel
+from src.quote_server import QuoteServer
+from src.benchmarks import measure_quote_memory, measure_startup, run_benchmarks
+from src.engine_diff import compare_engines, edge_case_trips, random_trips
+from src.price_curve import price_curves
+from src.load_generator import generate_trips, run_load
+from features.support.parallel_runner import run_parallel
 
 @when('the user attempts to calculate toll for {distance:g} miles')
 def step_attempt_calculate_toll_invalid_distance(context, distance):
@@ -29,19 +63,44 @@ def step_attempt_calculate_toll_invalid_distance(context, distance):
 def step_calculate_toll(context, distance, time_period):
     """Calculate toll for given distance and time period"""
     try:
+        start_time = time.perf_counter_ns()
         context.last_charge = context.calculator.calculate_toll(
             distance, context.membership, time_period
         )
+        context.response_time = (time.perf_counter_ns() - start_time) / 1e9
         context.calculation_breakdown = context.calculator.get_charge_breakdown()
         context.last_error = None
     except TollCalculationError as e:
         context.last_error = str(e)
         context.last_charge = None
 
+@when('the user requests a quote for {distance:g} miles during {time_period} times')
+def step_request_quote(context, distance, time_period):
+    """Request an immutable quote for the given distance and time period"""
+    try:
+        quote = context.calculator.quote(distance, context.membership, time_period)
+        context.last_quote = quote
+        context.last_charge = quote.charge
+        context.calculation_breakdown = quote.breakdown
+        context.last_error = None
+    except TollCalculationError as e:
+        context.last_error = str(e)
+        context.last_charge = None
+
+@when('the following trips are quoted concurrently from {threads:d} threads:')
+def step_quote_concurrently(context, threads):
+    """Quote every trip many times from a thread pool sharing one calculator"""
+    trips = [(float(row['Distance']), row['Membership'], row['Time Period']) for row in context.table]
+    context.concurrent_trips = trips * 200
+    calculator = context.calculator
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        context.concurrent_quotes = list(executor.map(lambda trip: calculator.quote(*trip),
+                                                      context.concurrent_trips))
+
 @when('the user performs {count:d} toll calculations for {distance:g} miles during {time_period} times')
 def step_multiple_calculations(context, count, distance, time_period):
     """Perform multiple rapid calculations for performance testing"""
-    start_time = time.time()
+    start_time = time.perf_counter_ns()
     results = []
     
     for _ in range(count):
@@ -52,8 +111,340 @@ def step_multiple_calculations(context, count, distance, time_period):
             context.last_error = str(e)
             return
     
-    end_time = time.time()
-    context.execution_time = end_time - start_time
+    context.execution_time = (time.perf_counter_ns() - start_time) / 1e9
     context.multiple_results = results
     context.last_charge = results[0] if results else None
-    
\ No newline at end of file
+    
+
+@when('the charge breakdown is modified by the caller')
+def step_modify_breakdown(context):
+    """Mutate the returned breakdown the way a careless caller might"""
+    context.calculation_breakdown[0]["Amount"] = "$0.00"
+    context.calculation_breakdown.append({"Description": "Tampered"})
+
+@when('the non-member first 20 miles rate is changed to {rate}')
+def step_change_first_20_rate(context, rate):
+    """Switch the calculator to a tariff with a new first 20 miles rate for non-members"""
+    data = context.calculator.tariff.to_dict()
+    data["version"] = f"{data['version']}-changed"
+    data["first_20_miles"]["non"] = rate
+    context.calculator.use_tariff(parse_tariff(data))
+
+@when('the following trips are priced as a batch:')
+def step_price_batch(context):
+    """Price every trip in the table with a single batch call"""
+    _price_batch(context, lambda row: row['Membership'], lambda row: row['Time Period'])
+
+@when('the following trips are priced as a batch at their timestamps:')
+def step_price_batch_at_timestamps(context):
+    """Price every trip in the table by event timestamp with a single batch call"""
+    _price_batch(context, lambda row: row['Membership'], lambda row: _epoch(row['Timestamp']),
+                 context.calculator.calculate_tolls_at)
+
+@when('the following trips are priced as a batch using codes:')
+def step_price_batch_with_codes(context):
+    """Price every trip in the table with membership and time period codes (true/false as booleans)"""
+    _price_batch(context, lambda row: _code(row['Membership']), lambda row: _code(row['Time Period']))
+
+def _code(value):
+    """Read a batch code cell, with true and false standing for the JSON booleans"""
+    if value in ("true", "false"):
+        return value == "true"
+    return int(value)
+
+@when('the following trips are priced as a batch across {workers:d} worker processes in chunks of {chunk_size:d}:')
+def step_price_batch_in_parallel(context, workers, chunk_size):
+    """Price every trip in the table with the multi-process batch pricer"""
+    _price_batch(context, lambda row: row['Membership'], lambda row: row['Time Period'],
+                 lambda *columns: calculate_tolls_parallel(*columns, workers=workers, chunk_size=chunk_size))
+
+@when('the following trips are validated as a batch:')
+def step_validate_batch(context):
+    """Validate every trip in the table with a single validate_batch call"""
+    context.batch_trips = [
+        (float(row['Distance']), row['Membership'], row['Time Period'], row['Error']) for row in context.table
+    ]
+    distances, memberships, time_periods, _ = zip(*context.batch_trips)
+    context.batch_error_codes = context.calculator.validate_batch(distances, memberships, time_periods)
+
+@when('the following trips are priced as a batch skipping invalid rows:')
+def step_price_batch_checked(context):
+    """Price every trip in the table with calculate_tolls_checked, keeping its error codes"""
+    def price(distances, memberships, time_periods):
+        charges, context.batch_error_codes = context.calculator.calculate_tolls_checked(
+            distances, memberships, time_periods
+        )
+        return [Decimal(cents) / 100 for cents in charges]
+    _price_batch(context, lambda row: row['Membership'], lambda row: row['Time Period'], price)
+
+def _price_batch(context, membership_of, time_period_of, price=None):
+    """Run a batch pricer (calculate_tolls by default) over the trips table and store the results"""
+    context.batch_trips = [
+        (float(row['Distance']), membership_of(row), time_period_of(row), Decimal(row['Expected Charge']))
+        for row in context.table
+    ]
+    distances, memberships, time_periods, _ = zip(*context.batch_trips)
+    try:
+        price = price or context.calculator.calculate_tolls
+        context.batch_charges = price(distances, memberships, time_periods)
+        context.last_charge = context.batch_charges[0]
+        context.last_error = None
+    except TollCalculationError as e:
+        context.batch_charges = None
+        context.last_error = str(e)
+        context.last_charge = None
+
+@when('the trip log is priced')
+def step_price_trip_log(context):
+    """Run the trip pricer command line on the trip log"""
+    _run_trip_pricer(context)
+
+@when('the trip log is priced in chunks of {chunk_size:d} trips')
+def step_price_trip_log_in_chunks(context, chunk_size):
+    """Run the trip pricer command line with a small chunk size"""
+    _run_trip_pricer(context, "--chunk-size", str(chunk_size))
+
+@when('the trip log is priced in chunks of {chunk_size:d} trips across {workers:d} worker processes')
+def step_price_trip_log_in_parallel(context, chunk_size, workers):
+    """Run the trip pricer command line with parallel workers"""
+    _run_trip_pricer(context, "--chunk-size", str(chunk_size), "--workers", str(workers))
+
+@when('the trip log is priced with a columnar copy')
+def step_price_trip_log_columnar(context):
+    """Run the trip pricer command line with a columnar output file"""
+    _run_trip_pricer(context, *_columnar_options(context))
+
+@when('the trip log is priced with a columnar copy across {workers:d} worker processes')
+def step_price_trip_log_columnar_in_parallel(context, workers):
+    """Run the trip pricer command line with a columnar output file and parallel workers"""
+    _run_trip_pricer(context, "--chunk-size", "2", "--workers", str(workers), *_columnar_options(context))
+
+def _columnar_options(context):
+    """Command line options writing a columnar file next to the trip log"""
+    context.columnar_path = os.path.join(context.trip_dir, "priced.tollcol")
+    return "--columnar", context.columnar_path
+
+@when('the columnar file loses its last byte')
+def step_truncate_columnar_file(context):
+    """Cut the columnar file short, as an interrupted copy would"""
+    with open(context.columnar_path, "r+b") as stream:
+        stream.truncate(os.path.getsize(context.columnar_path) - 1)
+
+def _run_trip_pricer(context, *options):
+    """Price the trip log into priced and rejected files next to it"""
+    context.priced_log = os.path.join(context.trip_dir, f"priced.{context.trip_format}")
+    context.rejects_log = os.path.join(context.trip_dir, f"rejects.{context.trip_format}")
+    exit_code = trip_pricer.main([
+        context.trip_log, "--output", context.priced_log, "--rejects", context.rejects_log, *options
+    ])
+    assert exit_code == 0, f"Trip pricer exited with {exit_code}"
+
+@when('the quote is kept in compact form')
+def step_keep_compact_quote(context):
+    """Convert the last quote to a CompactQuote"""
+    context.compact_quote = context.last_quote.compact()
+
+@when('the memory of {count:d} kept quotes is measured')
+def step_measure_quote_memory(context, count):
+    """Measure bytes per kept quote in every form with tracemalloc"""
+    context.memory_report = measure_quote_memory(count)
+
+@when('the following quote requests are sent to a local quote server:')
+def step_send_quote_requests(context):
+    """Send the table's requests over one localhost connection"""
+    context.service_requests = [
+        {"distance": float(row['Distance']), "membership": row['Membership'], "time_period": row['Time Period']}
+        for row in context.table
+    ]
+    context.service_responses = asyncio.run(_run_quote_clients(context, [context.service_requests]))[0]
+
+@when('the following raw quote requests are sent to a local quote server')
+def step_send_raw_quote_requests(context):
+    """Send the JSON request lines of the docstring over one localhost connection"""
+    context.service_requests = [json.loads(line) for line in context.text.splitlines() if line.strip()]
+    context.service_responses = asyncio.run(_run_quote_clients(context, [context.service_requests]))[0]
+
+@when('{clients:d} clients each send {count:d} quote requests for {distance:g} miles during {time_period} times')
+def step_send_concurrent_quote_requests(context, clients, count, distance, time_period):
+    """Send the same request from many concurrent localhost connections"""
+    request = {"distance": distance, "membership": context.membership, "time_period": time_period}
+    responses = asyncio.run(_run_quote_clients(context, [[request] * count] * clients))
+    context.service_responses = [response for client_responses in responses for response in client_responses]
+
+async def _run_quote_clients(context, client_requests):
+    """Start a quote server on localhost, run one client per request list, then stop it"""
+    server = QuoteServer()
+    await server.start()
+    try:
+        responses = await asyncio.gather(*[_send_requests(server.port, requests) for requests in client_requests])
+        context.service_stats = (await _send_requests(server.port, [{"op": "stats"}]))[0]
+    finally:
+        await server.stop()
+    return responses
+
+async def _send_requests(port, requests):
+    """Write every request on one connection and read the responses in order"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"".join(json.dumps(request).encode() + b"\n" for request in requests))
+    await writer.drain()
+    responses = [json.loads(await reader.readline()) for _ in requests]
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+@when('the benchmark suite is run with {repeat:d} runs of {number:d} calls')
+def step_run_benchmarks(context, repeat, number):
+    """Run every benchmark with warmup and repeated timed runs"""
+    context.benchmark_report = run_benchmarks(repeat=repeat, number=number)
+
+@when('the calculator\'s cold start is measured over {runs:d} run')
+@when('the calculator\'s cold start is measured over {runs:d} runs')
+def step_measure_startup(context, runs):
+    """Start fresh interpreters that import the calculator and price one trip"""
+    context.startup_report = measure_startup(runs)
+
+@when('the pricing engines are compared over the edge cases and {count:d} random trips with seed {seed:d}')
+def step_compare_engines(context, count, seed):
+    """Price edge-case and random trips with both pricing engines"""
+    trips = list(edge_case_trips()) + list(random_trips(count, seed))
+    context.engines_compared, context.engine_mismatches = compare_engines(trips)
+    context.engine_trips = len(trips)
+
+@when('the tariff file is changed to:')
+def step_change_tariff_file(context):
+    """Overwrite the calculator's tariff file with the JSON docstring"""
+    with open(context.tariff_path, 'w') as stream:
+        stream.write(context.text)
+
+@when('the calculator reloads its tariff')
+def step_reload_tariff(context):
+    """Reload the tariff file into the running calculator"""
+    try:
+        context.calculator.reload_tariff()
+        context.last_error = None
+    except TariffError as e:
+        context.last_error = str(e)
+
+@when('the calculator reloads its rates with the deprecated reload_rates')
+def step_reload_rates(context):
+    """Reload the tariff through the deprecated reload_rates, recording its warnings"""
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        context.calculator.reload_rates()
+    context.caught_warnings = caught
+
+# Midnight UTC on the day gantry event tables start
+JOURNEY_DAY_START = 1767571200
+
+@when('the following gantry events are aggregated:')
+def step_aggregate_events(context):
+    """Feed the table rows to the aggregator in order, popping completed days as the CLI does, then flush it"""
+    aggregator = context.aggregator
+    journeys = []
+    totals = []
+    context.max_active_vehicles = 0
+    context.last_error = None
+    for row in context.table:
+        record = dict(row.as_dict(), timestamp=JOURNEY_DAY_START + float(row['minute']) * 60)
+        try:
+            closed = aggregator.add(parse_event(record))
+        except TollCalculationError as e:
+            context.last_error = str(e)
+            continue
+        finally:
+            context.max_active_vehicles = max(context.max_active_vehicles, aggregator.active_vehicles)
+        if closed:
+            journeys += closed
+            totals += aggregator.pop_daily_totals()
+    journeys += aggregator.flush()
+    totals += aggregator.pop_daily_totals(final=True)
+    context.journeys = [as_record(journey) for journey in journeys]
+    context.daily_totals = [as_record(total) for total in totals]
+
+
+@when('the user calculates toll for Decimal("{distance}") miles during {time_period} times')
+def step_calculate_toll_decimal(context, distance, time_period):
+    """Calculate toll for a distance passed as a Decimal, keeping its spelling"""
+    context.last_charge = context.calculator.calculate_toll(Decimal(distance), context.membership, time_period)
+    context.calculation_breakdown = context.calculator.get_charge_breakdown()
+    context.last_error = None
+
+@when('the user calculates toll for {distance:g} miles at {timestamp}')
+def step_calculate_toll_at(context, distance, timestamp):
+    """Calculate toll for an ISO 8601 event time instead of a time period"""
+    try:
+        context.last_charge = context.calculator.calculate_toll_at(
+            distance, context.membership, _epoch(timestamp)
+        )
+        context.calculation_breakdown = context.calculator.get_charge_breakdown()
+        context.last_error = None
+    except TollCalculationError as e:
+        context.last_error = str(e)
+        context.last_charge = None
+
+@when('the timestamp {timestamp} is classified')
+def step_classify_timestamp(context, timestamp):
+    """Classify one ISO 8601 event time with the calculator's schedule"""
+    context.time_period = context.calculator.schedule.classify(_epoch(timestamp))
+
+@when('every {step:d} minutes from {start} for {days:d} days are classified in bulk')
+def step_classify_in_bulk(context, step, start, days):
+    """Classify a range of event times with one classify_many call"""
+    first = _epoch(start)
+    context.bulk_timestamps = [first + minute * 60 for minute in range(0, days * 24 * 60, step)]
+    context.bulk_codes = context.calculator.schedule.classify_many(context.bulk_timestamps)
+
+def _epoch(timestamp):
+    """Seconds since the epoch for an ISO 8601 timestamp with an offset or Z, else a number"""
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except ValueError:
+        return float(timestamp)
+
+@when('the "{membership}" "{time_period}" curve is evaluated over the distance histogram:')
+def step_evaluate_histogram_revenue(context, membership, time_period):
+    """Evaluate a cell's revenue over the table's (lower, upper, count) bins"""
+    curve = price_curves(context.calculator.tariff)[(membership, time_period)]
+    context.histogram_revenue = curve.revenue(
+        (row['lower'], row['upper'], int(row['count'])) for row in context.table
+    )
+
+@when('the longest "{membership}" "{time_period}" trip for a ${budget} budget is found')
+def step_find_max_distance(context, membership, time_period, budget):
+    """Invert a cell's price curve for a budget"""
+    context.trip = (membership, time_period)
+    context.max_distance = price_curves(context.calculator.tariff)[context.trip].max_distance(budget)
+
+@when('the features "{names}" are run in {workers:d} parallel workers split by {split} with behave arguments "{arguments}"')
+def step_run_features_in_parallel_with_arguments(context, names, workers, split, arguments):
+    """Run feature files through the parallel runner with extra behave arguments for every worker"""
+    _run_features_in_parallel(context, names, workers, split, arguments.split())
+
+@when('the features "{names}" are run in {workers:d} parallel workers split by {split} with "{define}"')
+def step_run_features_in_parallel_with_userdata(context, names, workers, split, define):
+    """Run feature files through the parallel runner with one -D definition"""
+    _run_features_in_parallel(context, names, workers, split, [f"-D{define}"])
+
+@when('the features "{names}" are run in {workers:d} parallel workers split by {split}')
+def step_run_features_in_parallel(context, names, workers, split):
+    """Run feature files through the parallel runner, merging JUnit reports into a temporary directory"""
+    _run_features_in_parallel(context, names, workers, split, [])
+
+def _run_features_in_parallel(context, names, workers, split, behave_args):
+    """Run the parallel runner without touching the recorded timings"""
+    context.feature_paths = [f"features/{name}.feature" for name in names.split(", ")]
+    context.junit_directory = tempfile.mkdtemp()
+    context.add_cleanup(shutil.rmtree, context.junit_directory, True)
+    context.parallel_run = run_parallel(context.feature_paths, workers, split, behave_args, "progress",
+                                        context.junit_directory, timings_path=None)
+
+@when('{count:d} synthetic trips are generated with seed {seed:d}')
+def step_generate_synthetic_trips(context, count, seed):
+    """Generate synthetic trips as one chunk"""
+    context.load_seed = seed
+    context.synthetic_trips = next(generate_trips(count, seed, chunk_size=count))
+
+@when('{count:d} synthetic trips with seed {seed:d} are streamed through every pricing path in chunks of {chunk_size:d} with {workers:d} workers')
+def step_run_synthetic_load(context, count, seed, chunk_size, workers):
+    """Run the load generator over every pricing path"""
+    context.load_report = run_load(count, seed, chunk_size=chunk_size, workers=workers)
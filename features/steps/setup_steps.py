@@ -4,11 +4,38 @@ Setup step definitions for toll calculation BDD tests
 This module contains all Given step definitions that handle:
 - Test configuration and setup
 - Rate table configuration  
+- Tariff files
 - Time multiplier configuration
 - User context and membership setup
+- Quote cache configuration
+- Trip log files
+- Pricing instrumentation
+- Pricing engine selection
+- Journey aggregation
+- Time period schedules
+- Unfinished columnar files
 """
 
+import csv
+import json
+import os
+import shutil
+import tempfile
+from decimal import Decimal
 from behave import given
+from src.columnar import ColumnarWriter
+from src.toll_calculator import TollCalculator
+from src.tariff import load_tariff
+from src.instrumentation import PricingMetrics
+from src.journey_aggregator import JourneyAggregator
+from src.time_periods import parse_schedule
+
+# Rate table names used in feature files
+RATE_TYPES = {
+    'Non-member': 'non',
+    'Silver': 'Silver',
+    'Gold': 'Gold'
+}
 
 @given('the toll charge calculator is available')
 def step_calculator_available(context):
@@ -18,30 +45,51 @@ def step_calculator_available(context):
 
 @given('the standard rates are configured as follows:')
 def step_standard_rates_configured_with_colon(context):
-    """Verify standard rates are configured (table validation with colon)"""
-    # This step validates that our rate table in the feature matches
-    # what's implemented in the calculator
-    expected_rates = {}
+    """Verify the loaded tariff matches the rate table"""
+    tariff = context.calculator.tariff
     for row in context.table:
-        rate_type = row['Rate Type']
-        first_20 = row['First 20 Miles']
-        beyond_20 = row['Beyond 20 Miles']
-        expected_rates[rate_type] = {'first_20': first_20, 'beyond_20': beyond_20}
-    
-    # Store for potential validation
-    context.expected_rates = expected_rates
+        membership = RATE_TYPES[row['Rate Type']]
+        for column, rates in (('First 20 Miles', tariff.first_20_rates),
+                              ('Beyond 20 Miles', tariff.beyond_20_rates)):
+            expected = Decimal(row[column].replace('$', '').replace('/mile', ''))
+            assert rates[membership] == expected, \
+                f"{row['Rate Type']} {column} rate is ${rates[membership]}, expected ${expected}"
 
 @given('the time-based multipliers are configured as follows:')
 def step_time_multipliers_configured_with_colon(context):
-    """Verify time-based multipliers are configured (table validation with colon)"""
-    expected_multipliers = {}
+    """Verify the loaded tariff matches the multiplier table"""
+    multipliers = context.calculator.tariff.time_multipliers
     for row in context.table:
-        time_period = row['Time Period']
-        multiplier = row['Multiplier']
-        expected_multipliers[time_period] = multiplier
-    
-    # Store for potential validation
-    context.expected_multipliers = expected_multipliers
+        time_period = row['Time Period'].lower()
+        expected = Decimal(row['Multiplier'].rstrip('x'))
+        assert multipliers[time_period] == expected, \
+            f"{row['Time Period']} multiplier is {multipliers[time_period]}, expected {expected}"
+
+@given('the calculator uses the tariff:')
+def step_calculator_tariff(context):
+    """Write the JSON docstring to a temporary tariff file and price with it"""
+    directory = tempfile.mkdtemp()
+    context.add_cleanup(shutil.rmtree, directory)
+    context.tariff_path = os.path.join(directory, 'tariff.json')
+    with open(context.tariff_path, 'w') as stream:
+        stream.write(context.text)
+    context.calculator = TollCalculator(tariff=load_tariff(context.tariff_path))
+
+@given('the calculator caches up to {cache_size:d} quotes')
+def step_calculator_with_cache(context, cache_size):
+    """Replace the scenario calculator with one that memoizes quotes"""
+    context.calculator = TollCalculator(cache_size=cache_size)
+
+@given('pricing instrumentation is enabled')
+def step_instrumentation_enabled(context):
+    """Replace the scenario calculator with one that records stage timings"""
+    context.metrics = PricingMetrics()
+    context.calculator = TollCalculator(metrics=context.metrics)
+
+@given('the calculator uses the "{engine}" pricing engine')
+def step_calculator_engine(context, engine):
+    """Replace the scenario calculator with one using the given pricing engine and the same tariff"""
+    context.calculator = TollCalculator(engine=engine, tariff=context.calculator.tariff)
 
 @given('the user is a non-member')
 def step_user_non_member(context):
@@ -53,3 +101,64 @@ def step_user_non_member(context):
 def step_user_quoted_membership(context, membership_level):
     """Set the user's membership level from quoted string"""
     context.membership = membership_level
+
+@given('a JSON Lines trip log with the lines')
+def step_trip_log_lines(context):
+    """Write the docstring's lines verbatim to a temporary JSON Lines trip log"""
+    context.trip_dir = tempfile.mkdtemp(prefix="trips_")
+    context.add_cleanup(shutil.rmtree, context.trip_dir, True)
+    context.trip_format = "jsonl"
+    context.trip_log = os.path.join(context.trip_dir, "trips.jsonl")
+    with open(context.trip_log, "w") as stream:
+        stream.write(context.text + "\n")
+
+@given('a "{file_format}" trip log containing:')
+def step_trip_log(context, file_format):
+    """Write the table to a temporary trip log in the given format"""
+    context.trip_dir = tempfile.mkdtemp(prefix="trips_")
+    context.add_cleanup(shutil.rmtree, context.trip_dir, True)
+    context.trip_format = file_format
+    context.trip_log = os.path.join(context.trip_dir, f"trips.{file_format}")
+    
+    with open(context.trip_log, "w", newline="") as stream:
+        if file_format == "csv":
+            writer = csv.writer(stream)
+            writer.writerow(context.table.headings)
+            writer.writerows(row.cells for row in context.table)
+        else:
+            for row in context.table:
+                record = row.as_dict()
+                try:
+                    record["distance"] = float(record["distance"])
+                except ValueError:
+                    pass
+                stream.write(json.dumps(record) + "\n")
+
+@given('journeys close after {minutes:d} minutes without an event')
+@given('journeys close after {minutes:d} minutes without an event and accounts are capped at {daily_cap} per day')
+def step_journey_aggregator(context, minutes, daily_cap=None):
+    """Create a journey aggregator around the scenario calculator"""
+    context.aggregator = JourneyAggregator(
+        context.calculator, journey_gap=minutes * 60,
+        daily_cap=Decimal(daily_cap) if daily_cap is not None else None
+    )
+
+@given('at most {count:d} vehicles can have an open journey')
+def step_journey_vehicle_limit(context, count):
+    """Limit the number of open journeys the aggregator keeps"""
+    context.aggregator.max_active_vehicles = count
+
+@given('the calculator uses the time period schedule:')
+def step_calculator_schedule(context):
+    """Classify timestamps with the schedule in the JSON docstring"""
+    context.calculator.schedule = parse_schedule(json.loads(context.text))
+
+@given('a columnar file that is still being written')
+def step_unfinished_columnar_file(context):
+    """Start a columnar file and leave its writer open"""
+    directory = tempfile.mkdtemp(prefix="columnar_")
+    context.add_cleanup(shutil.rmtree, directory, True)
+    context.columnar_path = os.path.join(directory, "priced.tollcol")
+    writer = ColumnarWriter(context.columnar_path, context.calculator.tariff)
+    context.add_cleanup(writer.abort)
+    writer.write_row(10, "non", "peak", Decimal("60.00"))
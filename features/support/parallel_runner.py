@@ -0,0 +1,427 @@
+"""
+Parallel Feature Runner
+
+This module runs the behave suite across worker processes. Scenarios (or
+whole features) are dealt out to the workers longest first, using the
+durations recorded by the previous run where there are any, and each
+worker is a separate behave process. The workers' results are merged into
+one log, one summary and one JUnit report per feature, with the same
+per-scenario results a serial run gives.
+
+Usage:
+    python -m features.support.parallel_runner --workers 4
+    python -m features.support.parallel_runner --split feature --junit-directory reports/junit
+    python -m features.support.parallel_runner -t @smoke -D reuse_calculator=true
+"""
+
+import argparse
+import glob
+import heapq
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ElementTree
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+from behave.parser import parse_file
+
+PROJECT_ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Scenario durations from the last run, used to balance the next one
+DEFAULT_TIMINGS_PATH = os.path.join(PROJECT_ROOT, "reports", "behave_timings.json")
+
+# Units of work handed to the workers
+SPLITS = ("scenario", "feature")
+
+# Assumed duration of a step that has no recorded timing, in seconds
+_DEFAULT_STEP_SECONDS = 0.001
+
+# A scenario runs in one worker and is reported as skipped by the others;
+# the most significant result wins when merging
+_STATUS_RANK = {"skipped": 0, "untested": 0, "passed": 1}
+
+
+class WorkUnit(NamedTuple):
+    """A feature file or scenario location handed to one worker"""
+    location: str
+    # Expected duration in seconds, for balancing
+    weight: float
+
+
+class ScenarioResult(NamedTuple):
+    """Outcome of one scenario, as reported by behave's JSON formatter"""
+    feature: str
+    location: str
+    status: str
+    # Status of each step, background steps included
+    steps: tuple
+    duration: float
+
+
+class ParallelRun(NamedTuple):
+    """Merged outcome of a parallel run"""
+    returncode: int
+    # Results keyed by scenario location, in file order
+    scenarios: Dict[str, ScenarioResult]
+    # Worker logs, in worker order
+    output: str
+    workers: int
+    elapsed: float
+    
+    @property
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Feature, scenario and step counts by status, as behave summarizes them"""
+        features = {}
+        for result in self.scenarios.values():
+            features.setdefault(result.feature, []).append(result.status)
+        feature_statuses = [_feature_status(statuses) for statuses in features.values()]
+        return {
+            "features": _count(feature_statuses),
+            "scenarios": _count(result.status for result in self.scenarios.values()),
+            "steps": _count(status for result in self.scenarios.values() for status in result.steps)
+        }
+
+
+def plan_units(paths: Sequence[str], split: str = "scenario",
+               timings: Optional[Dict[str, float]] = None) -> List[WorkUnit]:
+    """
+    Break feature files into units of work
+    
+    Args:
+        paths: Feature files and directories, relative to the project root
+        split: "scenario" hands out single scenarios (and single outline
+            examples); "feature" hands out whole feature files
+        timings: Recorded scenario durations in seconds, by location
+    
+    Returns:
+        Units in file order
+    
+    Raises:
+        ValueError: If the split is unknown
+    """
+    if split not in SPLITS:
+        raise ValueError(f"Unknown split: {split}")
+    timings = timings or {}
+    
+    units = {}
+    for scenario in _catalogue(paths):
+        path = scenario.location.rpartition(":")[0]
+        location = scenario.location if split == "scenario" else path
+        estimate = len(scenario.steps) * _DEFAULT_STEP_SECONDS
+        units[location] = units.get(location, 0.0) + timings.get(scenario.location, estimate)
+    return [WorkUnit(location, weight) for location, weight in units.items()]
+
+
+def partition(units: Sequence[WorkUnit], workers: int) -> List[List[WorkUnit]]:
+    """
+    Deal units out to workers, longest first, each to the least loaded worker
+    
+    Returns:
+        Non-empty groups of units, each in file order
+    """
+    loads = [(0.0, worker) for worker in range(max(1, workers))]
+    groups = [[] for _ in loads]
+    order = {unit.location: index for index, unit in enumerate(units)}
+    for unit in sorted(units, key=lambda unit: -unit.weight):
+        load, worker = heapq.heappop(loads)
+        groups[worker].append(unit)
+        heapq.heappush(loads, (load + unit.weight, worker))
+    return [sorted(group, key=lambda unit: order[unit.location]) for group in groups if group]
+
+
+def run_parallel(paths: Sequence[str] = ("features",), workers: Optional[int] = None,
+                 split: str = "scenario", behave_args: Sequence[str] = (),
+                 output_format: str = "pretty", junit_directory: Optional[str] = None,
+                 timings_path: Optional[str] = DEFAULT_TIMINGS_PATH) -> ParallelRun:
+    """
+    Run features across worker processes and merge the results
+    
+    Args:
+        paths: Feature files and directories, relative to the project root
+        workers: Worker processes (default: one per CPU)
+        split: Unit of work, one of SPLITS
+        behave_args: Extra arguments for every worker, such as tags and -D
+            definitions
+        output_format: behave formatter for the merged log
+        junit_directory: Directory for merged JUnit reports (None: no reports)
+        timings_path: File of scenario durations read to balance the workers
+            and updated afterwards (None: balance on step counts only)
+    
+    Returns:
+        The merged results; returncode is 0 only if every worker exited
+        cleanly and reported on every feature it was given, and no scenario
+        failed
+    """
+    timings = _load_timings(timings_path)
+    groups = partition(plan_units(paths, split, timings), workers or os.cpu_count() or 1)
+    
+    start = time.perf_counter()
+    scratch = tempfile.mkdtemp(prefix="behave-parallel-")
+    try:
+        processes = []
+        for index, group in enumerate(groups):
+            directory = os.path.join(scratch, f"worker-{index}")
+            os.mkdir(directory)
+            command = [sys.executable, "-m", "behave", "--no-summary", "--no-skipped",
+                       "-f", "json", "-o", os.path.join(directory, "results.json"), "-f", output_format]
+            if junit_directory is not None:
+                command += ["--junit", "--junit-directory", os.path.join(directory, "junit")]
+            command += list(behave_args) + [unit.location for unit in group]
+            log = open(os.path.join(directory, "output.txt"), "w+")
+            processes.append((directory, log, group, subprocess.Popen(
+                command, cwd=PROJECT_ROOT, stdout=log, stderr=subprocess.STDOUT, text=True)))
+        
+        returncode = 0
+        result_files = []
+        logs = []
+        for directory, log, group, process in processes:
+            exit_code = process.wait()
+            log.seek(0)
+            # behave announces its runner in every worker
+            logs.append("".join(line for line in log if not line.startswith("USING RUNNER:")))
+            log.close()
+            result_file = os.path.join(directory, "results.json")
+            reported = _reported_features(result_file)
+            if reported is not None:
+                result_files.append(result_file)
+            given = {_feature_path(unit.location) for unit in group}
+            # A worker that exits cleanly without results for its features ran nothing
+            if exit_code != 0 or reported is None or not given <= reported:
+                returncode = 1
+        
+        scenarios = {scenario.location: scenario for scenario in _catalogue(paths)}
+        scenarios.update(merge_results(result_files))
+        if junit_directory is not None:
+            merge_junit(sorted(glob.glob(os.path.join(scratch, "worker-*", "junit"))), junit_directory)
+    finally:
+        shutil.rmtree(scratch, True)
+    
+    if any(_STATUS_RANK.get(result.status, 2) > 1 for result in scenarios.values()):
+        returncode = 1
+    if timings_path is not None:
+        _save_timings(timings_path, timings, scenarios)
+    return ParallelRun(returncode, scenarios, "".join(logs), len(groups), time.perf_counter() - start)
+
+
+def merge_results(result_files: Iterable[str]) -> Dict[str, ScenarioResult]:
+    """
+    Merge behave JSON results from several runs
+    
+    A scenario that ran in one worker and was skipped by the others keeps
+    its real result; a failure anywhere wins over a pass.
+    
+    Args:
+        result_files: Files written by behave's JSON formatter
+    
+    Returns:
+        Results keyed by scenario location, in file order
+    """
+    scenarios = {}
+    for result_file in result_files:
+        with open(result_file) as stream:
+            features = json.load(stream)
+        for feature in features:
+            for element in feature.get("elements", []):
+                if element["type"] == "background":
+                    continue
+                result = _scenario_result(feature["location"], element)
+                current = scenarios.get(result.location)
+                if current is None or _STATUS_RANK.get(result.status, 2) > _STATUS_RANK.get(current.status, 2):
+                    scenarios[result.location] = result
+    return dict(sorted(scenarios.items(), key=lambda item: _location_key(item[0])))
+
+
+def merge_junit(directories: Iterable[str], junit_directory: str):
+    """
+    Merge per-worker JUnit reports into one report per feature
+    
+    Test cases skipped in one report but run in another keep the run; the
+    suite totals are recomputed from the merged cases. Workers run with
+    --no-skipped, so a feature none of whose scenarios ran has no report.
+    
+    Args:
+        directories: Worker JUnit directories
+        junit_directory: Destination directory (created if needed)
+    """
+    suites = {}
+    for directory in directories:
+        for path in sorted(glob.glob(os.path.join(directory, "*.xml"))):
+            suite = ElementTree.parse(path).getroot()
+            name = os.path.basename(path)
+            if name not in suites:
+                suites[name] = (suite, {})
+            cases = suites[name][1]
+            for case in suite.findall("testcase"):
+                key = (case.get("classname"), case.get("name"))
+                current = cases.get(key)
+                if current is None or (current.get("status") == "skipped" and case.get("status") != "skipped"):
+                    cases[key] = case
+    
+    os.makedirs(junit_directory, exist_ok=True)
+    for name, (suite, cases) in suites.items():
+        for case in suite.findall("testcase"):
+            suite.remove(case)
+        suite.extend(cases.values())
+        suite.set("tests", str(len(cases)))
+        for total, tags in (("failures", ("failure",)), ("errors", ("error",)), ("skipped", ("skipped",))):
+            suite.set(total, str(sum(1 for case in cases.values() if any(case.find(tag) is not None for tag in tags))))
+        suite.set("time", f"{sum(float(case.get('time', 0)) for case in cases.values()):.6f}")
+        ElementTree.ElementTree(suite).write(os.path.join(junit_directory, name), encoding="UTF-8",
+                                             xml_declaration=True)
+
+
+def format_summary(run: ParallelRun) -> str:
+    """Summary lines in behave's layout, plus the wall time and worker count"""
+    lines = []
+    for kind, counts in run.summary.items():
+        extra = "".join(f", {count} {status}" for status, count in counts.items()
+                        if status not in ("passed", "failed", "skipped"))
+        lines.append(f"{counts.get('passed', 0)} {kind} passed, {counts.get('failed', 0)} failed, "
+                     f"{counts.get('skipped', 0)} skipped{extra}")
+    minutes, seconds = divmod(run.elapsed, 60)
+    lines.append(f"Took {int(minutes)}min {seconds:.3f}s across {run.workers} workers")
+    return "\n".join(lines)
+
+
+def _feature_files(paths: Sequence[str]) -> List[str]:
+    """Feature files under the given paths, relative to the project root"""
+    files = []
+    for path in paths:
+        absolute = os.path.join(PROJECT_ROOT, path)
+        if os.path.isdir(absolute):
+            files.extend(sorted(glob.glob(os.path.join(absolute, "**", "*.feature"), recursive=True)))
+        else:
+            files.append(absolute)
+    return [os.path.relpath(path, PROJECT_ROOT) for path in files]
+
+
+def _catalogue(paths: Sequence[str]) -> List[ScenarioResult]:
+    """
+    Every scenario under the given paths, as not yet run
+    
+    Workers leave out the scenarios they skip, so the merged results start
+    from this list.
+    """
+    scenarios = []
+    for path in _feature_files(paths):
+        feature = parse_file(os.path.join(PROJECT_ROOT, path))
+        if feature is None:
+            continue
+        background_steps = len(feature.background.steps) if feature.background else 0
+        for scenario in feature.walk_scenarios():
+            steps = ("skipped",) * (background_steps + len(scenario.steps))
+            scenarios.append(ScenarioResult(f"{path}:{feature.line}", f"{path}:{scenario.line}",
+                                            "skipped", steps, 0.0))
+    return scenarios
+
+
+def _reported_features(result_file: str) -> Optional[set]:
+    """Feature files covered by a worker's JSON results, or None if the file is missing or unreadable"""
+    try:
+        with open(result_file) as stream:
+            return {_feature_path(feature["location"]) for feature in json.load(stream)}
+    except (OSError, ValueError, TypeError, KeyError):
+        return None
+
+
+def _feature_path(location: str) -> str:
+    """Feature file of a feature or scenario location"""
+    path, separator, line = location.rpartition(":")
+    return path if separator and line.isdigit() else location
+
+
+def _scenario_result(feature: str, element: Dict) -> ScenarioResult:
+    """Build a ScenarioResult from one JSON scenario element"""
+    # Steps that never ran have no result; behave counts them as skipped
+    steps = tuple(step.get("result", {}).get("status", "skipped") for step in element["steps"])
+    duration = sum(step.get("result", {}).get("duration", 0.0) for step in element["steps"])
+    status = element.get("status") or "skipped"
+    return ScenarioResult(feature, element["location"], "skipped" if status == "untested" else status,
+                          tuple("skipped" if step == "untested" else step for step in steps), duration)
+
+
+def _feature_status(statuses: Sequence[str]) -> str:
+    """Overall status of a feature from its scenario statuses"""
+    if any(_STATUS_RANK.get(status, 2) > 1 for status in statuses):
+        return "failed"
+    return "passed" if "passed" in statuses else "skipped"
+
+
+def _count(statuses: Iterable[str]) -> Dict[str, int]:
+    """Count statuses, folding every failure-like status into failed"""
+    counts = {"passed": 0, "failed": 0, "skipped": 0}
+    for status in statuses:
+        if status not in ("passed", "skipped", "undefined"):
+            status = "failed"
+        counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+def _location_key(location: str) -> tuple:
+    """Sort key putting locations in file, then line order"""
+    path, _, line = location.rpartition(":")
+    return path, int(line)
+
+
+def _load_timings(path: Optional[str]) -> Dict[str, float]:
+    """Read recorded scenario durations; missing or unreadable files give none"""
+    if path is None:
+        return {}
+    try:
+        with open(path) as stream:
+            timings = json.load(stream)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(timings, dict):
+        return {}
+    return {location: seconds for location, seconds in timings.items() if isinstance(seconds, (int, float))}
+
+
+def _save_timings(path: str, timings: Dict[str, float], scenarios: Dict[str, ScenarioResult]):
+    """Record the durations of the scenarios that ran"""
+    timings = dict(timings)
+    for location, result in scenarios.items():
+        if result.status != "skipped":
+            timings[location] = round(result.duration, 6)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as stream:
+        json.dump(timings, stream, indent=2, sort_keys=True)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Run the feature suite across worker processes")
+    parser.add_argument("paths", nargs="*", default=["features"],
+                        help="Feature files and directories (default: features)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Worker processes (default: one per CPU)")
+    parser.add_argument("--split", choices=SPLITS, default="scenario",
+                        help="Hand out single scenarios or whole features (default: scenario)")
+    parser.add_argument("-t", "--tags", action="append", default=[],
+                        help="Tag expression passed to every worker (repeatable)")
+    parser.add_argument("-D", "--define", action="append", default=[],
+                        help="NAME=VALUE user data passed to every worker (repeatable)")
+    parser.add_argument("-f", "--format", default="pretty",
+                        help="behave formatter for the merged log (default: pretty)")
+    parser.add_argument("--junit-directory", default=None,
+                        help="Write merged JUnit reports to this directory")
+    parser.add_argument("--timings", default=DEFAULT_TIMINGS_PATH,
+                        help=f"Scenario durations used for balancing (default: {DEFAULT_TIMINGS_PATH})")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    
+    behave_args = [f"--tags={tags}" for tags in args.tags] + [f"-D{define}" for define in args.define]
+    run = run_parallel(args.paths, args.workers, args.split, behave_args, args.format,
+                       args.junit_directory, args.timings)
+    print(run.output, end="")
+    print(format_summary(run))
+    return run.returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
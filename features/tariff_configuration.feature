@@ -0,0 +1,81 @@
+@tariff
+Feature: Tariff Configuration
+  As a toll road operator
+  I want rates loaded from versioned tariff files
+  So that tariffs can change without redeploying or restarting the calculator
+
+  Background:
+    Given the calculator uses the tariff:
+      """
+      {
+        "version": "2026-spring",
+        "first_20_miles": {"non": "2.50", "Silver": "1.25", "Gold": "0.00"},
+        "beyond_20_miles": {"non": "1.00", "Silver": "0.50", "Gold": "0.00"},
+        "time_multipliers": {"normal": "1.0", "busy": "2.0", "peak": "3.0"},
+        "gold_beyond_20_rate": "0.30"
+      }
+      """
+
+  @smoke @tariff
+  Scenario: Quotes are priced with the loaded tariff and carry its version
+    Given the user is a "Gold" member
+    When the user requests a quote for 30 miles during peak times
+    Then the total charge should be 9.00
+    And the quote should be priced with tariff "2026-spring"
+
+  @regression @tariff
+  Scenario: A changed tariff file is picked up by a running calculator
+    Given the user is a non-member
+    When the user requests a quote for 10 miles during normal times
+    And the tariff file is changed to:
+      """
+      {
+        "version": "2026-summer",
+        "first_20_miles": {"non": "3.00", "Silver": "1.50", "Gold": "0.00"},
+        "beyond_20_miles": {"non": "1.00", "Silver": "0.50", "Gold": "0.00"},
+        "time_multipliers": {"normal": "1.0", "busy": "2.0", "peak": "3.0"},
+        "gold_beyond_20_rate": "0.25"
+      }
+      """
+    And the calculator reloads its tariff
+    And the user requests a quote for 10 miles during normal times
+    Then the total charge should be 30.00
+    And the quote should be priced with tariff "2026-summer"
+
+  @regression @tariff @error_handling
+  Scenario: An invalid tariff file is rejected and the current tariff stays in use
+    Given the user is a non-member
+    When the tariff file is changed to:
+      """
+      {
+        "version": "2026-broken",
+        "first_20_miles": {"non": "2.00", "Silver": "1.00"},
+        "beyond_20_miles": {"non": "1.00", "Silver": "0.50", "Gold": "0.00"},
+        "time_multipliers": {"normal": "1.0", "busy": "2.0", "peak": "3.0"},
+        "gold_beyond_20_rate": "0.25"
+      }
+      """
+    And the calculator reloads its tariff
+    Then report the "Missing first_20_miles rate for Gold"
+    And the calculator should still use tariff "2026-spring"
+    When the user requests a quote for 10 miles during normal times
+    Then the total charge should be 25.00
+
+  @regression @tariff @compatibility
+  Scenario: The pre-tariff rate tables and reload_rates still work
+    Given the user is a non-member
+    When the tariff file is changed to:
+      """
+      {
+        "version": "2026-summer",
+        "first_20_miles": {"non": "3.00", "Silver": "1.50", "Gold": "0.00"},
+        "beyond_20_miles": {"non": "1.00", "Silver": "0.50", "Gold": "0.00"},
+        "time_multipliers": {"normal": "1.0", "busy": "2.0", "peak": "3.0"},
+        "gold_beyond_20_rate": "0.25"
+      }
+      """
+    And the calculator reloads its rates with the deprecated reload_rates
+    Then reload_rates should have warned that it is deprecated
+    And the calculator should still use tariff "2026-summer"
+    And the calculator's rate tables should be read-only views of its tariff
+    And the TollCalculator class's rate tables should be read-only views of the standard tariff
@@ -0,0 +1,120 @@
+@time_period_schedule
+Feature: Time Periods from Timestamps
+  As a toll road operator
+  I want the calculator to work out the time period from the event time
+  So that every upstream service prices trips by the same schedule
+
+  @smoke @schedule
+  Scenario Outline: The standard schedule classifies event times
+    When the timestamp <timestamp> is classified
+    Then the time period should be <time_period>
+
+    Examples:
+      | timestamp            | time_period |
+      | 2026-01-05T05:59:00Z | normal      |
+      | 2026-01-05T06:00:00Z | busy        |
+      | 2026-01-05T07:30:00Z | peak        |
+      | 2026-01-05T09:00:00Z | busy        |
+      | 2026-01-05T10:00:00Z | normal      |
+      | 2026-01-09T18:59:59Z | peak        |
+      | 2026-01-10T12:00:00Z | busy        |
+      | 2026-01-11T08:00:00Z | normal      |
+
+  @smoke @schedule
+  Scenario: Tolls are calculated from the event time
+    Given the user is a "Silver" member
+    When the user calculates toll for 25 miles at 2026-01-05T08:15:00Z
+    Then the total charge should be 67.50
+    And the charge breakdown should show:
+      | Description           | Calculation      | Amount |
+      | First 20 miles (base) | 20 miles x $1.00 | $20.00 |
+      | Next 5 miles (base)   | 5 miles x $0.50  | $2.50  |
+      | Total base charge     | $20.00 + $2.50   | $22.50 |
+      | Peak time multiplier  | $22.50 x 3       | $67.50 |
+
+  @regression @schedule @batch
+  Scenario: Batches are priced from event times
+    When the following trips are priced as a batch at their timestamps:
+      | Distance | Membership | Timestamp                 | Expected Charge |
+      | 10       | non        | 2026-01-05T07:00:00Z      | 60.00           |
+      | 10       | non        | 2026-01-05T06:30:00Z      | 40.00           |
+      | 10       | non        | 2026-01-05T23:00:00Z      | 20.00           |
+      | 25       | Gold       | 2026-01-05T17:00:00+00:00 | 3.75            |
+      | 25       | Gold       | 2026-01-10T11:00:00Z      | 2.50            |
+    Then each batch charge should match the expected charge
+
+  @regression @schedule
+  Scenario: Bulk classification matches single classification
+    When every 7 minutes from 2026-03-27T00:00:00Z for 14 days are classified in bulk
+    Then each bulk classification should match a single classification
+
+  @regression @schedule
+  Scenario Outline: Holidays and local time zones are honoured
+    Given the calculator uses the time period schedule:
+      """
+      {
+        "version": "east-2026",
+        "timezone": "America/New_York",
+        "profiles": {
+          "weekday": [{"start": "07:00", "end": "09:00", "period": "peak"}],
+          "weekend": [{"start": "10:00", "end": "18:00", "period": "busy"}],
+          "holiday": []
+        },
+        "days": {
+          "monday": "weekday", "tuesday": "weekday", "wednesday": "weekday",
+          "thursday": "weekday", "friday": "weekday",
+          "saturday": "weekend", "sunday": "weekend"
+        },
+        "holidays": {"2026-12-25": "holiday"}
+      }
+      """
+    When the timestamp <timestamp> is classified
+    Then the time period should be <time_period>
+
+    Examples:
+      | timestamp            | time_period |
+      | 2026-01-05T12:30:00Z | peak        |
+      | 2026-07-06T11:30:00Z | peak        |
+      | 2026-07-06T13:30:00Z | normal      |
+      | 2026-12-24T13:00:00Z | peak        |
+      | 2026-12-25T13:00:00Z | normal      |
+
+  @regression @schedule
+  Scenario Outline: Clock changes off the UTC hour are honoured to the minute
+    Given the calculator uses the time period schedule:
+      """
+      {
+        "version": "newfoundland-2026",
+        "timezone": "America/St_Johns",
+        "profiles": {
+          "weekday": [],
+          "sunday": [
+            {"start": "01:30", "end": "02:00", "period": "peak"},
+            {"start": "02:00", "end": "02:30", "period": "busy"},
+            {"start": "03:00", "end": "04:00", "period": "peak"}
+          ]
+        },
+        "days": {
+          "monday": "weekday", "tuesday": "weekday", "wednesday": "weekday",
+          "thursday": "weekday", "friday": "weekday",
+          "saturday": "weekday", "sunday": "sunday"
+        }
+      }
+      """
+    When the timestamp <timestamp> is classified
+    Then the time period should be <time_period>
+
+    Examples:
+      | timestamp            | time_period |
+      | 2026-03-08T04:40:00Z | normal      |
+      | 2026-03-08T05:20:00Z | peak        |
+      | 2026-03-08T05:40:00Z | peak        |
+      | 2026-11-01T04:20:00Z | peak        |
+      | 2026-11-01T04:40:00Z | normal      |
+      | 2026-11-01T05:40:00Z | busy        |
+
+  @regression @schedule @error_handling
+  Scenario: Invalid event times are rejected
+    Given the user is a non-member
+    When the user calculates toll for 10 miles at NaN
+    Then report the "Invalid timestamp"
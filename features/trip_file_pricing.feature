@@ -0,0 +1,84 @@
+@trip_file_pricing
+Feature: Trip File Pricing
+  As a toll road operator
+  I want to price a whole trip log from the command line
+  So that bad rows are set aside without stopping the nightly run
+
+  @smoke @csv
+  Scenario: Price a CSV trip log and set aside bad rows
+    Given a "csv" trip log containing:
+      | trip_id | distance | membership | time_period |
+      | T1      | 10       | non        | peak        |
+      | T2      | 25       | Gold       | busy        |
+      | T3      | 0        | non        | normal      |
+      | T4      | 30       | Silver     | normal      |
+      | T5      | 10       | Platinum   | normal      |
+      | T6      | ten      | non        | normal      |
+    When the trip log is priced
+    Then the priced trips should be:
+      | trip_id | charge |
+      | T1      | 60.00  |
+      | T2      | 2.50   |
+      | T4      | 25.00  |
+    And the rejected trips should be:
+      | trip_id | error                           |
+      | T3      | Distance must be greater than 0 |
+      | T5      | Invalid membership type         |
+      | T6      | Invalid distance: ten           |
+
+  @regression @jsonl
+  Scenario: Price a JSON Lines trip log in small chunks
+    Given a "jsonl" trip log containing:
+      | trip_id | distance | membership | time_period |
+      | J1      | 20.01    | Silver     | normal      |
+      | J2      | 25       | non        | rush        |
+      | J3      | 9999     | non        | peak        |
+    When the trip log is priced in chunks of 1 trips
+    Then the priced trips should be:
+      | trip_id | charge   |
+      | J1      | 20.01    |
+      | J3      | 30057.00 |
+    And the rejected trips should be:
+      | trip_id | error                   |
+      | J2      | Invalid time period: rush |
+
+  @regression @parallel
+  Scenario: Price a trip log across worker processes
+    Given a "csv" trip log containing:
+      | trip_id | distance | membership | time_period |
+      | P1      | 10       | non        | normal      |
+      | P2      | 0        | Gold       | busy        |
+      | P3      | 25       | Silver     | peak        |
+      | P4      | 25       | Gold       | peak        |
+      | P5      | 5        | gold       | peak        |
+    When the trip log is priced in chunks of 2 trips across 2 worker processes
+    Then the priced trips should be:
+      | trip_id | charge |
+      | P1      | 20.00  |
+      | P3      | 67.50  |
+      | P4      | 3.75   |
+    And the rejected trips should be:
+      | trip_id | error                           |
+      | P2      | Distance must be greater than 0 |
+      | P5      | Invalid membership type         |
+
+  @regression @jsonl @validation
+  Scenario: Set aside JSON Lines that are not trip objects
+    Given a JSON Lines trip log with the lines
+      """
+      {"trip_id": "M1", "distance": 10, "membership": "non", "time_period": "peak"}
+      {"trip_id": "M2", "distance": 10,
+      [1, 2]
+      "x"
+      {"trip_id": "M3", "distance": 25, "membership": "Gold", "time_period": "busy"}
+      """
+    When the trip log is priced
+    Then the priced trips should be:
+      | trip_id | charge |
+      | M1      | 60.00  |
+      | M3      | 2.50   |
+    And the rejected trips should be:
+      | line                              | error             |
+      | {"trip_id": "M2", "distance": 10, | Not a JSON object |
+      | [1, 2]                            | Not a JSON object |
+      | "x"                               | Not a JSON object |
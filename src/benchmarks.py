@@ -0,0 +1,415 @@
+"""
+Toll Calculator Benchmarks
+
+This module provides a benchmark harness for the pricing paths: short and
+long trips, the Gold busy/peak special case and invalid input, each as
+single calls and as batches, with and without the quote cache, plus the
+synthetic traffic mix priced one trip at a time through a bounded quote
+cache, reported with the hit rate that mix achieves. Every
+benchmark is warmed up, timed over repeated runs with perf_counter_ns and
+summarized as percentiles. Results can be saved to JSON and compared
+against a previous run to catch regressions between commits. A separate
+startup benchmark measures cold starts in fresh interpreters: import time
+(with the python -X importtime breakdown), calculator creation and the
+first quote. The memory benchmark measures with tracemalloc the bytes each
+kept quote costs as a dict breakdown, a TollQuote and a CompactQuote.
+
+Usage:
+    python -m src.benchmarks --output bench.json
+    python -m src.benchmarks --compare bench.json --max-slowdown 1.25
+    python -m src.benchmarks --startup --startup-budget-ms 50
+    python -m src.benchmarks --memory
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from itertools import cycle
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.load_generator import generate_trips
+from src.toll_calculator import TollCalculationError, TollCalculator
+
+# Trips used by the benchmarks: (distance, membership, time_period)
+BENCHMARK_TRIPS = {
+    "short": (10.0, "non", "peak"),
+    "long": (25.0, "Silver", "busy"),
+    "gold_special": (25.0, "Gold", "peak"),
+    "invalid": (0.0, "non", "normal")
+}
+
+# Trips per call in batch benchmarks
+BATCH_SIZE = 1000
+
+# Quote cache size for the cached benchmarks
+CACHE_SIZE = 1024
+
+# Synthetic trips cycled through by the mixed cached benchmark; far more
+# distinct trips than CACHE_SIZE, so it misses and evicts like real traffic
+MIXED_TRIPS = 20000
+
+# Cold start budget in milliseconds: import, first calculator and first quote
+STARTUP_BUDGET_MS = 50
+
+# Ways of keeping a priced trip compared by measure_quote_memory
+QUOTE_FORMS = {
+    "breakdown": lambda quote: quote.breakdown,
+    "quote": lambda quote: quote,
+    "compact": lambda quote: quote.compact()
+}
+
+# Run in a fresh interpreter by measure_startup; prints nanoseconds per stage
+_STARTUP_SCRIPT = """
+import time
+start = time.perf_counter_ns()
+from src.toll_calculator import TollCalculator
+imported = time.perf_counter_ns()
+calculator = TollCalculator()
+created = time.perf_counter_ns()
+calculator.calculate_toll(25.0, "Silver", "busy")
+quoted = time.perf_counter_ns()
+print(imported - start, created - imported, quoted - created)
+"""
+
+# Directory holding the src package, where startup interpreters run
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _single_call(calculator: TollCalculator, trip: Tuple) -> Callable[[], None]:
+    """Benchmark body pricing one trip, swallowing validation errors"""
+    calculate_toll = calculator.calculate_toll
+    
+    def run():
+        try:
+            calculate_toll(*trip)
+        except TollCalculationError:
+            pass
+    return run
+
+
+def _batch_call(calculator: TollCalculator, trip: Tuple) -> Callable[[], None]:
+    """
+    Benchmark body pricing BATCH_SIZE trips in one batch call
+    
+    Valid trips are repeated; an invalid trip is placed last behind valid
+    short trips, so the batch does all its work before failing.
+    """
+    if trip == BENCHMARK_TRIPS["invalid"]:
+        trips = [BENCHMARK_TRIPS["short"]] * (BATCH_SIZE - 1) + [trip]
+    else:
+        trips = [trip] * BATCH_SIZE
+    distances, memberships, time_periods = (list(column) for column in zip(*trips))
+    calculate_tolls = calculator.calculate_tolls_cents
+    
+    def run():
+        try:
+            calculate_tolls(distances, memberships, time_periods)
+        except TollCalculationError:
+            pass
+    return run
+
+
+def _mixed_call(calculator: TollCalculator, trips: List[Tuple]) -> Callable[[], None]:
+    """Benchmark body pricing the next of trips, in a loop, as one single call"""
+    next_trip = cycle(trips).__next__
+    calculate_toll = calculator.calculate_toll
+    
+    def run():
+        calculate_toll(*next_trip())
+    return run
+
+
+def build_benchmarks() -> Dict[str, Tuple[Callable[[], None], int, Optional[TollCalculator]]]:
+    """
+    Build every benchmark body
+    
+    Returns:
+        Mapping of benchmark name -> (body, trips priced per call, calculator
+        whose quote cache hit rate is reported, or None)
+    """
+    benchmarks = {}
+    for name, trip in BENCHMARK_TRIPS.items():
+        cached = TollCalculator(cache_size=CACHE_SIZE)
+        benchmarks[f"single_{name}"] = (_single_call(TollCalculator(), trip), 1, None)
+        benchmarks[f"single_{name}_cached"] = (_single_call(cached, trip), 1, cached)
+        benchmarks[f"batch_{name}"] = (_batch_call(TollCalculator(), trip), BATCH_SIZE, None)
+    
+    mixed = TollCalculator(cache_size=CACHE_SIZE)
+    trips = list(zip(*next(generate_trips(MIXED_TRIPS, chunk_size=MIXED_TRIPS))))
+    benchmarks["single_mixed_cached"] = (_mixed_call(mixed, trips), 1, mixed)
+    return benchmarks
+
+
+def percentile(sorted_values: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    rank = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def time_benchmark(body: Callable[[], None], trips_per_call: int, warmup: int = 200,
+                   repeat: int = 30, number: int = 200) -> Dict[str, float]:
+    """
+    Time one benchmark body
+    
+    Args:
+        body: Function to time
+        trips_per_call: Trips priced by one call of body
+        warmup: Untimed calls before measuring
+        repeat: Number of timed runs
+        number: Calls of body per timed run
+    
+    Returns:
+        Nanoseconds per trip: min, mean, p50, p90 and p99 over the runs
+    """
+    for _ in range(warmup):
+        body()
+    
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            body()
+        samples.append((time.perf_counter_ns() - start) / (number * trips_per_call))
+    
+    samples.sort()
+    return {
+        "min_ns": samples[0],
+        "mean_ns": sum(samples) / len(samples),
+        "p50_ns": percentile(samples, 50),
+        "p90_ns": percentile(samples, 90),
+        "p99_ns": percentile(samples, 99),
+        "runs": repeat,
+        "calls_per_run": number,
+        "trips_per_call": trips_per_call
+    }
+
+
+def run_benchmarks(names: Optional[List[str]] = None, warmup: int = 200,
+                   repeat: int = 30, number: int = 200) -> Dict:
+    """
+    Run the benchmark suite
+    
+    Args:
+        names: Benchmarks to run (default: all)
+        warmup, repeat, number: Passed to time_benchmark; batch benchmarks
+            use number // 100 calls per run (at least 1)
+    
+    Returns:
+        Report with environment details and per-benchmark results; cached
+        benchmarks add the quote cache hit_rate over every call, warmup included
+    """
+    results = {}
+    for name, (body, trips_per_call, cached) in build_benchmarks().items():
+        if names and name not in names:
+            continue
+        calls = number if trips_per_call == 1 else max(1, number // 100)
+        results[name] = time_benchmark(body, trips_per_call, warmup=min(warmup, calls * 10),
+                                       repeat=repeat, number=calls)
+        if cached is not None:
+            results[name]["hit_rate"] = cached.quote_cache.stats()["hit_rate"]
+    
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+
+
+def measure_startup(runs: int = 5) -> Dict:
+    """
+    Measure cold starts of the calculator in fresh interpreters
+    
+    Args:
+        runs: Interpreters started for the timings; one more runs with
+            python -X importtime for the per-module breakdown
+    
+    Returns:
+        Report with median import_ms, construct_ms, first_quote_ms and
+        cold_start_ms (their sum), every module the import loaded and the
+        slowest imports by self time
+    """
+    samples = []
+    for _ in range(runs):
+        output = _run_interpreter(["-c", _STARTUP_SCRIPT]).stdout
+        samples.append([int(value) / 1e6 for value in output.split()])
+    imported, created, quoted = (sorted(stage)[len(stage) // 2] for stage in zip(*samples))
+    
+    # -X importtime writes "import time: self [us] | cumulative | package" lines to stderr
+    modules = []
+    for line in _run_interpreter(["-X", "importtime", "-c", "import src.toll_calculator"]).stderr.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            modules.append((fields[2].strip(), int(fields[0].split(":")[1]), int(fields[1])))
+    
+    return {
+        "python": platform.python_version(),
+        "runs": runs,
+        "import_ms": imported,
+        "construct_ms": created,
+        "first_quote_ms": quoted,
+        "cold_start_ms": imported + created + quoted,
+        "imported_modules": [name for name, _, _ in modules],
+        "slowest_imports": [
+            {"module": name, "self_us": self_us, "cumulative_us": cumulative_us}
+            for name, self_us, cumulative_us in sorted(modules, key=lambda module: -module[1])[:10]
+        ]
+    }
+
+
+def format_startup_report(report: Dict) -> str:
+    """Render a startup report as text"""
+    lines = [f"{stage:<16}{report[f'{stage}_ms']:>10.3f} ms"
+             for stage in ("import", "construct", "first_quote", "cold_start")]
+    lines.append(f"{'slowest imports':<28}{'self us':>10}{'cumul us':>10}")
+    for module in report["slowest_imports"]:
+        lines.append(f"{module['module']:<28}{module['self_us']:>10}{module['cumulative_us']:>10}")
+    return "\n".join(lines)
+
+
+def measure_quote_memory(count: int = 100000, seed: int = 0) -> Dict:
+    """
+    Measure the memory each kept quote costs, in every QUOTE_FORMS form
+    
+    Trips come from the synthetic load generator, so charges and breakdown
+    lengths follow the usual traffic mix. Only what stays allocated counts:
+    the list holding the kept quotes and anything shared between quotes,
+    such as pricing cells and the trips' distances, are left out.
+    
+    Args:
+        count: Quotes kept per form
+        seed: Load generator seed
+    
+    Returns:
+        Report with bytes_per_quote for each form
+    """
+    trips = list(zip(*next(generate_trips(count, seed, chunk_size=count))))
+    quote = TollCalculator().quote
+    bytes_per_quote = {}
+    for form, keep in QUOTE_FORMS.items():
+        kept = [None] * count
+        tracemalloc.start()
+        try:
+            for index, trip in enumerate(trips):
+                kept[index] = keep(quote(*trip))
+            allocated = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+        bytes_per_quote[form] = allocated / count
+        del kept
+    return {"python": platform.python_version(), "quotes": count, "bytes_per_quote": bytes_per_quote}
+
+
+def format_memory_report(report: Dict) -> str:
+    """Render a memory report as text"""
+    return "\n".join(f"{form:<16}{size:>10.1f} bytes per quote"
+                     for form, size in report["bytes_per_quote"].items())
+
+
+def _run_interpreter(arguments: List[str]) -> subprocess.CompletedProcess:
+    """Run a fresh Python interpreter from the project root"""
+    return subprocess.run([sys.executable, *arguments], cwd=_PROJECT_ROOT, capture_output=True,
+                          text=True, check=True)
+
+
+def compare_reports(baseline: Dict, current: Dict, max_slowdown: float = 1.25) -> List[str]:
+    """
+    Compare p50 timings against a baseline report
+    
+    Returns:
+        Descriptions of the benchmarks that slowed down by more than max_slowdown
+    """
+    regressions = []
+    for name, result in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        ratio = result["p50_ns"] / previous["p50_ns"]
+        if ratio > max_slowdown:
+            regressions.append(
+                f"{name}: {previous['p50_ns']:.0f}ns -> {result['p50_ns']:.0f}ns per trip ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def format_report(report: Dict) -> str:
+    """Render a report as a fixed-width table"""
+    lines = [f"{'benchmark':<28}{'p50 ns':>10}{'p90 ns':>10}{'p99 ns':>10}{'min ns':>10}{'hit rate':>10}"]
+    for name, result in report["results"].items():
+        hit_rate = f"{result['hit_rate']:>10.1%}" if "hit_rate" in result else ""
+        lines.append(f"{name:<28}{result['p50_ns']:>10.0f}{result['p90_ns']:>10.0f}"
+                     f"{result['p99_ns']:>10.0f}{result['min_ns']:>10.0f}{hit_rate}")
+    return "\n".join(lines)
+
+
+def _git_commit() -> Optional[str]:
+    """Current git commit, if available"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark the toll calculator pricing paths")
+    parser.add_argument("benchmarks", nargs="*", help="Benchmarks to run (default: all)")
+    parser.add_argument("-o", "--output", help="Save the report to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--max-slowdown", type=float, default=1.25,
+                        help="Allowed p50 slowdown versus the baseline (default: 1.25)")
+    parser.add_argument("--repeat", type=int, default=30, help="Timed runs per benchmark")
+    parser.add_argument("--number", type=int, default=200, help="Single calls per timed run")
+    parser.add_argument("--startup", action="store_true",
+                        help="Measure cold starts instead of the pricing paths")
+    parser.add_argument("--memory", action="store_true",
+                        help="Measure the memory of kept quotes instead of the pricing paths")
+    parser.add_argument("--startup-budget-ms", type=float, default=STARTUP_BUDGET_MS,
+                        help=f"Allowed median cold start (default: {STARTUP_BUDGET_MS})")
+    args = parser.parse_args(argv)
+    
+    if args.startup:
+        report = measure_startup()
+        print(format_startup_report(report))
+        if args.output:
+            with open(args.output, "w") as stream:
+                json.dump(report, stream, indent=2)
+        if report["cold_start_ms"] > args.startup_budget_ms:
+            print(f"REGRESSION cold start {report['cold_start_ms']:.1f}ms exceeds the "
+                  f"{args.startup_budget_ms:.0f}ms budget", file=sys.stderr)
+            return 1
+        return 0
+    
+    if args.memory:
+        report = measure_quote_memory()
+        print(format_memory_report(report))
+        if args.output:
+            with open(args.output, "w") as stream:
+                json.dump(report, stream, indent=2)
+        return 0
+    
+    report = run_benchmarks(args.benchmarks, repeat=args.repeat, number=args.number)
+    print(format_report(report))
+    
+    if args.output:
+        with open(args.output, "w") as stream:
+            json.dump(report, stream, indent=2)
+    
+    if args.compare:
+        with open(args.compare) as stream:
+            regressions = compare_reports(json.load(stream), report, args.max_slowdown)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
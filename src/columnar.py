@@ -0,0 +1,309 @@
+"""
+Columnar Result Files
+
+This module writes priced trips to a compact binary columnar file and reads
+it back without parsing. Each column is a flat little-endian array, so a
+reader memory-maps the file and gets every column as a zero-copy memoryview
+that can be sliced, summed or handed to NumPy directly.
+
+Layout:
+    header      magic, format version, component count, row count and
+                tariff version, padded to 8 bytes
+    distance    float64 per row, miles as requested
+    charge      int32 per row, cents
+    components  int32 x len(COMPONENTS) per row, row-major, cents (see COMPONENTS)
+    membership  uint8 per row, MEMBERSHIP_CODES value
+    time_period uint8 per row, TIME_PERIOD_CODES value
+
+Usage:
+    python -m src.trip_pricer trips.csv --output priced.csv --columnar priced.tollcol
+"""
+
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Iterable, Union
+
+from src.tariff import Tariff
+from src.toll_calculator import (MEMBERSHIP_CODES, TIME_PERIOD_CODES, _compile_tariff,
+                                 _PricingCell, _cents_to_decimal, _decimal_to_cents)
+
+MAGIC = b"TOLLCOLS"
+
+FORMAT_VERSION = 1
+
+# Charge components in cents, in table order: base charge for the first 20
+# miles, base charge beyond 20 miles, and what the time period adds (the
+# rest of the charge, so the components of a row sum to its charge)
+COMPONENTS = ("first_20_miles", "beyond_20_miles", "time_multiplier")
+
+# magic, format version, tariff version length, component count, row count
+_HEADER = struct.Struct("<8sHHIQ")
+
+# Row count of a file whose writer has not finished
+_INCOMPLETE = 2 ** 64 - 1
+
+# Bytes per row across all columns
+_ROW_SIZE = 8 + 4 + 4 * len(COMPONENTS) + 1 + 1
+
+_MEMBERSHIPS_BY_CODE = {code: name for name, code in MEMBERSHIP_CODES.items()}
+_TIME_PERIODS_BY_CODE = {code: name for name, code in TIME_PERIOD_CODES.items()}
+
+
+class ColumnarError(ValueError):
+    """Raised when a columnar file cannot be written or read"""
+    pass
+
+
+class ColumnarWriter:
+    """
+    Streaming writer for a columnar result file
+    
+    Columns are spilled to temporary files as rows arrive, so memory stays
+    flat; close() writes the header and the columns to the destination.
+    Until then the destination holds a header marked incomplete.
+    """
+    
+    def __init__(self, path: str, tariff: Tariff):
+        """
+        Start a columnar file
+        
+        Args:
+            path: Destination file (replaced)
+            tariff: Tariff the rows are priced with, used for the components
+        """
+        self.path = path
+        self.tariff_version = tariff.version
+        self.rows = 0
+        self._plan = _compile_tariff(tariff).batch_plan
+        self._version = tariff.version.encode()
+        self._stream = open(path, "wb")
+        self._stream.write(self._header(_INCOMPLETE))
+        self._stream.flush()
+        self._spills = [tempfile.TemporaryFile() for _ in range(5)]
+    
+    def write_row(self, distance: float, membership: Union[str, int], time_period: Union[str, int],
+                  charge: Decimal):
+        """Append one priced trip"""
+        self.write_rows([(distance, membership, time_period, charge)])
+    
+    def write_records(self, records: Iterable[Dict]):
+        """Append priced trip records (with distance, membership, time_period and charge fields)"""
+        self.write_rows((float(record["distance"]), record["membership"], record["time_period"],
+                         Decimal(record["charge"])) for record in records)
+    
+    def write_rows(self, rows: Iterable[tuple]):
+        """
+        Append priced trips
+        
+        Args:
+            rows: (distance, membership, time_period, charge) tuples, with
+                membership and time period as strings or codes
+        
+        Raises:
+            ColumnarError: If the writer is closed, a row has an unknown
+                membership or time period, or a charge does not fit in int32
+        """
+        if self._stream is None:
+            raise ColumnarError("Columnar writer is closed")
+        columns = (array("d"), array("i"), array("i"), array("B"), array("B"))
+        distances, charges, components, memberships, time_periods = columns
+        try:
+            for distance, membership, time_period, charge in rows:
+                cell = self._plan.get((membership, time_period))
+                if cell is None:
+                    raise ColumnarError(f"Unknown membership or time period: {membership}, {time_period}")
+                cents = _decimal_to_cents(charge)
+                distances.append(distance)
+                charges.append(cents)
+                components.extend(_components(Decimal(str(distance)), cell, cents))
+                memberships.append(MEMBERSHIP_CODES[cell.membership.value])
+                time_periods.append(TIME_PERIOD_CODES[cell.time_period.value])
+        except OverflowError:
+            raise ColumnarError(f"Charge does not fit in the columnar format: {charge}")
+        
+        for column, spill in zip(columns, self._spills):
+            if sys.byteorder == "big":
+                column.byteswap()
+            column.tofile(spill)
+        self.rows += len(time_periods)
+    
+    def close(self) -> int:
+        """
+        Write the header and columns to the destination
+        
+        Returns:
+            Number of rows written
+        """
+        if self._stream is not None:
+            stream = self._stream
+            stream.seek(0)
+            stream.write(self._header(self.rows))
+            for spill in self._spills:
+                spill.seek(0)
+                shutil.copyfileobj(spill, stream)
+            stream.truncate()
+            self._finish()
+        return self.rows
+    
+    def abort(self):
+        """Stop writing, leaving the destination marked incomplete"""
+        if self._stream is not None:
+            self._finish()
+    
+    def _finish(self):
+        """Close the destination and drop the spill files"""
+        self._stream.close()
+        self._stream = None
+        for spill in self._spills:
+            spill.close()
+    
+    def _header(self, rows: int) -> bytes:
+        """Header bytes for a row count, padded to 8 bytes"""
+        header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(self._version), len(COMPONENTS), rows) + self._version
+        return header + bytes(-len(header) % 8)
+    
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class ColumnarResults:
+    """
+    Memory-mapped, read-only view of a columnar result file
+    
+    Columns are memoryviews over the mapped file: slicing them copies
+    nothing. The components column packs len(COMPONENTS) values per row;
+    component() gives one of them for every row. Release any slices taken from them before calling close().
+    """
+    
+    def __init__(self, path: str):
+        """
+        Map a columnar file
+        
+        Args:
+            path: File written by ColumnarWriter
+        
+        Raises:
+            ColumnarError: If the file is not a columnar file, is incomplete
+                or is truncated
+        """
+        if sys.byteorder == "big":
+            raise ColumnarError("Columnar files can only be mapped on little-endian hosts")
+        try:
+            with open(path, "rb") as stream:
+                self._mmap = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            raise ColumnarError(f"Cannot open columnar file {path}: {e}")
+        
+        try:
+            header = self._read_header(path)
+        except ColumnarError:
+            self._mmap.close()
+            raise
+        
+        offset, self.tariff_version, self.rows = header
+        view = memoryview(self._mmap)
+        self.distances = view[offset:offset + 8 * self.rows].cast("d")
+        offset += 8 * self.rows
+        self.charges = view[offset:offset + 4 * self.rows].cast("i")
+        offset += 4 * self.rows
+        self.components = view[offset:offset + 4 * len(COMPONENTS) * self.rows].cast("i")
+        offset += 4 * len(COMPONENTS) * self.rows
+        self.memberships = view[offset:offset + self.rows]
+        offset += self.rows
+        self.time_periods = view[offset:offset + self.rows]
+        view.release()
+    
+    def _read_header(self, path: str) -> tuple:
+        """Validate the header and file size; return (column offset, tariff version, rows)"""
+        if len(self._mmap) < _HEADER.size:
+            raise ColumnarError(f"Not a columnar file: {path}")
+        magic, format_version, version_length, component_count, rows = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ColumnarError(f"Not a columnar file: {path}")
+        if format_version != FORMAT_VERSION or component_count != len(COMPONENTS):
+            raise ColumnarError(f"Unsupported columnar format version {format_version}: {path}")
+        if rows == _INCOMPLETE:
+            raise ColumnarError(f"Columnar file is incomplete: {path}")
+        
+        end = _HEADER.size + version_length
+        offset = end + (-end % 8)
+        expected_size = offset + rows * _ROW_SIZE
+        if len(self._mmap) != expected_size:
+            raise ColumnarError(f"Columnar file is truncated: {path} has {len(self._mmap)} bytes, "
+                                f"expected {expected_size} for {rows} rows")
+        return offset, self._mmap[_HEADER.size:end].decode(), rows
+    
+    def __len__(self) -> int:
+        return self.rows
+    
+    def row(self, index: int) -> Dict[str, Union[str, float, int]]:
+        """
+        Decode one row
+        
+        Returns:
+            Dictionary with distance, membership, time_period, the charge as
+            a dollar string and each component in cents
+        """
+        if not -self.rows <= index < self.rows:
+            raise IndexError(f"Row {index} out of range for {self.rows} rows")
+        index %= self.rows
+        record = {
+            "distance": self.distances[index],
+            "membership": _MEMBERSHIPS_BY_CODE[self.memberships[index]],
+            "time_period": _TIME_PERIODS_BY_CODE[self.time_periods[index]],
+            "charge": str(_cents_to_decimal(self.charges[index]))
+        }
+        for column, name in enumerate(COMPONENTS):
+            record[name] = self.components[index * len(COMPONENTS) + column]
+        return record
+    
+    def component(self, name: str) -> memoryview:
+        """
+        One component of every row, as a strided zero-copy view
+        
+        Args:
+            name: One of COMPONENTS
+        """
+        if name not in COMPONENTS:
+            raise ColumnarError(f"Unknown component: {name}")
+        return self.components[COMPONENTS.index(name)::len(COMPONENTS)]
+    
+    def close(self):
+        """Release the columns and unmap the file"""
+        for column in (self.distances, self.charges, self.components, self.memberships, self.time_periods):
+            column.release()
+        self._mmap.close()
+    
+    def __enter__(self) -> "ColumnarResults":
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _components(distance: Decimal, cell: _PricingCell, cents: int) -> tuple:
+    """Component amounts in cents for one priced trip (see COMPONENTS)"""
+    first_20_miles = min(distance, Decimal("20"))
+    beyond_20_miles = max(distance - Decimal("20"), Decimal("0"))
+    # Tiers the time period makes free (Gold's first 20 miles) have no base charge
+    first_20_rate = cell.first_20_base_rate if cell.first_20_rate else Decimal("0")
+    beyond_20_rate = cell.beyond_20_base_rate if cell.beyond_20_rate else Decimal("0")
+    first_20 = _to_cents(first_20_miles * first_20_rate)
+    beyond_20 = _to_cents(beyond_20_miles * beyond_20_rate)
+    return first_20, beyond_20, cents - first_20 - beyond_20
+
+
+def _to_cents(amount: Decimal) -> int:
+    """Round an amount half up to integer cents"""
+    return _decimal_to_cents(amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
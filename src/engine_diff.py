@@ -0,0 +1,122 @@
+"""
+Pricing Engine Differential Check
+
+This module runs the Decimal and fixed-point pricing engines side by side
+over edge-case and seeded random trips and reports every trip where the
+two disagree on the charge or the error raised. Breakdowns are not
+compared: both engines build them from the same Decimal arithmetic.
+
+Usage:
+    python -m src.engine_diff --count 100000 --seed 1
+"""
+
+import argparse
+import random
+import sys
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.toll_calculator import MEMBERSHIP_CODES, TIME_PERIOD_CODES, TollCalculator
+
+# Distances around the tier boundary, rounding boundaries and the limits of
+# the integer representation
+EDGE_CASE_DISTANCES = (
+    0.001, 0.0025, 0.005, 0.0049, 0.1, 0.3, 1, 1.005, 2.675,
+    19.999, 20, 20.0, 20.0001, 20.001, 20.005, 20.0049, 25.555,
+    9999, 9999.0, 9999.999, 123456.789, 999999999999, 1e12, 1e15, 1e-7,
+    Decimal("20.0"), Decimal("20.001"), Decimal("0.0025"), Decimal("1E+3"),
+    0, -1, -0.001, float("nan"), float("inf")
+)
+
+# Membership and time period values, including invalid ones
+MEMBERSHIPS = tuple(MEMBERSHIP_CODES) + ("Platinum",)
+TIME_PERIODS = tuple(TIME_PERIOD_CODES) + ("midnight",)
+
+
+def edge_case_trips() -> Iterator[Tuple]:
+    """Every edge-case distance for every membership and time period"""
+    for distance in EDGE_CASE_DISTANCES:
+        for membership in MEMBERSHIPS:
+            for time_period in TIME_PERIODS:
+                yield distance, membership, time_period
+
+
+def random_trips(count: int, seed: int = 0) -> Iterator[Tuple]:
+    """
+    Generate seeded random trips
+    
+    Distances are mostly short and medium trips with up to four decimal
+    places, mixed with whole miles, distances just either side of 20 miles
+    and very long trips. Invalid memberships and time periods are rare.
+    """
+    rng = random.Random(seed)
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.5:
+            distance = round(rng.uniform(0, 60), rng.randint(0, 4))
+        elif kind < 0.65:
+            distance = rng.randint(1, 100)
+        elif kind < 0.85:
+            distance = round(20 + rng.randint(-50, 50) * 0.001, 3)
+        elif kind < 0.95:
+            distance = round(rng.uniform(0, 10000), rng.randint(0, 6))
+        else:
+            distance = Decimal(rng.randint(1, 10 ** 7)).scaleb(-rng.randint(0, 5))
+        membership = rng.choice(MEMBERSHIPS) if rng.random() < 0.02 else rng.choice(MEMBERSHIPS[:-1])
+        time_period = rng.choice(TIME_PERIODS) if rng.random() < 0.02 else rng.choice(TIME_PERIODS[:-1])
+        yield distance, membership, time_period
+
+
+def _outcome(calculator: TollCalculator, trip: Tuple) -> Tuple:
+    """Charge of a trip, or the type and message of its error"""
+    try:
+        return "charge", str(calculator.quote(*trip).charge)
+    except Exception as e:
+        return "error", type(e).__name__, str(e)
+
+
+def compare_engines(trips: Iterable[Tuple]) -> Tuple[int, List[Dict]]:
+    """
+    Price trips with both engines and collect the disagreements
+    
+    Args:
+        trips: (distance, membership, time_period) tuples
+    
+    Returns:
+        Number of trips compared and a list of mismatches, each with the trip
+        and both engines' outcomes
+    """
+    decimal_engine = TollCalculator(engine="decimal")
+    fixed_engine = TollCalculator(engine="fixed")
+    
+    compared = 0
+    mismatches = []
+    for trip in trips:
+        compared += 1
+        expected = _outcome(decimal_engine, trip)
+        actual = _outcome(fixed_engine, trip)
+        if actual != expected:
+            mismatches.append({"trip": trip, "decimal": expected, "fixed": actual})
+    return compared, mismatches
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Compare the Decimal and fixed-point pricing engines")
+    parser.add_argument("--count", type=int, default=100000, help="Random trips to compare (default: 100000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    args = parser.parse_args(argv)
+    
+    trips = list(edge_case_trips())
+    trips += random_trips(args.count, args.seed)
+    compared, mismatches = compare_engines(trips)
+    
+    for mismatch in mismatches:
+        print(f"MISMATCH {mismatch['trip']!r}: decimal={mismatch['decimal']} "
+              f"fixed={mismatch['fixed']}", file=sys.stderr)
+    print(f"Compared {compared} trips, {len(mismatches)} mismatches")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Pricing Instrumentation
+
+This module provides optional per-stage timing counters for TollCalculator.
+When a calculator is created with metrics, each pricing stage records its
+call count and cumulative nanoseconds, and validation errors are counted
+by kind (see toll_calculator.ERROR_KINDS), never by the caller's input. Calculators without metrics skip all of this.
+"""
+
+from threading import Lock
+from typing import Dict, Iterable, Tuple
+
+# Stages recorded by the calculator, in pricing order
+STAGES = (
+    "cache",          # quote cache lookup
+    "validate",       # distance check and pricing plan lookup
+    "convert",        # Decimal conversion of the distance
+    "price",          # piecewise-linear charge evaluation
+    "quantize",       # rounding to cents
+    "breakdown",      # breakdown row formatting
+    "batch",          # calculate_tolls_cents call
+    "batch_decimal"   # cents to Decimal conversion in calculate_tolls
+)
+
+
+class PricingMetrics:
+    """
+    Call counts and cumulative nanoseconds per pricing stage, plus error counts
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear every counter"""
+        with self._lock:
+            self.stage_calls = {stage: 0 for stage in STAGES}
+            self.stage_ns = {stage: 0 for stage in STAGES}
+            self.batch_rows = 0
+            self.errors = {}
+
+    def record(self, stage: str, elapsed_ns: int):
+        """Record one call of a stage"""
+        with self._lock:
+            self.stage_calls[stage] += 1
+            self.stage_ns[stage] += elapsed_ns
+
+    def record_stages(self, timings: Iterable[Tuple[str, int]]):
+        """Record one call of each (stage, elapsed_ns) pair under a single lock"""
+        with self._lock:
+            for stage, elapsed_ns in timings:
+                self.stage_calls[stage] += 1
+                self.stage_ns[stage] += elapsed_ns
+
+    def record_batch(self, rows: int, elapsed_ns: int):
+        """Record one batch call pricing the given number of rows"""
+        with self._lock:
+            self.stage_calls["batch"] += 1
+            self.stage_ns["batch"] += elapsed_ns
+            self.batch_rows += rows
+
+    def record_error(self, kind: str):
+        """Count a validation error by its kind, such as invalid_time_period"""
+        with self._lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def snapshot(self) -> Dict:
+        """
+        Get a copy of the counters
+
+        Returns:
+            Dictionary with per-stage calls and total_ns, batch_rows and
+            error counts by kind
+        """
+        with self._lock:
+            return {
+                "stages": {
+                    stage: {"calls": self.stage_calls[stage], "total_ns": self.stage_ns[stage]}
+                    for stage in STAGES
+                },
+                "batch_rows": self.batch_rows,
+                "errors": dict(self.errors)
+            }
+
+    def to_prometheus(self, prefix: str = "toll_pricing") -> str:
+        """
+        Render the counters in the Prometheus text exposition format
+
+        Args:
+            prefix: Metric name prefix
+
+        Returns:
+            Exposition text ending with a newline
+        """
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_calls_total Pricing stage calls.",
+            f"# TYPE {prefix}_stage_calls_total counter"
+        ]
+        for stage, counters in snapshot["stages"].items():
+            lines.append(f'{prefix}_stage_calls_total{{stage="{stage}"}} {counters["calls"]}')
+
+        lines += [
+            f"# HELP {prefix}_stage_seconds_total Cumulative time spent in each pricing stage.",
+            f"# TYPE {prefix}_stage_seconds_total counter"
+        ]
+        for stage, counters in snapshot["stages"].items():
+            lines.append(f'{prefix}_stage_seconds_total{{stage="{stage}"}} {counters["total_ns"] / 1e9:.9f}')
+
+        lines += [
+            f"# HELP {prefix}_batch_rows_total Trips priced by batch calls.",
+            f"# TYPE {prefix}_batch_rows_total counter",
+            f"{prefix}_batch_rows_total {snapshot['batch_rows']}",
+            f"# HELP {prefix}_errors_total Pricing errors by kind.",
+            f"# TYPE {prefix}_errors_total counter"
+        ]
+        for kind, count in sorted(snapshot["errors"].items()):
+            lines.append(f'{prefix}_errors_total{{kind="{_escape_label(kind)}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    """Escape a Prometheus label value"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
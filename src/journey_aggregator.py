@@ -0,0 +1,389 @@
+"""
+Journey Aggregator
+
+This module groups a stream of gantry events into journeys and prices each
+journey as one trip, so the 20-mile tier applies across the whole journey
+rather than per segment. Events are grouped per account and vehicle: a
+journey closes when its vehicle has been quiet for the journey gap, and is
+emitted as soon as it closes. Journeys are rolled up into per-account daily
+totals, optionally capped. Memory is bounded by the number of vehicles with
+an open journey.
+
+Usage:
+    python -m src.journey_aggregator events.csv --output journeys.csv --daily daily.csv
+"""
+
+import argparse
+import math
+import sys
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+from src.toll_calculator import MEMBERSHIP_CODES, TIME_PERIOD_CODES, TollCalculationError, TollCalculator
+from src.trip_pricer import RecordWriter, detect_format, read_trips, reject_record
+
+# Fields every gantry event record must provide; time_period is optional
+EVENT_FIELDS = ("account", "vehicle", "timestamp", "distance", "membership")
+
+# Seconds without an event after which a vehicle's journey is closed
+DEFAULT_JOURNEY_GAP = 30 * 60
+
+# Open journeys kept before the least recently active one is closed early
+DEFAULT_MAX_ACTIVE_VEHICLES = 100000
+
+
+class GantryEvent(NamedTuple):
+    """One gantry read: a vehicle travelled a segment of the road"""
+    account: str
+    vehicle: str
+    # Seconds since the epoch
+    timestamp: float
+    # Segment length in miles
+    distance: float
+    membership: str
+    # Classified from the timestamp when not given
+    time_period: Optional[str] = None
+
+
+class PricedJourney(NamedTuple):
+    """A closed journey priced as a single trip"""
+    account: str
+    vehicle: str
+    start: float
+    end: float
+    segments: int
+    distance: Decimal
+    membership: str
+    # Time period of the first event; the whole journey is priced at entry time
+    time_period: str
+    tariff_version: str
+    charge: Decimal
+    # Charge after the daily cap
+    billed: Decimal
+
+
+class DailyTotal(NamedTuple):
+    """Journeys and charges of one account on one (UTC) day"""
+    account: str
+    day: date
+    journeys: int
+    charge: Decimal
+    billed: Decimal
+
+
+class _OpenJourney:
+    """Mutable state of a journey that is still collecting events"""
+    __slots__ = ("account", "vehicle", "membership", "time_period", "start", "end", "segments", "distance")
+    
+    def __init__(self, event: GantryEvent):
+        self.account = event.account
+        self.vehicle = event.vehicle
+        self.membership = event.membership
+        self.time_period = event.time_period
+        self.start = event.timestamp
+        self.end = event.timestamp
+        self.segments = 1
+        # Summed as Decimal so many short segments add up exactly
+        self.distance = Decimal(str(event.distance))
+    
+    def extend(self, event: GantryEvent):
+        """Add a later segment of the same journey"""
+        self.end = max(self.end, event.timestamp)
+        self.segments += 1
+        self.distance += Decimal(str(event.distance))
+
+
+class JourneyAggregator:
+    """
+    Incremental grouping of gantry events into priced journeys and daily totals
+    
+    Events are expected in (roughly) timestamp order. Each call to add()
+    returns the journeys that closed because of that event.
+    """
+    
+    def __init__(self, calculator: Optional[TollCalculator] = None,
+                 journey_gap: float = DEFAULT_JOURNEY_GAP,
+                 max_active_vehicles: int = DEFAULT_MAX_ACTIVE_VEHICLES,
+                 daily_cap: Optional[Decimal] = None):
+        """
+        Create an aggregator
+        
+        Args:
+            calculator: Calculator used to price journeys (a new one by default)
+            journey_gap: Seconds without an event that end a journey
+            max_active_vehicles: Open journeys kept in memory; beyond this the
+                least recently active journey is closed early
+            daily_cap: Most an account is billed per day (None for no cap)
+        """
+        if max_active_vehicles <= 0:
+            raise ValueError("Active vehicle limit must be greater than 0")
+        self.calculator = calculator or TollCalculator()
+        self.journey_gap = journey_gap
+        self.max_active_vehicles = max_active_vehicles
+        self.daily_cap = daily_cap
+        # Latest event time seen
+        self.watermark = None
+        # Days before this one have had their totals popped; events that
+        # would start a journey on them are rejected as late
+        self.first_open_day = None
+        # Open journeys by (account, vehicle), least recently active first
+        self._active = OrderedDict()
+        # (account, day) -> [journeys, charge, billed]
+        self._daily = {}
+    
+    @property
+    def active_vehicles(self) -> int:
+        """Number of vehicles with an open journey"""
+        return len(self._active)
+    
+    def add(self, event: GantryEvent) -> List[PricedJourney]:
+        """
+        Add one gantry event
+        
+        Args:
+            event: The event to add
+        
+        Returns:
+            Journeys closed by this event, in closing order
+        
+        Raises:
+            TollCalculationError: If the event is invalid, or would start a
+                journey on a day whose totals were already popped (it is not added)
+        """
+        if event.time_period is None:
+            event = event._replace(time_period=self.calculator.schedule.classify(event.timestamp).value)
+        _validate_event(event)
+        closed = []
+        key = (event.account, event.vehicle)
+        journey = self._active.get(key)
+        new_journey = journey is None or event.timestamp - journey.end > self.journey_gap
+        
+        if new_journey and self.first_open_day is not None:
+            day = _utc_day(event.timestamp)
+            if day < self.first_open_day:
+                raise TollCalculationError(f"Late event for closed day {day.isoformat()}")
+        
+        if journey is not None and new_journey:
+            # The vehicle has been quiet long enough: this is a new journey
+            del self._active[key]
+            closed.append(self._close(journey))
+            journey = None
+        
+        if journey is None:
+            self._active[key] = _OpenJourney(event)
+            if len(self._active) > self.max_active_vehicles:
+                closed.append(self._close(self._active.popitem(last=False)[1]))
+        else:
+            journey.extend(event)
+            self._active.move_to_end(key)
+        
+        if self.watermark is None or event.timestamp > self.watermark:
+            self.watermark = event.timestamp
+        
+        # Close journeys of vehicles that have been quiet for the gap
+        horizon = self.watermark - self.journey_gap
+        while self._active:
+            oldest = next(iter(self._active.values()))
+            if oldest.end >= horizon:
+                break
+            self._active.popitem(last=False)
+            closed.append(self._close(oldest))
+        return closed
+    
+    def flush(self) -> List[PricedJourney]:
+        """Close and return every open journey (at the end of the stream)"""
+        closed = [self._close(journey) for journey in self._active.values()]
+        self._active.clear()
+        return closed
+    
+    def pop_daily_totals(self, final: bool = False) -> List[DailyTotal]:
+        """
+        Remove and return the daily totals that can no longer change
+        
+        A day is complete once every open journey, and any journey a new event
+        could still start, begins on a later day. Once a day's totals are
+        popped, add() rejects events that would start a journey on it.
+        
+        Args:
+            final: Return every remaining total (after flush at the end of the stream)
+        
+        Returns:
+            Completed daily totals, ordered by day and account
+        """
+        if final:
+            days = list(self._daily)
+        else:
+            if self.watermark is None:
+                return []
+            bound = self.watermark - self.journey_gap
+            for journey in self._active.values():
+                bound = min(bound, journey.start)
+            first_open_day = _utc_day(bound)
+            days = [key for key in self._daily if key[1] < first_open_day]
+            self._close_days(first_open_day)
+        
+        totals = []
+        for key in sorted(days, key=lambda key: (key[1], key[0])):
+            journeys, charge, billed = self._daily.pop(key)
+            totals.append(DailyTotal(key[0], key[1], journeys, charge, billed))
+        if final and totals:
+            self._close_days(totals[-1].day + timedelta(days=1))
+        return totals
+    
+    def _close_days(self, first_open_day: date):
+        """Move the closed-day watermark forward (it never moves back)"""
+        if self.first_open_day is None or first_open_day > self.first_open_day:
+            self.first_open_day = first_open_day
+    
+    def _close(self, journey: _OpenJourney) -> PricedJourney:
+        """Price a finished journey and add it to its account's daily total"""
+        quote = self.calculator.quote(journey.distance, journey.membership, journey.time_period)
+        charge = quote.charge
+        
+        totals = self._daily.setdefault((journey.account, _utc_day(journey.start)),
+                                        [0, Decimal("0.00"), Decimal("0.00")])
+        billed = charge
+        if self.daily_cap is not None:
+            billed = max(Decimal("0.00"), min(charge, self.daily_cap - totals[2]))
+        totals[0] += 1
+        totals[1] += charge
+        totals[2] += billed
+        
+        return PricedJourney(
+            journey.account, journey.vehicle, journey.start, journey.end, journey.segments,
+            journey.distance, journey.membership, journey.time_period, quote.tariff_version,
+            charge, billed
+        )
+
+
+def aggregate_events(events: Iterable[GantryEvent], aggregator: Optional[JourneyAggregator] = None
+                     ) -> Iterator[PricedJourney]:
+    """
+    Stream events through an aggregator
+    
+    Yields:
+        Priced journeys as they close, then the journeys still open at the end
+    """
+    aggregator = aggregator or JourneyAggregator()
+    for event in events:
+        yield from aggregator.add(event)
+    yield from aggregator.flush()
+
+
+def parse_event(record: Dict) -> GantryEvent:
+    """
+    Build a gantry event from a CSV or JSON Lines record
+    
+    Raises:
+        TollCalculationError: If a field is missing or a number is invalid
+    """
+    if not isinstance(record, dict):
+        raise TollCalculationError("Not a JSON object")
+    for field in EVENT_FIELDS:
+        if record.get(field) is None:
+            raise TollCalculationError(f"Missing field: {field}")
+    
+    numbers = {}
+    for field in ("timestamp", "distance"):
+        try:
+            numbers[field] = float(record[field])
+        except (TypeError, ValueError):
+            numbers[field] = math.nan
+        if isinstance(record[field], bool) or not math.isfinite(numbers[field]):
+            raise TollCalculationError(f"Invalid {field}: {record[field]}")
+    return GantryEvent(str(record["account"]), str(record["vehicle"]), numbers["timestamp"],
+                       numbers["distance"], record["membership"], record.get("time_period") or None)
+
+
+def as_record(row: NamedTuple) -> Dict:
+    """Convert a PricedJourney or DailyTotal to a record for RecordWriter"""
+    return {field: str(value) if isinstance(value, (Decimal, date)) else value
+            for field, value in row._asdict().items()}
+
+
+def _validate_event(event: GantryEvent):
+    """Reject events that would fail when their journey is priced"""
+    if not event.distance > 0:
+        raise TollCalculationError("Distance must be greater than 0")
+    if not isinstance(event.membership, str) or event.membership not in MEMBERSHIP_CODES:
+        raise TollCalculationError("Invalid membership type")
+    if not isinstance(event.time_period, str) or event.time_period not in TIME_PERIOD_CODES:
+        raise TollCalculationError(f"Invalid time period: {event.time_period}")
+
+
+def _daily_cap(value: str) -> Decimal:
+    """Parse the --daily-cap argument"""
+    try:
+        cap = Decimal(value)
+    except InvalidOperation:
+        cap = Decimal("NaN")
+    if not cap.is_finite() or cap < 0:
+        raise argparse.ArgumentTypeError(f"invalid daily cap: {value}")
+    return cap
+
+
+def _utc_day(timestamp: float) -> date:
+    """UTC calendar day of a timestamp"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).date()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Group gantry events into priced journeys")
+    parser.add_argument("input", nargs="?", default="-", help="Gantry event log (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Priced journeys destination (default: stdout)")
+    parser.add_argument("-d", "--daily", default=None, help="Daily totals destination (default: not written)")
+    parser.add_argument("-r", "--rejects", default=None,
+                        help="Rejected events destination (default: stderr)")
+    parser.add_argument("-f", "--format", choices=["csv", "jsonl"], default=None,
+                        help="Event log format (default: from the input file extension, else csv)")
+    parser.add_argument("--journey-gap", type=float, default=DEFAULT_JOURNEY_GAP,
+                        help=f"Seconds without an event that end a journey (default: {DEFAULT_JOURNEY_GAP})")
+    parser.add_argument("--max-active-vehicles", type=int, default=DEFAULT_MAX_ACTIVE_VEHICLES,
+                        help="Open journeys kept in memory before the oldest is closed early")
+    parser.add_argument("--daily-cap", type=_daily_cap, default=None,
+                        help="Most an account is billed per day (default: no cap)")
+    args = parser.parse_args(argv)
+    
+    file_format = args.format or detect_format(args.input if args.input != "-" else None)
+    aggregator = JourneyAggregator(journey_gap=args.journey_gap,
+                                   max_active_vehicles=args.max_active_vehicles,
+                                   daily_cap=args.daily_cap)
+    
+    input_stream = sys.stdin if args.input == "-" else open(args.input, newline="")
+    output_stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    rejects_stream = sys.stderr if args.rejects is None else open(args.rejects, "w", newline="")
+    daily_stream = open(args.daily, "w", newline="") if args.daily else None
+    journeys = RecordWriter(output_stream, file_format, "billed")
+    rejects = RecordWriter(rejects_stream, file_format, "error")
+    daily = RecordWriter(daily_stream, file_format, "billed") if daily_stream else None
+    
+    def write(closed: List[PricedJourney], final: bool = False):
+        journeys.write_chunk([as_record(journey) for journey in closed])
+        totals = aggregator.pop_daily_totals(final)
+        if daily is not None:
+            daily.write_chunk([as_record(total) for total in totals])
+    
+    try:
+        for record in read_trips(input_stream, file_format):
+            try:
+                closed = aggregator.add(parse_event(record))
+            except TollCalculationError as e:
+                rejects.write_chunk([reject_record(record, str(e))])
+                continue
+            if closed:
+                write(closed)
+        write(aggregator.flush(), final=True)
+    finally:
+        for stream in (input_stream, output_stream, rejects_stream, daily_stream):
+            if stream not in (None, sys.stdin, sys.stdout, sys.stderr):
+                stream.close()
+    
+    print(f"Priced {journeys.count} journeys, rejected {rejects.count} events", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
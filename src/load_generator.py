@@ -0,0 +1,364 @@
+"""
+Synthetic Load Generator
+
+This module generates seeded synthetic traffic shaped like real toll
+traffic and streams it through every pricing path: single quotes with
+each engine, batches, the quote cache and worker processes. Every path's
+charges are compared with calculate_toll trip by trip, and each path's
+throughput is reported. Traffic is generated and priced in chunks, so
+millions of trips run in flat memory, and the same seed always produces
+the same trips.
+
+The traffic mix:
+    distance    mostly local trips (log-normal around 9 miles), a large
+                share clustered either side of the 20-mile tier boundary
+                and a long-distance tail, in hundredths of a mile
+    membership  MEMBERSHIP_SHARES
+    time period event times follow a weekday and weekend diurnal traffic
+                curve and are classified with the time period schedule
+
+Usage:
+    python -m src.load_generator --trips 1000000 --seed 1
+    python -m src.load_generator --trips 200000 --paths batch,parallel --output load.json
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from array import array
+from bisect import bisect
+from datetime import datetime, timezone
+from decimal import Decimal
+from itertools import accumulate
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence
+
+from src.parallel_pricing import calculate_tolls_cents_parallel
+from src.time_periods import TimePeriodSchedule, load_schedule
+from src.toll_calculator import TIME_PERIOD_CODES, TollCalculator, _decimal_to_cents
+
+# Pricing paths checked against calculate_toll
+PATHS = ("single", "single_fixed", "batch", "cached", "parallel")
+
+# Trips generated and priced at a time
+DEFAULT_CHUNK_SIZE = 100000
+
+# Quotes memoized by the cached path
+DEFAULT_CACHE_SIZE = 4096
+
+# Share of trips by membership level
+MEMBERSHIP_SHARES = {"non": 0.55, "Silver": 0.30, "Gold": 0.15}
+
+# Shares of local trips and of trips near the tier boundary; the rest are long
+LOCAL_TRIP_SHARE = 0.55
+BOUNDARY_TRIP_SHARE = 0.30
+
+# Median local trip, spread of trips around the boundary, and mean miles a
+# long trip goes beyond it
+LOCAL_MEDIAN_MILES = 9.0
+BOUNDARY_SPREAD_MILES = 1.5
+LONG_TRIP_EXTRA_MILES = 30.0
+
+# Relative traffic in each hour of the day
+WEEKDAY_HOURLY_TRAFFIC = (
+    0.6, 0.4, 0.3, 0.3, 0.5, 1.5, 4.0, 7.5, 7.8, 5.0, 4.2, 4.3,
+    4.5, 4.5, 4.8, 5.5, 6.8, 7.8, 7.2, 4.8, 3.3, 2.5, 1.8, 1.1
+)
+WEEKEND_HOURLY_TRAFFIC = (
+    1.0, 0.7, 0.5, 0.4, 0.4, 0.6, 1.2, 2.0, 3.2, 4.5, 5.5, 6.2,
+    6.5, 6.5, 6.3, 6.1, 5.8, 5.4, 4.8, 4.0, 3.2, 2.6, 2.0, 1.4
+)
+
+# Weekend days carry this fraction of a weekday's traffic
+WEEKEND_TRAFFIC_SHARE = 0.75
+
+# Mismatches listed in a report (all are counted)
+MAX_REPORTED_MISMATCHES = 20
+
+# Event times fall in the week starting Monday 2026-01-05 (UTC)
+_WEEK_START = datetime(2026, 1, 5, tzinfo=timezone.utc).timestamp()
+
+_TIME_PERIODS_BY_CODE = {code: name for name, code in TIME_PERIOD_CODES.items()}
+
+
+class TripChunk(NamedTuple):
+    """Columns of generated trips, in the batch API's layout"""
+    distances: List[float]
+    memberships: List[str]
+    time_periods: List[str]
+
+
+def generate_trips(count: int, seed: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   schedule: Optional[TimePeriodSchedule] = None) -> Iterator[TripChunk]:
+    """
+    Generate seeded synthetic trips in chunks
+    
+    Args:
+        count: Trips to generate
+        seed: Random seed; the same seed gives the same trips whatever the
+            chunk size
+        chunk_size: Trips per chunk
+        schedule: Schedule classifying the event times (default: the
+            standard schedule)
+    
+    Yields:
+        TripChunk of up to chunk_size trips
+    """
+    rng = random.Random(seed)
+    schedule = schedule or load_schedule()
+    memberships = list(MEMBERSHIP_SHARES)
+    membership_weights = list(accumulate(MEMBERSHIP_SHARES.values()))
+    hour_weights = _hour_of_week_weights()
+    
+    for start in range(0, count, chunk_size):
+        chunk = TripChunk([], [], [])
+        timestamps = []
+        # Every trip draws its fields in the same order, so chunking does not change the sequence
+        for _ in range(min(chunk_size, count - start)):
+            chunk.distances.append(_distance(rng))
+            hour = bisect(hour_weights, rng.random() * hour_weights[-1])
+            timestamps.append(_WEEK_START + (hour + rng.random()) * 3600)
+            chunk.memberships.append(memberships[bisect(membership_weights, rng.random() * membership_weights[-1])])
+        chunk.time_periods.extend(_TIME_PERIODS_BY_CODE[code] for code in schedule.classify_many(timestamps))
+        yield chunk
+
+
+def run_load(count: int, seed: int = 0, paths: Sequence[str] = PATHS, chunk_size: int = DEFAULT_CHUNK_SIZE,
+             workers: Optional[int] = None, cache_size: int = DEFAULT_CACHE_SIZE) -> Dict:
+    """
+    Stream generated trips through pricing paths and compare them with calculate_toll
+    
+    Args:
+        count: Trips to generate
+        seed: Random seed
+        paths: Pricing paths to run, from PATHS
+        chunk_size: Trips generated and priced at a time
+        workers: Worker processes for the parallel path (default: one per CPU)
+        cache_size: Quotes memoized by the cached path
+    
+    Returns:
+        Report with the traffic mix, per-path throughput and mismatch counts
+        ("reference" is calculate_toll itself), cache statistics and the
+        first mismatches
+    
+    Raises:
+        ValueError: If a path is unknown
+    """
+    unknown = [path for path in paths if path not in PATHS]
+    if unknown:
+        raise ValueError(f"Unknown pricing paths: {', '.join(unknown)}")
+    
+    reference = TollCalculator()
+    calculators = {
+        "single": TollCalculator(),
+        "single_fixed": TollCalculator(engine="fixed"),
+        "batch": TollCalculator(),
+        "cached": TollCalculator(cache_size=cache_size)
+    }
+    if "parallel" in paths:
+        workers = workers or os.cpu_count() or 1
+    
+    results = {path: {"trips": 0, "seconds": 0.0, "mismatches": 0} for path in ("reference",) + tuple(paths)}
+    mix = _MixCounter()
+    mismatches = []
+    for chunk in generate_trips(count, seed, chunk_size):
+        mix.add(chunk)
+        start = time.perf_counter()
+        charges = [reference.calculate_toll(*trip) for trip in zip(*chunk)]
+        _record(results["reference"], len(charges), time.perf_counter() - start)
+        expected = [_decimal_to_cents(charge) for charge in charges]
+        
+        for path in paths:
+            start = time.perf_counter()
+            if path == "parallel":
+                charges = _price_parallel(chunk, workers)
+            else:
+                charges = _price(calculators[path], path, chunk)
+            _record(results[path], len(charges), time.perf_counter() - start)
+            actual = charges.tolist() if isinstance(charges, array) else [
+                _decimal_to_cents(charge) for charge in charges]
+            if actual != expected:
+                _collect_mismatches(results[path], mismatches, path, chunk, expected, actual)
+    
+    for result in results.values():
+        result["trips_per_second"] = result["trips"] / result["seconds"] if result["seconds"] else 0.0
+    return {
+        "trips": count,
+        "seed": seed,
+        "chunk_size": chunk_size,
+        "workers": workers,
+        "mix": mix.shares(),
+        "paths": results,
+        "cache": calculators["cached"].quote_cache.stats() if "cached" in paths else None,
+        "mismatches": mismatches
+    }
+
+
+def format_load_report(report: Dict) -> str:
+    """Render a load report: the traffic mix, then one row per path"""
+    mix = report["mix"]
+    lines = [f"Traffic: {report['trips']} trips, seed {report['seed']}"]
+    for name in ("membership", "time_period"):
+        shares = "  ".join(f"{value} {share:.1%}" for value, share in mix[name].items())
+        lines.append(f"  {name:<12}{shares}")
+    distance = mix["distance"]
+    lines.append(f"  {'distance':<12}mean {distance['mean_miles']:.1f} mi, median {distance['median_miles']:.2f} mi, "
+                 f"{distance['up_to_20_miles']:.1%} up to 20 mi, "
+                 f"{distance['within_2_miles_of_20']:.1%} within 2 mi of 20")
+    lines.append(f"{'path':<16}{'trips/s':>12}{'seconds':>10}{'mismatches':>12}")
+    for path, result in report["paths"].items():
+        lines.append(f"{path:<16}{result['trips_per_second']:>12.0f}{result['seconds']:>10.2f}"
+                     f"{result['mismatches']:>12}")
+    if report["cache"] is not None:
+        lines.append(f"cache hit rate {report['cache']['hit_rate']:.1%}")
+    return "\n".join(lines)
+
+
+class _MixCounter:
+    """Running counts of the generated traffic mix"""
+    
+    def __init__(self):
+        self.trips = 0
+        self.memberships = dict.fromkeys(MEMBERSHIP_SHARES, 0)
+        self.time_periods = dict.fromkeys(TIME_PERIOD_CODES, 0)
+        self.total_miles = 0.0
+        self.up_to_20_miles = 0
+        self.near_20_miles = 0
+        # Trips per hundredth of a mile, for the median
+        self.hundredths = {}
+    
+    def add(self, chunk: TripChunk):
+        """Count one chunk"""
+        self.trips += len(chunk.distances)
+        for membership in chunk.memberships:
+            self.memberships[membership] += 1
+        for time_period in chunk.time_periods:
+            self.time_periods[time_period] += 1
+        for distance in chunk.distances:
+            self.total_miles += distance
+            self.up_to_20_miles += distance <= 20
+            self.near_20_miles += abs(distance - 20) <= 2
+            hundredths = round(distance * 100)
+            self.hundredths[hundredths] = self.hundredths.get(hundredths, 0) + 1
+    
+    def shares(self) -> Dict:
+        """Shares of each membership level and time period, and distance statistics"""
+        trips = self.trips or 1
+        return {
+            "membership": {name: count / trips for name, count in self.memberships.items()},
+            "time_period": {name: count / trips for name, count in self.time_periods.items()},
+            "distance": {
+                "mean_miles": self.total_miles / trips,
+                "median_miles": self._median() / 100,
+                "up_to_20_miles": self.up_to_20_miles / trips,
+                "within_2_miles_of_20": self.near_20_miles / trips
+            }
+        }
+    
+    def _median(self) -> int:
+        """Median distance in hundredths of a mile"""
+        seen = 0
+        for hundredths in sorted(self.hundredths):
+            seen += self.hundredths[hundredths]
+            if 2 * seen >= self.trips:
+                return hundredths
+        return 0
+
+
+def _distance(rng: random.Random) -> float:
+    """One trip distance in miles, rounded to hundredths"""
+    kind = rng.random()
+    if kind < LOCAL_TRIP_SHARE:
+        miles = rng.lognormvariate(math.log(LOCAL_MEDIAN_MILES), 0.6)
+    elif kind < LOCAL_TRIP_SHARE + BOUNDARY_TRIP_SHARE:
+        miles = rng.gauss(20.0, BOUNDARY_SPREAD_MILES)
+    else:
+        miles = 20.0 + rng.expovariate(1 / LONG_TRIP_EXTRA_MILES)
+    return max(round(miles, 2), 0.01)
+
+
+def _hour_of_week_weights() -> List[float]:
+    """Cumulative traffic weight of each hour of the week, Monday first"""
+    weekday = sum(WEEKDAY_HOURLY_TRAFFIC)
+    weekend = sum(WEEKEND_HOURLY_TRAFFIC) / WEEKEND_TRAFFIC_SHARE
+    hours = [traffic / weekday for traffic in WEEKDAY_HOURLY_TRAFFIC] * 5
+    hours += [traffic / weekend for traffic in WEEKEND_HOURLY_TRAFFIC] * 2
+    return list(accumulate(hours))
+
+
+def _price(calculator: TollCalculator, path: str, chunk: TripChunk):
+    """Price a chunk on one of the in-process paths: cents from a batch, else Decimal charges"""
+    if path == "batch":
+        return calculator.calculate_tolls_cents(*chunk)
+    quote = calculator.quote
+    return [quote(*trip).charge for trip in zip(*chunk)]
+
+
+def _price_parallel(chunk: TripChunk, workers: int) -> array:
+    """Price a chunk with calculate_tolls_cents_parallel, split evenly across the workers"""
+    return calculate_tolls_cents_parallel(*chunk, workers=workers,
+                                          chunk_size=max(1, -(-len(chunk.distances) // workers)))
+
+
+def _record(result: Dict, trips: int, seconds: float):
+    """Add a timed chunk to a path's totals"""
+    result["trips"] += trips
+    result["seconds"] += seconds
+
+
+def _collect_mismatches(result: Dict, mismatches: List[Dict], path: str, chunk: TripChunk,
+                        expected: List[int], actual: List[int]):
+    """Count a path's disagreements in a chunk and keep the first few"""
+    for index, (expected_cents, actual_cents) in enumerate(zip(expected, actual)):
+        if expected_cents != actual_cents:
+            result["mismatches"] += 1
+            if len(mismatches) < MAX_REPORTED_MISMATCHES:
+                mismatches.append({"path": path, "distance": chunk.distances[index],
+                                   "membership": chunk.memberships[index],
+                                   "time_period": chunk.time_periods[index],
+                                   "expected": str(Decimal(expected_cents).scaleb(-2)),
+                                   "actual": str(Decimal(actual_cents).scaleb(-2))})
+    # A path that returned too few or too many charges disagrees on the rest
+    result["mismatches"] += abs(len(expected) - len(actual))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Stream synthetic traffic through every pricing path")
+    parser.add_argument("--trips", type=int, default=1000000, help="Trips to generate (default: 1000000)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--paths", default=",".join(PATHS),
+                        help=f"Comma-separated pricing paths (default: {','.join(PATHS)})")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Trips generated and priced at a time (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes for the parallel path (default: one per CPU)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help=f"Quotes memoized by the cached path (default: {DEFAULT_CACHE_SIZE})")
+    parser.add_argument("-o", "--output", help="Save the report to this JSON file")
+    args = parser.parse_args(argv)
+    if args.trips < 0 or args.chunk_size < 1:
+        parser.error("--trips must not be negative and --chunk-size must be positive")
+    
+    try:
+        report = run_load(args.trips, args.seed, args.paths.split(","), args.chunk_size,
+                          args.workers, args.cache_size)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    print(format_load_report(report))
+    for mismatch in report["mismatches"]:
+        print(f"MISMATCH {mismatch['path']} {mismatch['distance']} {mismatch['membership']} "
+              f"{mismatch['time_period']}: expected {mismatch['expected']}, got {mismatch['actual']}",
+              file=sys.stderr)
+    if args.output:
+        with open(args.output, "w") as stream:
+            json.dump(report, stream, indent=2)
+    return 1 if any(result["mismatches"] for result in report["paths"].values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Parallel Pricing
+
+This module shards batch and trip file pricing across worker processes.
+Each worker builds its own TollCalculator once; work is sent in large
+chunks to amortize inter-process overhead and results come back in
+input order, identical to the sequential path.
+"""
+
+import os
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from src.toll_calculator import TollCalculationError, TollCalculator, _as_list, _cents_to_decimal
+
+# Trips per chunk sent to a worker
+DEFAULT_CHUNK_SIZE = 50000
+
+# Calculator owned by each worker process
+_worker_calculator = None
+
+
+def _init_worker(calculator_options: Dict):
+    """Create the worker process's own calculator"""
+    global _worker_calculator
+    _worker_calculator = TollCalculator(**calculator_options)
+
+
+def _price_columns(chunk: Tuple[list, list, list]) -> array:
+    """Price one chunk of batch columns in a worker"""
+    return _worker_calculator.calculate_tolls_cents(*chunk)
+
+
+def _price_records(records: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+    """Price one chunk of trip file records in a worker"""
+    from src.trip_pricer import price_chunk
+    return price_chunk(records, _worker_calculator)
+
+
+def map_chunks(function: Callable, chunks: Iterable, workers: Optional[int] = None,
+               calculator_options: Optional[Dict] = None) -> Iterator:
+    """
+    Apply a worker function to chunks in a process pool, in input order
+    
+    At most two chunks per worker are in flight, so a lazily generated
+    sequence of chunks is never read ahead of what the pool can use.
+    
+    Args:
+        function: Module-level function run in the worker on each chunk
+        chunks: Iterable of picklable chunks
+        workers: Number of worker processes (default: one per CPU)
+        calculator_options: Keyword arguments for each worker's TollCalculator
+    
+    Yields:
+        The function result for each chunk, in input order
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(calculator_options or {},)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(function, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def calculate_tolls_cents_parallel(distances: Sequence[float], memberships: Sequence[Union[str, int]],
+                                   time_periods: Sequence[Union[str, int]], workers: Optional[int] = None,
+                                   chunk_size: int = DEFAULT_CHUNK_SIZE,
+                                   calculator_options: Optional[Dict] = None) -> array:
+    """
+    Calculate toll charges in integer cents across worker processes
+    
+    Args:
+        distances: Distances in miles (list, array.array or NumPy array)
+        memberships: Membership strings or MEMBERSHIP_CODES values
+        time_periods: Time period strings or TIME_PERIOD_CODES values
+        workers: Number of worker processes (default: one per CPU)
+        chunk_size: Trips per chunk sent to a worker
+        calculator_options: Keyword arguments for each worker's TollCalculator
+    
+    Returns:
+        array('q') of toll charges in cents, identical to calculate_tolls_cents
+    
+    Raises:
+        TollCalculationError: If any trip is invalid (the first bad row is reported)
+    """
+    distances = _as_list(distances)
+    memberships = _as_list(memberships)
+    time_periods = _as_list(time_periods)
+    if not len(distances) == len(memberships) == len(time_periods):
+        raise TollCalculationError("Batch columns must have the same length")
+    
+    chunks = (
+        (distances[start:start + chunk_size],
+         memberships[start:start + chunk_size],
+         time_periods[start:start + chunk_size])
+        for start in range(0, len(distances), chunk_size)
+    )
+    charges = array("q")
+    for chunk_charges in map_chunks(_price_columns, chunks, workers, calculator_options):
+        charges.extend(chunk_charges)
+    return charges
+
+
+def calculate_tolls_parallel(distances: Sequence[float], memberships: Sequence[Union[str, int]],
+                             time_periods: Sequence[Union[str, int]], workers: Optional[int] = None,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE,
+                             calculator_options: Optional[Dict] = None) -> List[Decimal]:
+    """
+    Calculate toll charges as Decimal across worker processes
+    
+    Same arguments as calculate_tolls_cents_parallel; returns the same
+    charges as TollCalculator.calculate_tolls.
+    """
+    return [_cents_to_decimal(cents) for cents in calculate_tolls_cents_parallel(
+        distances, memberships, time_periods, workers, chunk_size, calculator_options
+    )]
+
+
+def price_chunks_parallel(chunks: Iterable[List[Dict]], workers: Optional[int] = None,
+                          calculator_options: Optional[Dict] = None) -> Iterator[Tuple[List[Dict], List[Dict]]]:
+    """
+    Price chunks of trip file records across worker processes
+    
+    Yields:
+        (priced, rejected) record lists for each chunk, in input order
+    """
+    return map_chunks(_price_records, chunks, workers, calculator_options)
@@ -0,0 +1,273 @@
+"""
+Price Curves
+
+This module exports the price of each membership level and time period as
+a closed-form, piecewise-linear curve over distance: explicit breakpoints
+with a slope and starting price per segment. Curves answer what-if
+questions without pricing trips one at a time: the revenue of a whole
+distance histogram is evaluated analytically, and the inverse gives the
+longest trip a budget covers. verify_curves checks a calculator against
+the curves at every breakpoint.
+
+Usage:
+    python -m src.price_curve --tariff tariff.json
+"""
+
+import argparse
+import json
+import sys
+from decimal import ROUND_FLOOR, ROUND_HALF_UP, Decimal, localcontext
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from src.tariff import MEMBERSHIPS, TIME_PERIODS, TariffError, Tariff, load_tariff
+from src.toll_calculator import TollCalculationError, TollCalculator
+
+# Distance where the second rate tier starts
+TIER_BREAKPOINT = Decimal("20")
+
+# Offsets around each breakpoint checked by verify_curves, in miles
+_VERIFY_OFFSETS = (Decimal("-0.005"), Decimal("-0.001"), Decimal("0"), Decimal("0.001"), Decimal("0.005"))
+
+
+class CurveSegment(NamedTuple):
+    """One linear piece of a price curve"""
+    # Miles where the segment starts, and where it ends (None: unbounded)
+    start: Decimal
+    end: Optional[Decimal]
+    # Dollars per mile, and the price at the start of the segment
+    slope: Decimal
+    offset: Decimal
+    
+    def price(self, distance: Decimal) -> Decimal:
+        """Price before rounding at a distance within the segment"""
+        return self.offset + self.slope * (distance - self.start)
+    
+    def integral(self, lower: Decimal, upper: Decimal) -> Decimal:
+        """Area under the segment between two distances within it"""
+        return (self.offset * (upper - lower)
+                + self.slope * ((upper - self.start) ** 2 - (lower - self.start) ** 2) / 2)
+
+
+class PriceCurve(NamedTuple):
+    """
+    Price of one membership level and time period as a function of distance
+    
+    The curve gives the charge before rounding; charges are rounded half up
+    to cents, exactly like calculate_toll.
+    """
+    membership: str
+    time_period: str
+    tariff_version: str
+    segments: Tuple[CurveSegment, ...]
+    
+    @property
+    def breakpoints(self) -> Tuple[Decimal, ...]:
+        """Distances where the slope changes"""
+        return tuple(segment.end for segment in self.segments if segment.end is not None)
+    
+    def price(self, distance) -> Decimal:
+        """
+        Price before rounding
+        
+        Raises:
+            TollCalculationError: If the distance is negative
+        """
+        distance = _as_decimal(distance)
+        if distance < 0:
+            raise TollCalculationError("Distance must not be negative")
+        return self._segment(distance).price(distance)
+    
+    def charge(self, distance) -> Decimal:
+        """Charge rounded to cents, as calculate_toll would return it"""
+        return self.price(distance).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    
+    def integral(self, lower, upper) -> Decimal:
+        """
+        Area under the curve between two distances, in dollar-miles
+        
+        Raises:
+            TollCalculationError: If the bounds are negative or reversed
+        """
+        lower, upper = _as_decimal(lower), _as_decimal(upper)
+        if lower < 0 or upper < lower:
+            raise TollCalculationError(f"Invalid distance range: {lower} to {upper}")
+        
+        total = Decimal("0")
+        for segment in self.segments:
+            start = max(lower, segment.start)
+            end = upper if segment.end is None else min(upper, segment.end)
+            if start < end:
+                total += segment.integral(start, end)
+        return total
+    
+    def revenue(self, histogram: Iterable[Tuple[float, float, int]]) -> Decimal:
+        """
+        Revenue of a distance histogram, evaluated analytically
+        
+        Trips are taken to be spread evenly over each bin; a bin whose
+        bounds are equal holds trips of exactly that distance. The result
+        is the sum of prices before rounding, so it can differ from the sum
+        of billed charges by up to half a cent per trip.
+        
+        Args:
+            histogram: (lower, upper, count) bins in miles
+        
+        Returns:
+            Total revenue in dollars, not rounded
+        
+        Raises:
+            TollCalculationError: If a bin has negative or reversed bounds
+        """
+        total = Decimal("0")
+        for lower, upper, count in histogram:
+            lower, upper = _as_decimal(lower), _as_decimal(upper)
+            if lower == upper:
+                total += count * self.price(lower)
+            else:
+                total += count * self.integral(lower, upper) / (upper - lower)
+        return total
+    
+    def max_distance(self, budget) -> Optional[Decimal]:
+        """
+        Longest distance whose price fits a budget
+        
+        Args:
+            budget: Dollars available
+        
+        Returns:
+            Largest distance priced at or below the budget before rounding,
+            or None when the curve never exceeds it (the budget covers any
+            distance)
+        
+        Raises:
+            TollCalculationError: If the budget is negative
+        """
+        budget = _as_decimal(budget)
+        if budget < 0:
+            raise TollCalculationError("Budget must not be negative")
+        
+        for segment in self.segments:
+            if segment.end is not None and segment.price(segment.end) <= budget:
+                continue
+            if segment.slope == 0:
+                return None
+            # Round down so the returned distance never prices above the budget
+            with localcontext() as context:
+                context.rounding = ROUND_FLOOR
+                return segment.start + (budget - segment.offset) / segment.slope
+        return None
+    
+    def to_dict(self) -> Dict:
+        """Get the curve as JSON-friendly breakpoints and slopes"""
+        return {
+            "membership": self.membership,
+            "time_period": self.time_period,
+            "tariff_version": self.tariff_version,
+            "segments": [
+                {"start": str(segment.start), "end": None if segment.end is None else str(segment.end),
+                 "slope": str(segment.slope), "offset": str(segment.offset)}
+                for segment in self.segments
+            ]
+        }
+    
+    def _segment(self, distance: Decimal) -> CurveSegment:
+        """Segment a distance falls in (breakpoints belong to the segment they end)"""
+        for segment in self.segments:
+            if segment.end is None or distance <= segment.end:
+                return segment
+        return self.segments[-1]
+
+
+def price_curves(tariff: Optional[Tariff] = None) -> Dict[Tuple[str, str], PriceCurve]:
+    """
+    Build the price curve of every membership level and time period
+    
+    Args:
+        tariff: Tariff to describe (default: the standard tariff)
+    
+    Returns:
+        Curves keyed by (membership, time_period) strings
+    """
+    tariff = tariff or load_tariff()
+    curves = {}
+    for membership in MEMBERSHIPS:
+        for time_period in TIME_PERIODS:
+            first_20_rate, beyond_20_rate = _segment_rates(tariff, membership, time_period)
+            curves[(membership, time_period)] = PriceCurve(membership, time_period, tariff.version, (
+                CurveSegment(Decimal("0"), TIER_BREAKPOINT, first_20_rate, Decimal("0")),
+                CurveSegment(TIER_BREAKPOINT, None, beyond_20_rate, TIER_BREAKPOINT * first_20_rate)
+            ))
+    return curves
+
+
+def verify_curves(calculator: Optional[TollCalculator] = None) -> List[Dict]:
+    """
+    Check a calculator's charges against its tariff's curves
+    
+    Every breakpoint is checked, with the points a rounding step and a
+    milli-mile either side, plus the shortest priced distance and one far
+    along the last segment.
+    
+    Args:
+        calculator: Calculator to check (a new one by default)
+    
+    Returns:
+        One dictionary per disagreement (empty when the curves agree)
+    """
+    calculator = calculator or TollCalculator()
+    mismatches = []
+    for (membership, time_period), curve in price_curves(calculator.tariff).items():
+        distances = [breakpoint + offset for breakpoint in curve.breakpoints for offset in _VERIFY_OFFSETS]
+        distances += [Decimal("0.001"), Decimal("1000")]
+        for distance in distances:
+            expected = calculator.calculate_toll(distance, membership, time_period)
+            actual = curve.charge(distance)
+            if actual != expected:
+                mismatches.append({"membership": membership, "time_period": time_period,
+                                   "distance": distance, "curve": actual, "calculator": expected})
+    return mismatches
+
+
+def _segment_rates(tariff: Tariff, membership: str, time_period: str) -> Tuple[Decimal, Decimal]:
+    """
+    Per-mile rates of the two distance tiers, read from the tariff tables
+    
+    Derived here rather than taken from the calculator, so verify_curves
+    checks the calculator against an independent reading of the tariff.
+    """
+    multiplier = tariff.time_multipliers[time_period]
+    if membership == "Gold" and time_period != "normal":
+        # Gold members are free for the first 20 miles and pay a reduced
+        # rate beyond 20 miles during busy/peak times
+        return Decimal("0"), tariff.gold_beyond_20_rate * multiplier
+    return tariff.first_20_rates[membership] * multiplier, tariff.beyond_20_rates[membership] * multiplier
+
+
+def _as_decimal(value) -> Decimal:
+    """Convert a distance or amount to Decimal the way the calculator does"""
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Export price curves and check them against the calculator")
+    parser.add_argument("-t", "--tariff", default=None,
+                        help="Tariff file to describe (default: the standard tariff)")
+    args = parser.parse_args(argv)
+    
+    try:
+        calculator = TollCalculator(tariff=load_tariff(args.tariff) if args.tariff else None)
+    except TariffError as e:
+        parser.error(str(e))
+    
+    curves = price_curves(calculator.tariff)
+    print(json.dumps([curve.to_dict() for curve in curves.values()], indent=2))
+    mismatches = verify_curves(calculator)
+    for mismatch in mismatches:
+        print(f"MISMATCH {mismatch['membership']} {mismatch['time_period']} at {mismatch['distance']} miles: "
+              f"curve={mismatch['curve']} calculator={mismatch['calculator']}", file=sys.stderr)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
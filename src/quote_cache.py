@@ -0,0 +1,80 @@
+"""
+Quote Cache Implementation
+
+This module provides a bounded LRU cache for toll quotes, used by
+TollCalculator when quote caching is enabled.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Hashable, Optional
+
+
+class QuoteCache:
+    """
+    Bounded least-recently-used cache of toll quotes with hit-rate statistics
+    """
+    
+    def __init__(self, max_size: int = 4096):
+        if max_size <= 0:
+            raise ValueError("Cache size must be greater than 0")
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, key: Hashable) -> Optional[tuple]:
+        """
+        Look up a cached quote and mark it as most recently used
+        
+        Args:
+            key: Quote key built by the calculator
+            
+        Returns:
+            The cached entry, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+    
+    def put(self, key: Hashable, entry: tuple):
+        """Store a quote, evicting the least recently used one when full"""
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def clear(self):
+        """Drop every cached quote (the statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        Get cache statistics
+        
+        Returns:
+            Dictionary with hits, misses, evictions, size, max_size and hit_rate
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
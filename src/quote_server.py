@@ -0,0 +1,300 @@
+"""
+Quote Server
+
+This module provides an asyncio line-protocol server around TollCalculator.
+Concurrent quote requests are collected for a short window and priced with
+a single batch call, with a bounded queue for backpressure and latency
+percentiles for monitoring.
+
+Protocol (one JSON object per line, one response line per request, in order):
+    {"distance": 25, "membership": "non", "time_period": "peak"}
+        -> {"charge": "135.00"}
+    {"distance": 0, "membership": "non", "time_period": "peak"}
+        -> {"error": "Distance must be greater than 0"}
+    {"op": "stats"}
+        -> {"requests": ..., "batches": ..., "p50_us": ..., "p99_us": ...}
+
+Usage:
+    python -m src.quote_server --port 8765 --tariff tariff.json
+"""
+
+import argparse
+import asyncio
+import json
+import signal
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from src.tariff import TariffError, load_tariff
+from src.toll_calculator import TollCalculationError, TollCalculator, _cents_to_decimal, error_message
+
+# Seconds to wait for more requests before pricing a batch
+DEFAULT_BATCH_WINDOW = 0.0002
+
+# Largest number of requests priced in one batch call
+DEFAULT_MAX_BATCH_SIZE = 1024
+
+# Requests queued before readers stop accepting new ones
+DEFAULT_MAX_PENDING = 10000
+
+# Number of recent request latencies kept for percentiles
+LATENCY_SAMPLES = 10000
+
+
+class QuoteServer:
+    """
+    Asyncio quote server that prices concurrent requests in micro-batches
+    """
+    
+    def __init__(self, calculator: Optional[TollCalculator] = None,
+                 batch_window: float = DEFAULT_BATCH_WINDOW,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_pending: int = DEFAULT_MAX_PENDING):
+        self.calculator = calculator or TollCalculator()
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.max_pending = max_pending
+        self.requests = 0
+        self.batches = 0
+        self._latencies_ns = deque(maxlen=LATENCY_SAMPLES)
+        self._queue = None
+        self._server = None
+        self._batcher = None
+        self._connections = set()
+    
+    @property
+    def port(self) -> int:
+        """Port the server is listening on"""
+        return self._server.sockets[0].getsockname()[1]
+    
+    async def start(self, host: str = "127.0.0.1", port: int = 0):
+        """Start listening (port 0 picks a free port)"""
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._batcher = asyncio.create_task(self._run_batches())
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+    
+    async def stop(self):
+        """Stop listening, drop open connections and cancel the batcher"""
+        self._server.close()
+        for connection in list(self._connections):
+            connection.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+        self._batcher.cancel()
+        await asyncio.gather(self._batcher, return_exceptions=True)
+    
+    async def quote(self, distance: float, membership: str, time_period: str) -> Dict[str, str]:
+        """
+        Queue one quote request and wait for its batch to be priced
+        
+        Returns:
+            {"charge": "..."} or {"error": "..."} with the calculate_toll message
+        """
+        return await (await self._enqueue(distance, membership, time_period))
+    
+    def stats(self) -> Dict[str, float]:
+        """
+        Get server statistics
+        
+        Returns:
+            Dictionary with request and batch counts, queue depth and
+            p50/p99 latency in microseconds over recent requests
+        """
+        latencies = sorted(self._latencies_ns)
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "pending": self._queue.qsize() if self._queue else 0,
+            "p50_us": _percentile(latencies, 50) / 1000,
+            "p99_us": _percentile(latencies, 99) / 1000
+        }
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one client connection in a task that stop() can cancel"""
+        connection = asyncio.create_task(self._serve_connection(reader, writer))
+        self._connections.add(connection)
+        connection.add_done_callback(self._connections.discard)
+        # Python 3.11 logs a cancelled start_server task as an unhandled error,
+        # so stop() cancels the connection task and this one only waits for it
+        try:
+            await asyncio.wait([connection])
+        except asyncio.CancelledError:
+            connection.cancel()
+            raise
+    
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Answer one client's requests in order"""
+        # Bounded so a client that stops reading also stops being read from
+        responses = asyncio.Queue(maxsize=self.max_pending)
+        sender = asyncio.create_task(self._send_responses(responses, writer))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    await responses.put(await self._dispatch(line))
+            # Let the sender flush outstanding responses before closing
+            await responses.put(None)
+            await sender
+        except ConnectionError:
+            # The client went away; its outstanding responses are dropped
+            sender.cancel()
+        except asyncio.CancelledError:
+            sender.cancel()
+            raise
+        finally:
+            writer.close()
+    
+    async def _dispatch(self, line: bytes) -> asyncio.Future:
+        """Parse a request line and return a future for its response"""
+        loop = asyncio.get_running_loop()
+        try:
+            request = json.loads(line)
+            if request.get("op") == "stats":
+                response = loop.create_future()
+                response.set_result(self.stats())
+                return response
+            distance = request["distance"]
+            membership = request["membership"]
+            time_period = request["time_period"]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            response = loop.create_future()
+            response.set_result({"error": f"Invalid request: {e}"})
+            return response
+        
+        return await self._enqueue(distance, membership, time_period)
+    
+    async def _enqueue(self, distance, membership, time_period) -> asyncio.Future:
+        """Queue a request for the batcher and return the future of its response"""
+        future = asyncio.get_running_loop().create_future()
+        # Waits here when the queue is full, which stops the connection reading
+        await self._queue.put((time.perf_counter_ns(), distance, membership, time_period, future))
+        return future
+    
+    async def _send_responses(self, responses: asyncio.Queue, writer: asyncio.StreamWriter):
+        """Write responses back to the client in request order"""
+        while True:
+            response = await responses.get()
+            if response is None:
+                return
+            writer.write(json.dumps(await response).encode() + b"\n")
+            if responses.empty():
+                await writer.drain()
+    
+    async def _run_batches(self):
+        """Collect queued requests for the batch window and price them together"""
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = time.perf_counter() + self.batch_window
+            while len(batch) < self.max_batch_size:
+                if queue.empty():
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    await asyncio.sleep(remaining)
+                    if queue.empty():
+                        break
+                batch.append(queue.get_nowait())
+            self._price_batch(batch)
+    
+    def _price_batch(self, batch: List[tuple]):
+        """Validate and price a batch in one call and resolve its futures"""
+        _, distances, memberships, time_periods, _ = zip(*batch)
+        try:
+            # Only the documented strings are valid in a request, not batch codes,
+            # and a JSON true or false is not a distance
+            charges, codes = self.calculator.calculate_tolls_checked(
+                [None if isinstance(distance, bool) else distance for distance in distances],
+                [membership if isinstance(membership, str) else None for membership in memberships],
+                [time_period if isinstance(time_period, str) else None for time_period in time_periods])
+            responses = [
+                {"error": error_message(code, distance, time_period)} if code
+                else {"charge": str(_cents_to_decimal(cents))}
+                for distance, time_period, cents, code in zip(distances, time_periods, charges, codes)
+            ]
+        except Exception:
+            # Something validation did not catch: price each one to report its own error
+            responses = [self._price_one(distance, membership, time_period)
+                         for distance, membership, time_period in zip(distances, memberships, time_periods)]
+        
+        now = time.perf_counter_ns()
+        for (received_ns, _, _, _, future), response in zip(batch, responses):
+            if not future.done():
+                future.set_result(response)
+            self._latencies_ns.append(now - received_ns)
+        self.requests += len(batch)
+        self.batches += 1
+    
+    def _price_one(self, distance, membership, time_period) -> Dict[str, str]:
+        """Price a single request, reporting validation errors"""
+        try:
+            return {"charge": str(self.calculator.quote(distance, membership, time_period).charge)}
+        except TollCalculationError as e:
+            return {"error": str(e)}
+        except Exception as e:
+            return {"error": f"Invalid request: {e}"}
+
+
+def _percentile(sorted_values: List[int], percentile: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0 when empty)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(percentile / 100 * len(sorted_values)) - 1))
+    return float(sorted_values[rank])
+
+
+async def serve(host: str, port: int, **options):
+    """Run a quote server until cancelled, reloading the tariff file on SIGHUP"""
+    server = QuoteServer(**options)
+    await server.start(host, port)
+    if hasattr(signal, "SIGHUP"):
+        asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, _reload_tariff, server.calculator)
+    print(f"Quote server listening on {host}:{server.port} with tariff {server.calculator.tariff.version}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def _reload_tariff(calculator: TollCalculator):
+    """Reload the calculator's tariff file, keeping the current tariff if it is invalid"""
+    try:
+        print(f"Reloaded tariff {calculator.reload_tariff().version}")
+    except TariffError as e:
+        print(f"Tariff reload failed: {e}", file=sys.stderr)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Serve toll quotes over a JSON line protocol")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    parser.add_argument("--batch-window-us", type=float, default=DEFAULT_BATCH_WINDOW * 1e6,
+                        help="Microseconds to collect requests before pricing a batch")
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="Largest number of requests priced in one batch")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                        help="Queued requests before clients are slowed down")
+    parser.add_argument("-t", "--tariff", default=None,
+                        help="Tariff file to price with, reloaded on SIGHUP (default: the standard tariff)")
+    args = parser.parse_args(argv)
+    
+    try:
+        calculator = TollCalculator(tariff=load_tariff(args.tariff) if args.tariff else None)
+    except TariffError as e:
+        parser.error(str(e))
+    try:
+        asyncio.run(serve(args.host, args.port, calculator=calculator,
+                          batch_window=args.batch_window_us / 1e6,
+                          max_batch_size=args.max_batch_size, max_pending=args.max_pending))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,152 @@
+"""
+Tariff Configuration
+
+This module loads toll tariffs from JSON files. A tariff is an immutable,
+versioned set of rate tables: per-mile rates for the first 20 miles and
+beyond 20 miles by membership level, multipliers by time period, and the
+per-mile rate Gold members pay beyond 20 miles during busy and peak times.
+Rates are written as strings so they load as exact Decimals.
+
+Example file:
+    {
+      "version": "standard-1",
+      "first_20_miles": {"non": "2.00", "Silver": "1.00", "Gold": "0.00"},
+      "beyond_20_miles": {"non": "1.00", "Silver": "0.50", "Gold": "0.00"},
+      "time_multipliers": {"normal": "1.0", "busy": "2.0", "peak": "3.0"},
+      "gold_beyond_20_rate": "0.25"
+    }
+"""
+
+import json
+import os
+from decimal import Decimal, InvalidOperation
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, NamedTuple, Optional
+
+# Tariff shipped with the calculator and used by default
+STANDARD_TARIFF_PATH = os.path.join(os.path.dirname(__file__), "tariffs", "standard.json")
+
+# Keys every tariff table must define
+MEMBERSHIPS = ("non", "Silver", "Gold")
+TIME_PERIODS = ("normal", "busy", "peak")
+
+
+class TariffError(ValueError):
+    """Raised when a tariff file cannot be loaded"""
+    pass
+
+
+class Tariff(NamedTuple):
+    """
+    Immutable, versioned rate tables
+    
+    Tables map membership or time period strings to Decimal rates.
+    """
+    version: str
+    first_20_rates: Mapping[str, Decimal]
+    beyond_20_rates: Mapping[str, Decimal]
+    time_multipliers: Mapping[str, Decimal]
+    gold_beyond_20_rate: Decimal
+    # File the tariff was loaded from, used to reload it
+    source: Optional[str] = None
+    
+    def to_dict(self) -> Dict:
+        """Get the tariff in its JSON file layout"""
+        return {
+            "version": self.version,
+            "first_20_miles": {key: str(rate) for key, rate in self.first_20_rates.items()},
+            "beyond_20_miles": {key: str(rate) for key, rate in self.beyond_20_rates.items()},
+            "time_multipliers": {key: str(rate) for key, rate in self.time_multipliers.items()},
+            "gold_beyond_20_rate": str(self.gold_beyond_20_rate)
+        }
+    
+    def __reduce__(self):
+        # The read-only tables cannot be pickled; rebuild from the file layout
+        return parse_tariff, (self.to_dict(), self.source)
+
+
+def parse_tariff(data: Dict, source: Optional[str] = None) -> Tariff:
+    """
+    Build a tariff from its JSON file layout
+    
+    Args:
+        data: Decoded tariff file
+        source: File the data was read from, if any
+    
+    Returns:
+        Validated, immutable Tariff
+    
+    Raises:
+        TariffError: If a field is missing or a rate is not a non-negative number
+    """
+    if not isinstance(data, dict):
+        raise TariffError("Tariff must be a JSON object")
+    for field in ("version", "first_20_miles", "beyond_20_miles", "time_multipliers",
+                  "gold_beyond_20_rate"):
+        if field not in data:
+            raise TariffError(f"Missing tariff field: {field}")
+    
+    version = data["version"]
+    if not isinstance(version, str) or not version:
+        raise TariffError(f"Invalid tariff version: {version!r}")
+    
+    return Tariff(
+        version=version,
+        first_20_rates=_parse_table(data, "first_20_miles", MEMBERSHIPS),
+        beyond_20_rates=_parse_table(data, "beyond_20_miles", MEMBERSHIPS),
+        time_multipliers=_parse_table(data, "time_multipliers", TIME_PERIODS),
+        gold_beyond_20_rate=_parse_rate(data["gold_beyond_20_rate"], "gold_beyond_20_rate"),
+        source=source
+    )
+
+
+def load_tariff(path: str = STANDARD_TARIFF_PATH) -> Tariff:
+    """
+    Load a tariff from a JSON file
+    
+    Args:
+        path: Tariff file (default: the standard tariff)
+    
+    Returns:
+        Validated, immutable Tariff that remembers its source file
+    
+    Raises:
+        TariffError: If the file cannot be read or is not a valid tariff
+    """
+    try:
+        with open(path) as stream:
+            data = json.load(stream)
+    except (OSError, ValueError) as e:
+        raise TariffError(f"Cannot load tariff {path}: {e}")
+    return parse_tariff(data, source=path)
+
+
+def _parse_table(data: Dict, field: str, keys: Iterable[str]) -> Mapping[str, Decimal]:
+    """Parse one rate table, which must define exactly the given keys"""
+    table = data[field]
+    if not isinstance(table, dict):
+        raise TariffError(f"Tariff field {field} must be a JSON object")
+    
+    keys = tuple(keys)
+    for key in table:
+        if key not in keys:
+            raise TariffError(f"Unknown key in {field}: {key}")
+    rates = {}
+    for key in keys:
+        if key not in table:
+            raise TariffError(f"Missing {field} rate for {key}")
+        rates[key] = _parse_rate(table[key], f"{field}.{key}")
+    return MappingProxyType(rates)
+
+
+def _parse_rate(value, name: str) -> Decimal:
+    """Parse a rate written as a string or number into a non-negative Decimal"""
+    try:
+        if isinstance(value, bool):
+            raise InvalidOperation
+        rate = Decimal(str(value))
+    except InvalidOperation:
+        raise TariffError(f"Invalid rate for {name}: {value!r}")
+    if not rate.is_finite() or rate < 0:
+        raise TariffError(f"Invalid rate for {name}: {value!r}")
+    return rate
@@ -0,0 +1,268 @@
+"""
+Time Period Schedule
+
+This module classifies event timestamps into toll time periods. A schedule
+is loaded from a JSON file of day profiles (time windows that are busy or
+peak; everything else is normal), the profile used on each weekday, and
+holiday dates that use another profile. Loading precomputes a weekday by
+minute-of-day table and a per-holiday table, so classifying a timestamp is
+a couple of integer operations and one table lookup.
+
+Example file:
+    {
+      "version": "standard-1",
+      "timezone": "UTC",
+      "profiles": {
+        "weekday": [{"start": "07:00", "end": "09:00", "period": "peak"}],
+        "weekend": [],
+        "holiday": []
+      },
+      "days": {"monday": "weekday", ..., "sunday": "weekend"},
+      "holidays": {"2026-12-25": "holiday"}
+    }
+"""
+
+import json
+import os
+from array import array
+from datetime import date, datetime, timezone as dt_timezone
+from typing import Dict, Iterable, Mapping, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from src.toll_calculator import TIME_PERIOD_CODES, TimePeriod, TollCalculationError
+
+# Schedule shipped with the calculator and used by default
+STANDARD_SCHEDULE_PATH = os.path.join(os.path.dirname(__file__), "tariffs", "standard_schedule.json")
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+MINUTES_PER_DAY = 24 * 60
+
+# TimePeriod for each TIME_PERIOD_CODES value
+_PERIODS_BY_CODE = tuple(sorted(TimePeriod, key=lambda period: TIME_PERIOD_CODES[period.value]))
+
+# 1970-01-01 was a Thursday
+_EPOCH_WEEKDAY = 3
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# UTC offsets cached per hour for zones with daylight saving time
+_OFFSET_CACHE_SIZE = 4096
+
+# Marks an hour whose UTC offset has not been cached yet
+_UNCACHED = object()
+
+
+class ScheduleError(ValueError):
+    """Raised when a schedule file cannot be loaded"""
+    pass
+
+
+class TimePeriodSchedule:
+    """
+    Precomputed timestamp to TimePeriod index
+    
+    The tables are immutable once built. UTC offsets for zones with daylight
+    saving time are cached as timestamps are classified; entries are only
+    ever added or cleared whole, so one schedule can still be shared between
+    calculators and threads.
+    """
+    
+    def __init__(self, profiles: Mapping[str, Iterable[Dict]], days: Mapping[str, str],
+                 holidays: Optional[Mapping[str, str]] = None, timezone: str = "UTC",
+                 version: str = "custom"):
+        """
+        Build a schedule
+        
+        Args:
+            profiles: Profile name -> windows ({"start": "HH:MM", "end": "HH:MM",
+                "period": "busy" or "peak"}); later windows win where they overlap
+            days: Weekday name -> profile name, for all seven days
+            holidays: "YYYY-MM-DD" -> profile name used on that date instead
+            timezone: IANA time zone the windows are written in
+            version: Schedule version, for reporting
+        
+        Raises:
+            ScheduleError: If a profile, day, window or time zone is invalid
+        """
+        self.version = version
+        self.timezone = timezone
+        try:
+            self._zone = ZoneInfo(timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ScheduleError(f"Unknown time zone: {timezone}")
+        self._offsets = {}
+        
+        tables = {name: _profile_table(name, windows) for name, windows in profiles.items()}
+        
+        week = bytearray()
+        for weekday in WEEKDAYS:
+            week += _profile(tables, days.get(weekday), weekday)
+        self._week_table = bytes(week)
+        
+        # Holiday tables keyed by days since the epoch
+        self._holidays = {}
+        for day, profile_name in (holidays or {}).items():
+            try:
+                epoch_day = date.fromisoformat(day).toordinal() - _EPOCH_ORDINAL
+            except (TypeError, ValueError):
+                raise ScheduleError(f"Invalid holiday date: {day}")
+            self._holidays[epoch_day] = _profile(tables, profile_name, day)
+    
+    def classify(self, timestamp: float) -> TimePeriod:
+        """
+        Classify one timestamp
+        
+        Args:
+            timestamp: Seconds since the epoch
+        
+        Returns:
+            The TimePeriod in force at that moment
+        
+        Raises:
+            TollCalculationError: If the timestamp is not a finite number
+        """
+        try:
+            offset = self._fixed_offset()
+            if offset is None:
+                offset = self._utc_offset(timestamp)
+            day, minute = divmod(int((timestamp + offset) // 60), MINUTES_PER_DAY)
+        except (TypeError, ValueError, OverflowError, OSError):
+            raise TollCalculationError(f"Invalid timestamp: {timestamp}")
+        
+        holiday = self._holidays.get(day)
+        if holiday is not None:
+            return _PERIODS_BY_CODE[holiday[minute]]
+        return _PERIODS_BY_CODE[self._week_table[(day + _EPOCH_WEEKDAY) % 7 * MINUTES_PER_DAY + minute]]
+    
+    def classify_many(self, timestamps: Iterable[float]) -> array:
+        """
+        Classify many timestamps in one pass
+        
+        Args:
+            timestamps: Seconds since the epoch (list, array.array or NumPy array)
+        
+        Returns:
+            array('B') of TIME_PERIOD_CODES values, accepted by the batch API
+        
+        Raises:
+            TollCalculationError: If any timestamp is not a finite number
+        """
+        if hasattr(timestamps, "tolist"):
+            timestamps = timestamps.tolist()
+        codes = array("B")
+        append = codes.append
+        week_table = self._week_table
+        holidays = self._holidays
+        fixed_offset = self._fixed_offset()
+        
+        timestamp = None
+        try:
+            for timestamp in timestamps:
+                offset = fixed_offset if fixed_offset is not None else self._utc_offset(timestamp)
+                day, minute = divmod(int((timestamp + offset) // 60), MINUTES_PER_DAY)
+                if holidays and day in holidays:
+                    append(holidays[day][minute])
+                else:
+                    append(week_table[(day + _EPOCH_WEEKDAY) % 7 * MINUTES_PER_DAY + minute])
+        except (TypeError, ValueError, OverflowError, OSError):
+            raise TollCalculationError(f"Invalid timestamp: {timestamp}")
+        return codes
+    
+    def _fixed_offset(self) -> Optional[int]:
+        """UTC offset in seconds when the zone never changes it, else None"""
+        if self.timezone == "UTC":
+            return 0
+        return None
+    
+    def _utc_offset(self, timestamp: float) -> int:
+        """UTC offset in seconds at a timestamp, cached per hour without a clock change"""
+        hour = int(timestamp // 3600)
+        offset = self._offsets.get(hour, _UNCACHED)
+        if offset is _UNCACHED:
+            if len(self._offsets) >= _OFFSET_CACHE_SIZE:
+                self._offsets.clear()
+            offset = self._offset_at(hour * 3600)
+            # Clocks change off the UTC hour in some zones (America/St_Johns
+            # at :30); such hours are cached as None and looked up per timestamp
+            if self._offset_at(hour * 3600 + 3599) != offset:
+                offset = None
+            self._offsets[hour] = offset
+        if offset is None:
+            return self._offset_at(timestamp)
+        return offset
+    
+    def _offset_at(self, timestamp: float) -> int:
+        """UTC offset in seconds at a timestamp, from the zone"""
+        moment = datetime.fromtimestamp(timestamp, dt_timezone.utc).astimezone(self._zone)
+        return int(moment.utcoffset().total_seconds())
+
+def parse_schedule(data: Dict) -> TimePeriodSchedule:
+    """
+    Build a schedule from its JSON file layout
+    
+    Raises:
+        ScheduleError: If a field is missing or invalid
+    """
+    if not isinstance(data, dict):
+        raise ScheduleError("Schedule must be a JSON object")
+    for field in ("version", "profiles", "days"):
+        if field not in data:
+            raise ScheduleError(f"Missing schedule field: {field}")
+    for field in ("profiles", "days", "holidays"):
+        if not isinstance(data.get(field, {}), dict):
+            raise ScheduleError(f"Schedule field {field} must be a JSON object")
+    return TimePeriodSchedule(data["profiles"], data["days"], data.get("holidays"),
+                              data.get("timezone", "UTC"), data["version"])
+
+
+def load_schedule(path: str = STANDARD_SCHEDULE_PATH) -> TimePeriodSchedule:
+    """
+    Load a schedule from a JSON file
+    
+    Args:
+        path: Schedule file (default: the standard schedule)
+    
+    Raises:
+        ScheduleError: If the file cannot be read or is not a valid schedule
+    """
+    try:
+        with open(path) as stream:
+            data = json.load(stream)
+    except (OSError, ValueError) as e:
+        raise ScheduleError(f"Cannot load schedule {path}: {e}")
+    return parse_schedule(data)
+
+
+def _profile(tables: Dict[str, bytes], name: Optional[str], used_by: str) -> bytes:
+    """Look up a profile table by name"""
+    if name is None:
+        raise ScheduleError(f"No profile for {used_by}")
+    if name not in tables:
+        raise ScheduleError(f"Unknown profile for {used_by}: {name}")
+    return tables[name]
+
+
+def _profile_table(name: str, windows: Iterable[Dict]) -> bytes:
+    """Build the minute-of-day table of period codes for one profile"""
+    table = bytearray(MINUTES_PER_DAY)
+    for window in windows:
+        try:
+            start = _minute_of_day(window["start"])
+            end = _minute_of_day(window["end"])
+            code = TIME_PERIOD_CODES[window["period"]]
+        except (KeyError, TypeError, ValueError):
+            raise ScheduleError(f"Invalid window in profile {name}: {window}")
+        if start >= end:
+            raise ScheduleError(f"Window must end after it starts in profile {name}: {window}")
+        table[start:end] = bytes([code]) * (end - start)
+    return bytes(table)
+
+
+def _minute_of_day(value: str) -> int:
+    """Parse "HH:MM" (00:00 to 24:00) into minutes after midnight"""
+    hours, minutes = value.split(":")
+    minute = int(hours) * 60 + int(minutes)
+    if not 0 <= int(minutes) < 60 or not 0 <= minute <= MINUTES_PER_DAY:
+        raise ValueError(value)
+    return minute
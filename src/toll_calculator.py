@@ -5,10 +5,22 @@ This module provides the core business logic for calculating toll charges
 based on distance, membership level, and time period.
 """
 
+import time
+import warnings
+from array import array
+from types import MappingProxyType
 from enum import Enum
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Union
 from decimal import Decimal, ROUND_HALF_UP
 
+from src.tariff import Tariff, TariffError, load_tariff
+
+# Optional pieces are imported when first used, keeping the import light
+# for short-lived workers
+if TYPE_CHECKING:
+    from src.instrumentation import PricingMetrics
+    from src.time_periods import TimePeriodSchedule
+
 
 class MembershipLevel(Enum):
     """Enum for different membership levels"""
@@ -29,39 +41,206 @@ class TollCalculationError(Exception):
     pass
 
 
+# Integer codes accepted by the batch API in place of membership strings
+MEMBERSHIP_CODES = {
+    "non": 0,
+    "Silver": 1,
+    "Gold": 2
+}
+
+# Integer codes accepted by the batch API in place of time period strings
+TIME_PERIOD_CODES = {
+    "normal": 0,
+    "busy": 1,
+    "peak": 2
+}
+
+# Pricing engines: Decimal arithmetic, or integer milli-miles and cents
+ENGINES = ("decimal", "fixed")
+
+# Error codes returned by validate_batch; rows are checked in this order
+VALID = 0
+DISTANCE_NOT_POSITIVE = 1
+INVALID_MEMBERSHIP = 2
+INVALID_TIME_PERIOD = 3
+# Distances that are not finite numbers
+INVALID_DISTANCE = 4
+
+# The TollCalculationError message for each error code (see error_message)
+ERROR_MESSAGES = {
+    DISTANCE_NOT_POSITIVE: "Distance must be greater than 0",
+    INVALID_MEMBERSHIP: "Invalid membership type",
+    INVALID_TIME_PERIOD: "Invalid time period: {time_period}",
+    INVALID_DISTANCE: "Invalid distance: {distance}"
+}
+
+# Bounded error names PricingMetrics counts errors by, one per error code;
+# other TollCalculationErrors are counted as "other"
+ERROR_KINDS = {
+    DISTANCE_NOT_POSITIVE: "distance_not_positive",
+    INVALID_MEMBERSHIP: "invalid_membership",
+    INVALID_TIME_PERIOD: "invalid_time_period",
+    INVALID_DISTANCE: "invalid_distance"
+}
+
+
+class _RateTable:
+    """
+    A pre-tariff rate attribute: on a calculator it reads the calculator's
+    tariff, on the TollCalculator class the standard tariff
+    """
+    
+    def __init__(self, read: Callable[[Tariff], object], doc: str):
+        self._read = read
+        self.__doc__ = doc
+    
+    def __get__(self, calculator: Optional["TollCalculator"], owner: Optional[type] = None):
+        if calculator is None:
+            return self._read(_STANDARD_COMPILED.tariff if _STANDARD_COMPILED else load_tariff())
+        return self._read(calculator.tariff)
+    
+    def __set__(self, calculator: "TollCalculator", value):
+        raise AttributeError("Rate tables are read-only; price with another tariff via use_tariff")
+
+
 class TollCalculator:
     """
     Main toll calculator class that handles all toll charge calculations
     """
     
-    # Base rates per mile for first 20 miles
-    BASE_RATES_FIRST_20 = {
-        MembershipLevel.NON_MEMBER: Decimal("2.00"),
-        MembershipLevel.SILVER: Decimal("1.00"),
-        MembershipLevel.GOLD: Decimal("0.00")
-    }
-    
-    # Base rates per mile for miles beyond 20
-    BASE_RATES_BEYOND_20 = {
-        MembershipLevel.NON_MEMBER: Decimal("1.00"),
-        MembershipLevel.SILVER: Decimal("0.50"),
-        MembershipLevel.GOLD: Decimal("0.00")
-    }
-    
-    # Time period multipliers
-    TIME_MULTIPLIERS = {
-        TimePeriod.NORMAL: Decimal("1.0"),
-        TimePeriod.BUSY: Decimal("2.0"),
-        TimePeriod.PEAK: Decimal("3.0")
-    }
-    
-    def __init__(self):
-        self.last_calculation_breakdown = []
+    def __init__(self, cache_size: Optional[int] = None, metrics: Optional["PricingMetrics"] = None,
+                 engine: str = "decimal", tariff: Optional[Tariff] = None,
+                 schedule: Optional["TimePeriodSchedule"] = None):
+        """
+        Create a calculator
+        
+        Args:
+            cache_size: Maximum number of quotes to memoize (None disables caching)
+            metrics: Per-stage timing counters to record into (None disables instrumentation)
+            engine: "decimal" prices single trips with Decimal arithmetic; "fixed"
+                prices them in integer units and converts only the charge to Decimal
+            tariff: Rate tables to price with (default: the standard tariff, as loaded at import)
+            schedule: Time period schedule for the *_at methods (default: the
+                standard schedule, loaded on first use)
+        
+        Raises:
+            ValueError: If the engine is unknown
+            TariffError: If the standard tariff cannot be loaded
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown pricing engine: {engine}")
+        self.engine = engine
+        self._fixed_point = engine == "fixed"
+        
+        # Tariff and its pricing plan, replaced together by use_tariff; the
+        # standard tariff is compiled once at import and shared
+        if tariff is not None:
+            self._compiled = _compile_tariff(tariff)
+        else:
+            self._compiled = _STANDARD_COMPILED or _compile_tariff(load_tariff())
+        
+        self.quote_cache = None
+        if cache_size is not None:
+            from src.quote_cache import QuoteCache
+            self.quote_cache = QuoteCache(cache_size)
+        self.metrics = metrics
+        self._schedule = schedule
+        
+        # State behind the calculate_toll/get_charge_breakdown compatibility API;
+        # quote() never touches it
+        self._last_quote = None
+        self._last_breakdown = []
+    
+    @property
+    def last_calculation_breakdown(self) -> List[Dict[str, str]]:
+        """Breakdown of the last calculate_toll call, built on first access"""
+        if self._last_breakdown is None:
+            if self.metrics is None:
+                self._last_breakdown = self._last_quote.breakdown
+            else:
+                start = time.perf_counter_ns()
+                self._last_breakdown = self._last_quote.breakdown
+                self.metrics.record("breakdown", time.perf_counter_ns() - start)
+        return self._last_breakdown
+    
+    @last_calculation_breakdown.setter
+    def last_calculation_breakdown(self, breakdown: List[Dict[str, str]]):
+        self._last_quote = None
+        self._last_breakdown = breakdown
+    
+    def quote(self, distance: float, membership: str, time_period: str) -> "TollQuote":
+        """
+        Price a trip without touching any calculator state
+        
+        Safe to call from many threads on one shared calculator.
+        
+        Args:
+            distance: Distance in miles (must be > 0)
+            membership: Membership level ("non", "Silver", "Gold")
+            time_period: Time period ("normal", "busy", "peak")
+            
+        Returns:
+            Immutable TollQuote holding the charge and its breakdown
+            
+        Raises:
+            TollCalculationError: If inputs are invalid
+        """
+        if self.metrics is not None:
+            return self._quote_instrumented(distance, membership, time_period)
+        
+        # One read of the tariff, so a concurrent use_tariff cannot mix two of them
+        compiled = self._compiled
+        cache = self.quote_cache
+        if cache is not None:
+            # The type is part of the key: 20 and Decimal("20.0") format differently;
+            # equal Decimals such as 25.5 and 25.50 do too, so they key on their digits
+            key = (type(distance), distance.as_tuple() if type(distance) is Decimal else distance,
+                   membership, time_period, compiled.tariff.version)
+            try:
+                cached_quote = cache.get(key)
+            except TypeError:
+                cache = None
+                cached_quote = None
+            if cached_quote is not None:
+                return cached_quote
+        
+        if distance <= 0:
+            raise TollCalculationError("Distance must be greater than 0")
+        
+        # A single lookup replaces membership and time period parsing
+        try:
+            cell = compiled.plan.get((membership, time_period))
+        except TypeError:
+            cell = None
+        if cell is None:
+            self._validate_inputs(distance, membership, time_period)
+        
+        units = _distance_units(distance) if self._fixed_point else None
+        if units is not None:
+            # Integer units all the way; only the charge becomes a Decimal
+            charge = _cents_to_decimal(_price_units(*units, cell, compiled.rate_scale))
+        else:
+            # Convert distance to Decimal for precise calculations
+            charge = _price_decimal(Decimal(str(distance)), cell).quantize(
+                Decimal("0.01"), rounding=ROUND_HALF_UP
+            )
+        
+        # The breakdown is only built if requested
+        quote = TollQuote(charge, distance, cell)
+        
+        # Quotes are immutable and build a fresh breakdown on every read,
+        # so callers can never mutate what the cache holds
+        if cache is not None:
+            cache.put(key, quote)
+        return quote
     
     def calculate_toll(self, distance: float, membership: str, time_period: str) -> Decimal:
         """
         Calculate toll charge for given parameters
         
+        The quote is remembered for get_charge_breakdown, so a calculator used
+        this way must not be shared between threads; use quote() instead.
+        
         Args:
             distance: Distance in miles (must be > 0)
             membership: Membership level ("non", "Silver", "Gold")
@@ -73,26 +252,385 @@ class TollCalculator:
         Raises:
             TollCalculationError: If inputs are invalid
         """
-        # Validate inputs
-        self._validate_inputs(distance, membership, time_period)
+        quote = self.quote(distance, membership, time_period)
+        self._last_quote = quote
+        self._last_breakdown = None
+        return quote.charge
+    
+    @property
+    def schedule(self) -> "TimePeriodSchedule":
+        """Schedule that maps timestamps to time periods"""
+        if self._schedule is None:
+            from src.time_periods import load_schedule
+            self._schedule = load_schedule()
+        return self._schedule
+    
+    @schedule.setter
+    def schedule(self, schedule: "TimePeriodSchedule"):
+        self._schedule = schedule
+    
+    def quote_at(self, distance: float, membership: str, timestamp: float) -> "TollQuote":
+        """
+        Price a trip at the time period in force at a timestamp
+        
+        Args:
+            distance: Distance in miles (must be > 0)
+            membership: Membership level ("non", "Silver", "Gold")
+            timestamp: Event time in seconds since the epoch
+            
+        Returns:
+            Immutable TollQuote, as from quote()
+            
+        Raises:
+            TollCalculationError: If inputs are invalid
+        """
+        return self.quote(distance, membership, self.schedule.classify(timestamp).value)
+    
+    def calculate_toll_at(self, distance: float, membership: str, timestamp: float) -> Decimal:
+        """Calculate toll charge at the time period in force at a timestamp (see calculate_toll)"""
+        return self.calculate_toll(distance, membership, self.schedule.classify(timestamp).value)
+    
+    def calculate_tolls(self, distances: Sequence[float], memberships: Sequence[Union[str, int]],
+                        time_periods: Sequence[Union[str, int]]) -> List[Decimal]:
+        """
+        Calculate toll charges for parallel columns of trips in one pass
         
-        # Convert string inputs to enums
-        membership_level = self._parse_membership(membership)
-        time_period_enum = self._parse_time_period(time_period)
+        Args:
+            distances: Distances in miles (list, array.array or NumPy array)
+            memberships: Membership strings or MEMBERSHIP_CODES values
+            time_periods: Time period strings or TIME_PERIOD_CODES values
+            
+        Returns:
+            List of toll charges as Decimal, identical to calculate_toll
+            
+        Raises:
+            TollCalculationError: If any trip is invalid (the first bad row is reported)
+        """
+        charges = self.calculate_tolls_cents(distances, memberships, time_periods)
+        if self.metrics is None:
+            return [_cents_to_decimal(cents) for cents in charges]
         
-        # Convert distance to Decimal for precise calculations
-        distance_decimal = Decimal(str(distance))
+        start = time.perf_counter_ns()
+        decimal_charges = [_cents_to_decimal(cents) for cents in charges]
+        self.metrics.record("batch_decimal", time.perf_counter_ns() - start)
+        return decimal_charges
+    
+    def calculate_tolls_at(self, distances: Sequence[float], memberships: Sequence[Union[str, int]],
+                           timestamps: Sequence[float]) -> List[Decimal]:
+        """
+        Calculate toll charges for columns of trips with event timestamps
         
-        # Calculate base charge
-        base_charge = self._calculate_base_charge(distance_decimal, membership_level)
+        The timestamps are classified in bulk and priced with calculate_tolls.
         
-        # Apply time multiplier
-        final_charge = self._apply_time_multiplier(
-            base_charge, time_period_enum, membership_level, distance_decimal
-        )
+        Args:
+            distances: Distances in miles (list, array.array or NumPy array)
+            memberships: Membership strings or MEMBERSHIP_CODES values
+            timestamps: Event times in seconds since the epoch
+            
+        Returns:
+            List of toll charges as Decimal
+            
+        Raises:
+            TollCalculationError: If any trip is invalid (the first bad row is reported)
+        """
+        return self.calculate_tolls(distances, memberships, self.schedule.classify_many(timestamps))
+    
+    def validate_batch(self, distances: Sequence[float], memberships: Sequence[Union[str, int]],
+                       time_periods: Sequence[Union[str, int]]) -> array:
+        """
+        Check parallel columns of trips without raising for bad rows
+        
+        Each column is checked in one pass. Membership and time period codes
+        are accepted as in calculate_tolls; case variants such as "gold" are not.
+        
+        Args:
+            distances: Distances in miles (list, array.array or NumPy array)
+            memberships: Membership strings or MEMBERSHIP_CODES values
+            time_periods: Time period strings or TIME_PERIOD_CODES values
+            
+        Returns:
+            array('B') with VALID or the first error code of each row; see
+            error_message for the matching TollCalculationError message
+            
+        Raises:
+            TollCalculationError: If the columns have different lengths
+        """
+        distances = _as_list(distances)
+        memberships = _without_bools(_as_list(memberships))
+        time_periods = _without_bools(_as_list(time_periods))
+        if not len(distances) == len(memberships) == len(time_periods):
+            raise TollCalculationError("Batch columns must have the same length")
+        
+        codes = array("B", bytes(len(distances)))
+        # Later passes overwrite earlier ones, so calculate_toll's first failing check wins
+        for index in _invalid_rows(time_periods, _TIME_PERIOD_KEYS):
+            codes[index] = INVALID_TIME_PERIOD
+        for index in _invalid_rows(memberships, _MEMBERSHIP_KEYS):
+            codes[index] = INVALID_MEMBERSHIP
+        
+        try:
+            suspects = [index for index, distance in enumerate(distances)
+                        if not 0 < distance < _CHECKED_DISTANCE_LIMIT]
+        except (TypeError, ArithmeticError):
+            # Not all numbers: check every row on its own
+            suspects = range(len(distances))
+        batch_plan = self._compiled.batch_plan
+        for index in suspects:
+            cell = None if codes[index] else batch_plan[(memberships[index], time_periods[index])]
+            code = _distance_code(distances[index], cell)
+            # A distance that is not a finite number is only reported for otherwise valid rows
+            if code == DISTANCE_NOT_POSITIVE or not codes[index]:
+                codes[index] = code
+        return codes
+    
+    def calculate_tolls_checked(self, distances: Sequence[float], memberships: Sequence[Union[str, int]],
+                                time_periods: Sequence[Union[str, int]]) -> Tuple[array, array]:
+        """
+        Calculate toll charges in cents, skipping invalid rows instead of raising
+        
+        Args:
+            distances: Distances in miles (list, array.array or NumPy array)
+            memberships: Membership strings or MEMBERSHIP_CODES values
+            time_periods: Time period strings or TIME_PERIOD_CODES values
+            
+        Returns:
+            Tuple of array('q') charges in cents and the validate_batch error
+            codes; rows with a non-zero code are charged 0
+        """
+        distances = _as_list(distances)
+        memberships = _as_list(memberships)
+        time_periods = _as_list(time_periods)
+        codes = self.validate_batch(distances, memberships, time_periods)
+        if not any(codes):
+            return self.calculate_tolls_cents(distances, memberships, time_periods), codes
+        
+        valid = [index for index, code in enumerate(codes) if not code]
+        charges = array("q", bytes(8 * len(codes)))
+        valid_charges = self.calculate_tolls_cents([distances[index] for index in valid],
+                                                   [memberships[index] for index in valid],
+                                                   [time_periods[index] for index in valid])
+        for index, cents in zip(valid, valid_charges):
+            charges[index] = cents
+        
+        if self.metrics is not None:
+            for index, code in enumerate(codes):
+                if code:
+                    self.metrics.record_error(ERROR_KINDS[code])
+        return charges, codes
+    
+    def calculate_tolls_cents(self, distances: Sequence[float], memberships: Sequence[Union[str, int]],
+                              time_periods: Sequence[Union[str, int]]) -> array:
+        """
+        Calculate toll charges in integer cents for parallel columns of trips
+        
+        A batched loop over precomputed integer pricing cells: distances are
+        converted to exact integer units and priced with integer arithmetic,
+        rounding half up exactly like calculate_toll does. Booleans are not
+        accepted as codes.
+        
+        Args:
+            distances: Distances in miles (list, array.array or NumPy array)
+            memberships: Membership strings or MEMBERSHIP_CODES values
+            time_periods: Time period strings or TIME_PERIOD_CODES values
+            
+        Returns:
+            array('q') of toll charges in cents
+            
+        Raises:
+            TollCalculationError: If any trip is invalid (the first bad row is reported)
+        """
+        metrics = self.metrics
+        if metrics is None:
+            return self._price_batch_cents(distances, memberships, time_periods)
+        
+        start = time.perf_counter_ns()
+        try:
+            charges = self._price_batch_cents(distances, memberships, time_periods)
+        except TollCalculationError as e:
+            metrics.record_error(error_kind(str(e)))
+            raise
+        metrics.record_batch(len(charges), time.perf_counter_ns() - start)
+        return charges
+    
+    def _price_batch_cents(self, distances: Sequence[float], memberships: Sequence[Union[str, int]],
+                           time_periods: Sequence[Union[str, int]]) -> array:
+        """Price batch columns in integer cents (see calculate_tolls_cents)"""
+        distances = _as_list(distances)
+        memberships = _without_bools(_as_list(memberships))
+        time_periods = _without_bools(_as_list(time_periods))
+        if not len(distances) == len(memberships) == len(time_periods):
+            raise TollCalculationError("Batch columns must have the same length")
+        
+        compiled = self._compiled
+        batch_plan = compiled.batch_plan
+        rate_scale = compiled.rate_scale
+        charges = array("q")
+        append = charges.append
+        
+        for distance, membership, time_period in zip(distances, memberships, time_periods):
+            if distance <= 0:
+                raise TollCalculationError("Distance must be greater than 0")
+            
+            cell = batch_plan.get((membership, time_period))
+            if cell is None:
+                raise TollCalculationError(self._batch_error_message(membership, time_period))
+            
+            # Express the distance exactly as units / scale miles
+            # (_distance_units and _price_units, inlined for speed)
+            if type(distance) is float and distance < 1e12:
+                units = round(distance * 1000)
+                scale = 1000
+                if units / 1000 != distance:
+                    exact = _exact_units(distance)
+                    if exact is None:
+                        append(_fallback_cents(distance, cell))
+                        continue
+                    units, scale = exact
+            elif type(distance) is int and distance < 10 ** 12:
+                units, scale = distance, 1
+            else:
+                exact = _exact_units(distance)
+                if exact is None:
+                    append(_fallback_cents(distance, cell))
+                    continue
+                units, scale = exact
+            
+            limit = 20 * scale
+            if units <= limit:
+                amount = units * cell.first_20_units
+            else:
+                amount = limit * cell.first_20_units + (units - limit) * cell.beyond_20_units
+            
+            # amount / (scale * rate_scale) is in dollars; round half up to cents
+            denominator = scale * rate_scale
+            append((amount * 200 + denominator) // (2 * denominator))
+        
+        return charges
+    
+    @property
+    def tariff(self) -> Tariff:
+        """Tariff currently used for pricing"""
+        return self._compiled.tariff
+    
+    # Rate tables as they were before tariffs, keyed by enum; read-only views
+    # of the current tariff kept for existing callers
+    BASE_RATES_FIRST_20 = _RateTable(
+        lambda tariff: _enum_table(MembershipLevel, tariff.first_20_rates),
+        "Base rates per mile for the first 20 miles (read-only; see tariff)")
+    BASE_RATES_BEYOND_20 = _RateTable(
+        lambda tariff: _enum_table(MembershipLevel, tariff.beyond_20_rates),
+        "Base rates per mile for miles beyond 20 (read-only; see tariff)")
+    TIME_MULTIPLIERS = _RateTable(
+        lambda tariff: _enum_table(TimePeriod, tariff.time_multipliers),
+        "Time period multipliers (read-only; see tariff)")
+    GOLD_BEYOND_20_RATE = _RateTable(
+        lambda tariff: tariff.gold_beyond_20_rate,
+        "Gold rate per mile beyond 20 miles during busy/peak times (see tariff)")
+    
+    def reload_rates(self):
+        """
+        Reload the current tariff; deprecated, use reload_tariff
+        
+        Raises:
+            TariffError: If the tariff has no file or the file is invalid
+        """
+        warnings.warn("reload_rates() is deprecated; rates come from the tariff, use reload_tariff()",
+                      DeprecationWarning, stacklevel=2)
+        self.reload_tariff()
+    
+    def use_tariff(self, tariff: Tariff):
+        """
+        Switch to a new tariff
+        
+        The tariff is compiled first and then swapped in with a single
+        assignment, so calls in progress finish on the old tariff and later
+        calls use the new one. Any cached quotes are invalidated.
+        
+        Args:
+            tariff: Tariff to price with from now on
+        """
+        self._compiled = _compile_tariff(tariff)
+        self.invalidate_cache()
+    
+    def reload_tariff(self) -> Tariff:
+        """
+        Reload the current tariff from its file and switch to it
         
-        # Round to 2 decimal places
-        return final_charge.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+        Returns:
+            The reloaded tariff
+        
+        Raises:
+            TariffError: If the tariff has no file or the file is invalid; the
+                current tariff stays in use
+        """
+        source = self.tariff.source
+        if source is None:
+            raise TariffError(f"Tariff {self.tariff.version} was not loaded from a file")
+        tariff = load_tariff(source)
+        self.use_tariff(tariff)
+        return tariff
+    
+    def invalidate_cache(self):
+        """Drop all memoized quotes"""
+        if self.quote_cache is not None:
+            self.quote_cache.clear()
+    
+    def _quote_instrumented(self, distance: float, membership: str, time_period: str) -> "TollQuote":
+        """quote() with per-stage timing recorded into self.metrics"""
+        metrics = self.metrics
+        clock = time.perf_counter_ns
+        timings = []
+        compiled = self._compiled
+        try:
+            cache = self.quote_cache
+            if cache is not None:
+                start = clock()
+                key = (type(distance), distance.as_tuple() if type(distance) is Decimal else distance,
+                       membership, time_period, compiled.tariff.version)
+                try:
+                    cached_quote = cache.get(key)
+                except TypeError:
+                    cache = None
+                    cached_quote = None
+                timings.append(("cache", clock() - start))
+                if cached_quote is not None:
+                    return cached_quote
+            
+            start = clock()
+            if distance <= 0:
+                raise TollCalculationError("Distance must be greater than 0")
+            try:
+                cell = compiled.plan.get((membership, time_period))
+            except TypeError:
+                cell = None
+            if cell is None:
+                self._validate_inputs(distance, membership, time_period)
+            validated = clock()
+            
+            units = _distance_units(distance) if self._fixed_point else None
+            if units is not None:
+                converted = clock()
+                cents = _price_units(*units, cell, compiled.rate_scale)
+                priced = clock()
+                charge = _cents_to_decimal(cents)
+            else:
+                distance_decimal = Decimal(str(distance))
+                converted = clock()
+                final_charge = _price_decimal(distance_decimal, cell)
+                priced = clock()
+                charge = final_charge.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+            timings += [("validate", validated - start), ("convert", converted - validated),
+                        ("price", priced - converted), ("quantize", clock() - priced)]
+            
+            quote = TollQuote(charge, distance, cell)
+            if cache is not None:
+                cache.put(key, quote)
+            return quote
+        except TollCalculationError as e:
+            metrics.record_error(error_kind(str(e)))
+            raise
+        finally:
+            metrics.record_stages(timings)
     
     def get_charge_breakdown(self) -> List[Dict[str, str]]:
         """
@@ -106,169 +644,469 @@ class TollCalculator:
     def _validate_inputs(self, distance: float, membership: str, time_period: str):
         """Validate input parameters"""
         if distance <= 0:
-            raise TollCalculationError("Distance must be greater than 0")
+            raise TollCalculationError(error_message(DISTANCE_NOT_POSITIVE, distance, time_period))
         
         valid_memberships = ["non", "Silver", "Gold"]
         if membership not in valid_memberships:
-            raise TollCalculationError("Invalid membership type")
+            raise TollCalculationError(error_message(INVALID_MEMBERSHIP, distance, time_period))
         
         valid_time_periods = ["normal", "busy", "peak"]
         if time_period not in valid_time_periods:
-            raise TollCalculationError(f"Invalid time period: {time_period}")
-    
-    def _parse_membership(self, membership: str) -> MembershipLevel:
-        """Parse membership string to enum"""
-        if membership == "non":
-            return MembershipLevel.NON_MEMBER
-        elif membership == "Silver":
-            return MembershipLevel.SILVER
-        elif membership == "Gold":
-            return MembershipLevel.GOLD
-        else:
-            raise TollCalculationError(f"Invalid membership: {membership}")
-    
-    def _parse_time_period(self, time_period: str) -> TimePeriod:
-        """Parse time period string to enum"""
-        if time_period == "normal":
-            return TimePeriod.NORMAL
-        elif time_period == "busy":
-            return TimePeriod.BUSY
-        elif time_period == "peak":
-            return TimePeriod.PEAK
-        else:
-            raise TollCalculationError(f"Invalid time period: {time_period}")
+            raise TollCalculationError(error_message(INVALID_TIME_PERIOD, distance, time_period))
     
-    def _calculate_base_charge(self, distance: Decimal, membership: MembershipLevel) -> Decimal:
-        """Calculate base charge before time multipliers"""
-        self.last_calculation_breakdown = []
-        
-        if distance <= 20:
-            # All miles are in the first tier
-            rate = self.BASE_RATES_FIRST_20[membership]
-            charge = distance * rate
-            
-            # Format distance to remove unnecessary decimal places
-            if distance == int(distance):
-                distance_str = str(int(distance))
-            else:
-                distance_str = str(distance)
-            
-            self.last_calculation_breakdown.append({
-                "Description": f"Base charge",
-                "Calculation": f"{distance_str} miles x ${rate}",
-                "Amount": f"${charge:.2f}"
-            })
-            
-            return charge
-        else:
-            # Split between first 20 miles and remaining miles
-            first_20_rate = self.BASE_RATES_FIRST_20[membership]
-            beyond_20_rate = self.BASE_RATES_BEYOND_20[membership]
-            
-            first_20_charge = Decimal("20") * first_20_rate
-            remaining_miles = distance - Decimal("20")
-            remaining_charge = remaining_miles * beyond_20_rate
+    def _batch_error_message(self, membership, time_period) -> str:
+        """Return the calculate_toll error message for an unknown batch cell"""
+        if membership not in _MEMBERSHIP_ALIASES:
+            return ERROR_MESSAGES[INVALID_MEMBERSHIP]
+        return error_message(INVALID_TIME_PERIOD, None, time_period)
+
+
+class _PricingCell(NamedTuple):
+    """Precompiled pricing for one membership level and time period"""
+    membership: MembershipLevel
+    time_period: TimePeriod
+    # Rates as configured, used for the breakdown
+    first_20_base_rate: Decimal
+    beyond_20_base_rate: Decimal
+    multiplier: Decimal
+    # Effective per-mile rates with the time multiplier applied
+    first_20_rate: Decimal
+    beyond_20_rate: Decimal
+    first_20_charge: Decimal
+    # Effective rates as integers for the batch path, scaled by the plan's rate scale
+    first_20_units: int
+    beyond_20_units: int
+    tariff_version: str
+
+
+class _CompiledTariff(NamedTuple):
+    """A tariff with its pricing plans, swapped into a calculator as one object"""
+    tariff: Tariff
+    # Cells keyed by (membership, time_period) strings
+    plan: Dict[tuple, _PricingCell]
+    # Cells keyed by strings and codes, for the batch path
+    batch_plan: Dict[tuple, _PricingCell]
+    # Scale of the cells' integer rates
+    rate_scale: int
+
+
+class TollQuote(NamedTuple):
+    """
+    Immutable result of pricing one trip
+    
+    Quotes hold no reference to the calculator that produced them, so one
+    calculator can serve many threads; the breakdown is built when read.
+    """
+    charge: Decimal
+    # Distance in miles as requested
+    distance: float
+    rates: _PricingCell
+    
+    @property
+    def unrounded_charge(self) -> Decimal:
+        """Charge before rounding to cents"""
+        return _price_decimal(Decimal(str(self.distance)), self.rates)
+    
+    @property
+    def membership(self) -> MembershipLevel:
+        """Membership level the trip was priced for"""
+        return self.rates.membership
+    
+    @property
+    def time_period(self) -> TimePeriod:
+        """Time period the trip was priced for"""
+        return self.rates.time_period
+    
+    @property
+    def tariff_version(self) -> str:
+        """Version of the tariff the trip was priced with"""
+        return self.rates.tariff_version
+    
+    @property
+    def breakdown(self) -> List[Dict[str, str]]:
+        """Freshly built breakdown rows (safe for the caller to modify)"""
+        distance = Decimal(str(self.distance))
+        return _build_breakdown(distance, self.rates, _price_decimal(distance, self.rates))
+    
+    def compact(self) -> "CompactQuote":
+        """The same quote with the charge in integer cents, for keeping many quotes"""
+        return CompactQuote(_decimal_to_cents(self.charge), self.distance, self.rates)
+
+
+class CompactQuote(NamedTuple):
+    """
+    Memory-lean record of a priced trip, for keeping many quotes
+    
+    Holds the charge as integer cents instead of a Decimal, next to the
+    distance and the pricing cell shared by every quote of that membership
+    level and time period. The charge and breakdown are built when read,
+    exactly as TollQuote builds them.
+    """
+    cents: int
+    # Distance in miles as requested
+    distance: float
+    rates: _PricingCell
+    
+    @property
+    def charge(self) -> Decimal:
+        """Charge rounded to cents"""
+        return _cents_to_decimal(self.cents)
+    
+    @property
+    def membership(self) -> MembershipLevel:
+        """Membership level the trip was priced for"""
+        return self.rates.membership
+    
+    @property
+    def time_period(self) -> TimePeriod:
+        """Time period the trip was priced for"""
+        return self.rates.time_period
+    
+    @property
+    def tariff_version(self) -> str:
+        """Version of the tariff the trip was priced with"""
+        return self.rates.tariff_version
+    
+    @property
+    def breakdown(self) -> List[Dict[str, str]]:
+        """Freshly built breakdown rows (safe for the caller to modify)"""
+        return TollQuote(self.charge, self.distance, self.rates).breakdown
+
+
+_MEMBERSHIP_ALIASES = dict(MEMBERSHIP_CODES)
+_MEMBERSHIP_ALIASES.update({code: name for name, code in MEMBERSHIP_CODES.items()})
+
+# Membership and time period values accepted by the batch API
+_MEMBERSHIP_KEYS = frozenset(MEMBERSHIP_CODES) | frozenset(MEMBERSHIP_CODES.values())
+_TIME_PERIOD_KEYS = frozenset(TIME_PERIOD_CODES) | frozenset(TIME_PERIOD_CODES.values())
+
+# Distances below this are valid without further checks
+_CHECKED_DISTANCE_LIMIT = 1e12
+
+
+def error_message(code: int, distance, time_period) -> str:
+    """
+    The TollCalculationError message for a validate_batch error code
+    
+    Args:
+        code: Non-zero error code
+        distance: The row's distance
+        time_period: The row's time period
+    """
+    return ERROR_MESSAGES[code].format(distance=distance, time_period=time_period)
+
+
+def error_kind(message: str) -> str:
+    """
+    The ERROR_KINDS name of a TollCalculationError message
+    
+    Messages carry the caller's input; the kind does not, so counting by
+    kind stays bounded however many distinct bad inputs arrive.
+    """
+    for code, template in ERROR_MESSAGES.items():
+        if message.startswith(template.partition("{")[0]):
+            return ERROR_KINDS[code]
+    return "other"
+
+
+def _invalid_rows(values: list, valid: frozenset) -> List[int]:
+    """Indexes of the values that are not in a set of valid keys"""
+    try:
+        return [index for index, value in enumerate(values) if value not in valid]
+    except TypeError:
+        # Unhashable values are never valid
+        return [index for index, value in enumerate(values)
+                if getattr(value, "__hash__", None) is None or value not in valid]
+
+
+def _distance_code(distance, cell: Optional["_PricingCell"]) -> int:
+    """
+    Error code of a distance outside the range validate_batch accepts at once
+    
+    Args:
+        distance: The row's distance
+        cell: The row's pricing cell, or None if its membership or time period is invalid
+    """
+    if isinstance(distance, bool) or not isinstance(distance, (int, float, Decimal)):
+        return INVALID_DISTANCE
+    try:
+        if distance <= 0:
+            return DISTANCE_NOT_POSITIVE
+        if cell is not None:
+            # Non-finite and very large distances fail when priced with Decimal
+            _price_decimal(Decimal(str(distance)), cell).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    except ArithmeticError:
+        return INVALID_DISTANCE
+    return VALID
+
+
+def _compile_tariff(tariff: Tariff) -> _CompiledTariff:
+    """
+    Compile a tariff into one pricing cell per membership/time period
+    
+    Each cell holds the effective per-mile rates for both distance tiers with
+    the time multiplier and the Gold busy/peak rule already applied.
+    """
+    effective_rates = {}
+    for membership_level in MembershipLevel:
+        for time_period in TimePeriod:
+            first_20_rate = tariff.first_20_rates[membership_level.value]
+            beyond_20_rate = tariff.beyond_20_rates[membership_level.value]
+            multiplier = tariff.time_multipliers[time_period.value]
             
-            # Format remaining miles to remove unnecessary decimal places
-            if remaining_miles == int(remaining_miles):
-                remaining_str = str(int(remaining_miles))
+            if time_period == TimePeriod.NORMAL:
+                # Normal times are charged at the base rates
+                rates = (first_20_rate, beyond_20_rate)
+            elif membership_level == MembershipLevel.GOLD:
+                # Gold members are free for the first 20 miles and pay a reduced
+                # rate beyond 20 miles during busy/peak times
+                beyond_20_rate = tariff.gold_beyond_20_rate
+                rates = (Decimal("0.00"), beyond_20_rate * multiplier)
             else:
-                remaining_str = str(remaining_miles)
+                rates = (first_20_rate * multiplier, beyond_20_rate * multiplier)
             
-            self.last_calculation_breakdown.extend([
-                {
-                    "Description": "First 20 miles (base)",
-                    "Calculation": f"20 miles x ${first_20_rate}",
-                    "Amount": f"${first_20_charge:.2f}"
-                },
-                {
-                    "Description": f"Next {remaining_str} miles (base)",
-                    "Calculation": f"{remaining_str} miles x ${beyond_20_rate}",
-                    "Amount": f"${remaining_charge:.2f}"
-                }
-            ])
-            
-            return first_20_charge + remaining_charge
-    
-    def _apply_time_multiplier(self, base_charge: Decimal, time_period: TimePeriod, 
-                             membership: MembershipLevel, distance: Decimal) -> Decimal:
-        """Apply time-based multipliers with special Gold member logic"""
-        multiplier = self.TIME_MULTIPLIERS[time_period]
-        
-        # Special logic for Gold members during busy/peak times
-        if membership == MembershipLevel.GOLD and time_period != TimePeriod.NORMAL:
-            if distance <= 20:
-                # Gold members are free for first 20 miles but we still show the calculation
-                final_charge = Decimal("0.00")
-                
-                # Update breakdown to show time multiplier calculation
-                multiplier_str = str(int(multiplier)) if multiplier == int(multiplier) else str(multiplier)
-                self.last_calculation_breakdown.append({
-                    "Description": f"{time_period.value.title()} time multiplier",
-                    "Calculation": f"${base_charge:.2f} x {multiplier_str}",
-                    "Amount": f"${final_charge:.2f}"
-                })
-                
-                return final_charge
-            else:
-                # Gold members pay 25% of the normal rate for miles beyond 20
-                # during busy/peak times
-                remaining_miles = distance - Decimal("20")
-                beyond_20_rate = Decimal("0.25")  # 25% of $1.00 base rate
-                charge = remaining_miles * beyond_20_rate * multiplier
-                
-                # Format remaining miles and multiplier for display
-                remaining_str = str(int(remaining_miles)) if remaining_miles == int(remaining_miles) else str(remaining_miles)
-                multiplier_str = str(int(multiplier)) if multiplier == int(multiplier) else str(multiplier)
-                
-                # Update breakdown for Gold member special case
-                self.last_calculation_breakdown = [
-                    {
-                        "Description": "First 20 miles (free)",
-                        "Calculation": f"20 miles x $0.00",
-                        "Amount": "$0.00"
-                    },
-                    {
-                        "Description": f"Next {remaining_str} miles (base)",
-                        "Calculation": f"{remaining_str} miles x $0.25",
-                        "Amount": f"${remaining_miles * beyond_20_rate:.2f}"
-                    },
-                    {
-                        "Description": f"{time_period.value.title()} time multiplier",
-                        "Calculation": f"${remaining_miles * beyond_20_rate:.2f} x {multiplier_str}",
-                        "Amount": f"${charge:.2f}"
-                    }
-                ]
-                
-                return charge
-        
-        # Normal time multiplier logic
-        if time_period == TimePeriod.NORMAL:
-            return base_charge
-        
-        final_charge = base_charge * multiplier
+            effective_rates[(membership_level, time_period)] = (
+                (first_20_rate, beyond_20_rate, multiplier), rates
+            )
+    
+    # Integer rates for the batch path share one power-of-ten scale
+    decimal_places = max(max(0, -rate.as_tuple().exponent)
+                         for _, rates in effective_rates.values() for rate in rates)
+    rate_scale = 10 ** decimal_places
+    
+    plan = {}
+    batch_plan = {}
+    for (membership_level, time_period), (base_rates, rates) in effective_rates.items():
+        cell = _PricingCell(
+            membership_level, time_period, *base_rates,
+            first_20_rate=rates[0],
+            beyond_20_rate=rates[1],
+            first_20_charge=Decimal("20") * rates[0],
+            first_20_units=int(rates[0] * rate_scale),
+            beyond_20_units=int(rates[1] * rate_scale),
+            tariff_version=tariff.version
+        )
+        plan[(membership_level.value, time_period.value)] = cell
+        for membership_key in (membership_level.value, MEMBERSHIP_CODES[membership_level.value]):
+            for time_period_key in (time_period.value, TIME_PERIOD_CODES[time_period.value]):
+                batch_plan[(membership_key, time_period_key)] = cell
+    return _CompiledTariff(tariff, plan, batch_plan, rate_scale)
+
+
+def _fallback_cents(distance, cell: _PricingCell) -> int:
+    """Price a batch row that integer units cannot represent with Decimal arithmetic"""
+    return _decimal_to_cents(
+        _price_decimal(Decimal(str(distance)), cell).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    )
+
+
+def _price_decimal(distance: Decimal, cell: _PricingCell) -> Decimal:
+    """Piecewise-linear evaluation with the cell's effective rates, before rounding"""
+    if distance <= 20:
+        return distance * cell.first_20_rate
+    return cell.first_20_charge + (distance - 20) * cell.beyond_20_rate
+
+
+def _calculate_base_charge(distance: Decimal, cell: _PricingCell) -> Decimal:
+    """Calculate base charge before time multipliers"""
+    if distance <= 20:
+        # All miles are in the first tier
+        return distance * cell.first_20_base_rate
+    
+    # Split between first 20 miles and remaining miles
+    first_20_charge = Decimal("20") * cell.first_20_base_rate
+    remaining_charge = (distance - Decimal("20")) * cell.beyond_20_base_rate
+    return first_20_charge + remaining_charge
+
+def _build_breakdown(distance: Decimal, cell: _PricingCell, final_charge: Decimal) -> List[Dict[str, str]]:
+    """
+    Build the breakdown rows for a priced trip
+    
+    Args:
+        distance: Distance in miles as priced
+        cell: Pricing cell the trip was priced with
+        final_charge: Charge before rounding
         
+    Returns:
+        List of dictionaries containing breakdown details
+    """
+    membership, time_period, multiplier = cell.membership, cell.time_period, cell.multiplier
+    first_20_rate, beyond_20_rate = cell.first_20_base_rate, cell.beyond_20_base_rate
+    
+    # Gold members beyond 20 miles during busy/peak times get their own breakdown
+    if membership == MembershipLevel.GOLD and time_period != TimePeriod.NORMAL and distance > 20:
+        remaining_miles = distance - Decimal("20")
+        remaining_charge = remaining_miles * beyond_20_rate
+        remaining_str = _format_quantity(remaining_miles)
+        return [
+            {
+                "Description": "First 20 miles (free)",
+                "Calculation": f"20 miles x $0.00",
+                "Amount": "$0.00"
+            },
+            {
+                "Description": f"Next {remaining_str} miles (base)",
+                "Calculation": f"{remaining_str} miles x ${beyond_20_rate}",
+                "Amount": f"${remaining_charge:.2f}"
+            },
+            {
+                "Description": f"{time_period.value.title()} time multiplier",
+                "Calculation": f"${remaining_charge:.2f} x {_format_quantity(multiplier)}",
+                "Amount": f"${final_charge:.2f}"
+            }
+        ]
+    
+    if distance <= 20:
+        # All miles are in the first tier
+        breakdown = [{
+            "Description": f"Base charge",
+            "Calculation": f"{_format_quantity(distance)} miles x ${first_20_rate}",
+            "Amount": f"${distance * first_20_rate:.2f}"
+        }]
+    else:
+        # Split between first 20 miles and remaining miles
+        remaining_miles = distance - Decimal("20")
+        remaining_str = _format_quantity(remaining_miles)
+        breakdown = [
+            {
+                "Description": "First 20 miles (base)",
+                "Calculation": f"20 miles x ${first_20_rate}",
+                "Amount": f"${Decimal('20') * first_20_rate:.2f}"
+            },
+            {
+                "Description": f"Next {remaining_str} miles (base)",
+                "Calculation": f"{remaining_str} miles x ${beyond_20_rate}",
+                "Amount": f"${remaining_miles * beyond_20_rate:.2f}"
+            }
+        ]
+    
+    if time_period == TimePeriod.NORMAL:
+        return breakdown
+    
+    base_charge = _calculate_base_charge(distance, cell)
+    
+    # Gold members are free for the first 20 miles but we still show the calculation
+    if membership != MembershipLevel.GOLD:
         # For long distance scenarios (beyond 20 miles), add total base charge breakdown item
-        if len(self.last_calculation_breakdown) > 1:
-            total_base = sum(Decimal(item["Amount"].replace("$", "")) for item in self.last_calculation_breakdown)
-            self.last_calculation_breakdown.append({
+        if len(breakdown) > 1:
+            total_base = sum(Decimal(item["Amount"][1:]) for item in breakdown)
+            breakdown.append({
                 "Description": "Total base charge",
-                "Calculation": " + ".join([item["Amount"] for item in self.last_calculation_breakdown]),
+                "Calculation": " + ".join([item["Amount"] for item in breakdown]),
                 "Amount": f"${total_base:.2f}"
             })
         
-        # Update breakdown to show time multiplier
-        if base_charge > 0:
-            # Format multiplier to remove unnecessary decimal places
-            if multiplier == int(multiplier):
-                multiplier_str = str(int(multiplier))
-            else:
-                multiplier_str = str(multiplier)
-            
-            self.last_calculation_breakdown.append({
-                "Description": f"{time_period.value.title()} time multiplier",
-                "Calculation": f"${base_charge:.2f} x {multiplier_str}",
-                "Amount": f"${final_charge:.2f}"
-            })
-        
-        return final_charge
\ No newline at end of file
+        if not base_charge > 0:
+            return breakdown
+    
+    breakdown.append({
+        "Description": f"{time_period.value.title()} time multiplier",
+        "Calculation": f"${base_charge:.2f} x {_format_quantity(multiplier)}",
+        "Amount": f"${final_charge:.2f}"
+    })
+    return breakdown
+
+
+def _format_quantity(value: Decimal) -> str:
+    """Format miles or multipliers without unnecessary decimal places"""
+    if value == int(value):
+        return str(int(value))
+    return str(value)
+
+
+def _enum_table(keys, table: Mapping[str, Decimal]) -> Mapping[Enum, Decimal]:
+    """Read-only copy of a tariff table keyed by MembershipLevel or TimePeriod members"""
+    return MappingProxyType({key: table[key.value] for key in keys})
+
+
+def _as_list(values) -> list:
+    """Convert a list, array.array or NumPy array column to a list of Python scalars"""
+    if hasattr(values, "tolist"):
+        return values.tolist()
+    return list(values)
+
+
+def _without_bools(values: list) -> list:
+    """
+    Replace booleans in a membership or time period column with their names
+    
+    True and False compare equal to the codes 1 and 0 and would otherwise
+    be priced as those codes.
+    """
+    if bool not in set(map(type, values)):
+        return values
+    return [str(value) if type(value) is bool else value for value in values]
+
+
+def _exact_units(distance) -> Optional[Tuple[int, int]]:
+    """
+    Express a distance exactly as (units, scale) with distance == units / scale
+    
+    Uses the same Decimal(str(distance)) conversion as calculate_toll. Returns None
+    for values that Decimal would not price exactly (non-finite or very large),
+    which the batch path hands back to calculate_toll.
+    """
+    value = Decimal(str(distance))
+    if not value.is_finite():
+        return None
+    _, digits, exponent = value.as_tuple()
+    if len(digits) > 20 or len(digits) + exponent > 12:
+        return None
+    units = int("".join(map(str, digits)))
+    if exponent >= 0:
+        return units * 10 ** exponent, 1
+    return units, 10 ** -exponent
+
+
+def _distance_units(distance) -> Optional[Tuple[int, int]]:
+    """
+    Express a distance exactly as (units, scale), in milli-miles where possible
+    
+    Returns None when _exact_units cannot represent the distance.
+    """
+    if type(distance) is float and distance < 1e12:
+        units = round(distance * 1000)
+        if units / 1000 == distance:
+            return units, 1000
+    elif type(distance) is int and distance < 10 ** 12:
+        return distance, 1
+    return _exact_units(distance)
+
+
+def _price_units(units: int, scale: int, cell: _PricingCell, rate_scale: int) -> int:
+    """
+    Price units / scale miles in integer cents, rounding half up
+    
+    The cell's integer rates are per mile in 1 / rate_scale dollars.
+    """
+    limit = 20 * scale
+    if units <= limit:
+        amount = units * cell.first_20_units
+    else:
+        amount = limit * cell.first_20_units + (units - limit) * cell.beyond_20_units
+    
+    # amount / (scale * rate_scale) is in dollars; round half up to cents
+    denominator = scale * rate_scale
+    return (amount * 200 + denominator) // (2 * denominator)
+
+
+def _decimal_to_cents(charge: Decimal) -> int:
+    """Convert a quantized charge to integer cents"""
+    return int(charge.scaleb(2))
+
+
+def _cents_to_decimal(cents: int) -> Decimal:
+    """Convert integer cents to a charge quantized to 2 decimal places"""
+    return Decimal(cents).scaleb(-2)
+
+
+def _compile_standard_tariff() -> Optional[_CompiledTariff]:
+    """Compile the standard tariff, or None if it cannot be loaded (TollCalculator() reports why)"""
+    try:
+        return _compile_tariff(load_tariff())
+    except TariffError:
+        return None
+
+
+# Built at import so the first calculator and first quote pay nothing for it
+_STANDARD_COMPILED = _compile_standard_tariff()
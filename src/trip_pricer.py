@@ -0,0 +1,286 @@
+"""
+Trip File Pricer
+
+This module provides a command-line entry point that streams a CSV or
+JSON Lines trip log through TollCalculator and writes the priced records
+in chunks, so memory stays flat no matter how large the file is.
+
+Priced trips can also be written to a binary columnar file (see
+src.columnar) for downstream reconciliation.
+
+Usage:
+    python -m src.trip_pricer trips.csv --output priced.csv --rejects rejects.csv
+    python -m src.trip_pricer trips.csv --output priced.csv --columnar priced.tollcol
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+from itertools import islice
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from src.tariff import TariffError, load_tariff
+from src.toll_calculator import TollCalculationError, TollCalculator, _cents_to_decimal, error_message
+
+# Imported by main only when asked for, so workers importing price_chunk stay light
+if TYPE_CHECKING:
+    from src.columnar import ColumnarWriter
+
+# Fields every trip record must provide
+TRIP_FIELDS = ("distance", "membership", "time_period")
+
+# Number of records read, priced and written together
+DEFAULT_CHUNK_SIZE = 10000
+
+FORMATS_BY_EXTENSION = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".json": "jsonl"
+}
+
+
+def read_trips(stream: TextIO, file_format: str) -> Iterator[Union[Dict, str]]:
+    """
+    Lazily read trip records from a CSV or JSON Lines stream
+    
+    Args:
+        stream: Open text stream positioned at the start of the trip log
+        file_format: "csv" or "jsonl"
+    
+    Yields:
+        One dictionary per trip record, or the text of a JSON Lines line
+        that is not a JSON object, which _read_trip rejects
+    """
+    if file_format == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    record = None
+                yield record if isinstance(record, dict) else line.rstrip("\r\n")
+
+
+def chunked(records: Iterable[Dict], chunk_size: int) -> Iterator[List[Dict]]:
+    """Group records into lists of at most chunk_size items"""
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_trip(record: Dict) -> Tuple[float, str, str]:
+    """
+    Extract (distance, membership, time_period) from a trip record
+    
+    Raises:
+        TollCalculationError: If a field is missing or the distance is not a number
+    """
+    distance, membership, time_period, error = _read_trip(record)
+    if error is not None:
+        raise TollCalculationError(error)
+    return distance, membership, time_period
+
+
+def reject_record(record: Union[Dict, str], error: str) -> Dict:
+    """Add the error to a record for the rejects stream, keeping a non-object line under 'line'"""
+    if isinstance(record, dict):
+        return dict(record, error=error)
+    return {"line": record, "error": error}
+
+
+def _read_trip(record: Union[Dict, str]) -> Tuple:
+    """parse_trip without raising: (distance, membership, time_period, error message or None)"""
+    if not isinstance(record, dict):
+        return None, None, None, "Not a JSON object"
+    for field in TRIP_FIELDS:
+        if record.get(field) is None:
+            return None, None, None, f"Missing field: {field}"
+    
+    distance = record["distance"]
+    if isinstance(distance, bool) or not isinstance(distance, (int, float)):
+        try:
+            distance = float(distance)
+        except (TypeError, ValueError):
+            return None, None, None, f"Invalid distance: {distance}"
+    if isinstance(distance, float) and not math.isfinite(distance):
+        return None, None, None, f"Invalid distance: {record['distance']}"
+    return distance, record["membership"], record["time_period"], None
+
+
+def price_chunk(records: List[Dict], calculator: TollCalculator) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Price a chunk of trip records
+    
+    The chunk is validated and priced as one batch, so bad rows are set
+    aside without raising an exception per row.
+    
+    Args:
+        records: Trip records as read by read_trips
+        calculator: Calculator used to price the trips
+    
+    Returns:
+        Priced records (with a "charge" field) and rejected records
+        (with an "error" field), each in input order
+    """
+    trips = [_read_trip(record) for record in records]
+    # Only membership and time period strings are valid in a trip log, not batch codes
+    distances = [distance for distance, _, _, _ in trips]
+    memberships = [membership if isinstance(membership, str) else None for _, membership, _, _ in trips]
+    time_periods = [time_period if isinstance(time_period, str) else None for _, _, time_period, _ in trips]
+    charges, codes = calculator.calculate_tolls_checked(distances, memberships, time_periods)
+    
+    priced = []
+    rejects = []
+    for record, (distance, _, _, error), cents, code in zip(records, trips, charges, codes):
+        if error is None and code:
+            error = error_message(code, distance, record["time_period"])
+        if error is None:
+            priced.append(dict(record, charge=str(_cents_to_decimal(cents))))
+        else:
+            rejects.append(reject_record(record, error))
+    return priced, rejects
+
+
+class RecordWriter:
+    """
+    Chunked writer for priced or rejected records in CSV or JSON Lines format
+    """
+    
+    def __init__(self, stream: TextIO, file_format: str, extra_field: str):
+        self.stream = stream
+        self.file_format = file_format
+        self.extra_field = extra_field
+        self.count = 0
+        self._csv_writer = None
+    
+    def write_chunk(self, records: List[Dict]):
+        """Write a chunk of records in one call"""
+        if not records:
+            return
+        if self.file_format == "csv":
+            if self._csv_writer is None:
+                # Keep the input columns, then the added field
+                fieldnames = [name for name in records[0] if name != self.extra_field]
+                self._csv_writer = csv.DictWriter(
+                    self.stream, fieldnames + [self.extra_field], extrasaction="ignore"
+                )
+                self._csv_writer.writeheader()
+            self._csv_writer.writerows(records)
+        else:
+            self.stream.write("".join(json.dumps(record) + "\n" for record in records))
+        self.count += len(records)
+
+
+def price_file(input_stream: TextIO, output_stream: TextIO, rejects_stream: TextIO,
+               file_format: str, calculator: Optional[TollCalculator] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = 1,
+               columnar: Optional["ColumnarWriter"] = None) -> Tuple[int, int]:
+    """
+    Stream a trip log through the calculator
+    
+    Args:
+        input_stream: Trip log to read
+        output_stream: Destination for priced records
+        rejects_stream: Destination for rejected records
+        file_format: "csv" or "jsonl" (used for input and both outputs)
+        calculator: Calculator to use (a new one by default)
+        chunk_size: Number of records held in memory at a time
+        workers: Number of worker processes pricing chunks in parallel
+        columnar: Writer that also receives the priced records, if any
+    
+    Returns:
+        Tuple of (priced count, rejected count)
+    """
+    calculator = calculator or TollCalculator()
+    output = RecordWriter(output_stream, file_format, "charge")
+    rejects = RecordWriter(rejects_stream, file_format, "error")
+    
+    chunks = chunked(read_trips(input_stream, file_format), chunk_size)
+    if workers > 1:
+        from src.parallel_pricing import price_chunks_parallel
+        # Workers price with the same tariff and engine as the given calculator
+        results = price_chunks_parallel(chunks, workers,
+                                        {"tariff": calculator.tariff, "engine": calculator.engine})
+    else:
+        results = (price_chunk(chunk, calculator) for chunk in chunks)
+    
+    for priced, rejected in results:
+        output.write_chunk(priced)
+        rejects.write_chunk(rejected)
+        if columnar is not None:
+            columnar.write_records(priced)
+    
+    return output.count, rejects.count
+
+
+def detect_format(path: Optional[str], default: str = "csv") -> str:
+    """Guess the trip log format from a file extension"""
+    if path:
+        for extension, file_format in FORMATS_BY_EXTENSION.items():
+            if path.lower().endswith(extension):
+                return file_format
+    return default
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description="Price a CSV or JSON Lines trip log")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="Trip log to price (default: stdin)")
+    parser.add_argument("-o", "--output", default="-",
+                        help="Priced records destination (default: stdout)")
+    parser.add_argument("-r", "--rejects", default=None,
+                        help="Rejected records destination (default: stderr)")
+    parser.add_argument("-f", "--format", choices=["csv", "jsonl"], default=None,
+                        help="Trip log format (default: from the input file extension, else csv)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Records priced and written per chunk (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("-j", "--workers", type=int, default=1,
+                        help="Worker processes pricing chunks in parallel (default: 1)")
+    parser.add_argument("-t", "--tariff", default=None,
+                        help="Tariff file to price with (default: the standard tariff)")
+    parser.add_argument("--columnar", default=None,
+                        help="Also write priced trips to this binary columnar file")
+    args = parser.parse_args(argv)
+    
+    try:
+        calculator = TollCalculator(tariff=load_tariff(args.tariff) if args.tariff else None)
+    except TariffError as e:
+        parser.error(str(e))
+    file_format = args.format or detect_format(args.input if args.input != "-" else None)
+    
+    input_stream = sys.stdin if args.input == "-" else open(args.input, newline="")
+    output_stream = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    rejects_stream = sys.stderr if args.rejects is None else open(args.rejects, "w", newline="")
+    columnar = None
+    if args.columnar:
+        from src.columnar import ColumnarWriter
+        columnar = ColumnarWriter(args.columnar, calculator.tariff)
+    try:
+        priced, rejected = price_file(input_stream, output_stream, rejects_stream,
+                                      file_format, calculator, chunk_size=args.chunk_size,
+                                      workers=args.workers, columnar=columnar)
+        if columnar is not None:
+            columnar.close()
+    finally:
+        if columnar is not None:
+            # Leaves the file marked incomplete if pricing failed
+            columnar.abort()
+        for stream in (input_stream, output_stream, rejects_stream):
+            if stream not in (sys.stdin, sys.stdout, sys.stderr):
+                stream.close()
+    
+    print(f"Priced {priced} trips, rejected {rejected}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())